@@ -17,17 +17,21 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import json
 import time
 import typing
 import asyncio
 import aiohttp
 import bittensor as bt
 
+from starlette.types import Send
+
 import sybil
+from sybil.broadcast import NeuronBroadcaster
+from sybil.wire import CONTENT_TYPE_JSON, encode
 
 # import base miner class which takes care of most of the boilerplate
 from sybil.base.miner import BaseMinerNeuron
-from sybil.base.consts import BURN_UID, BURN_WEIGHT
 
 
 class Miner(BaseMinerNeuron):
@@ -42,6 +46,23 @@ class Miner(BaseMinerNeuron):
     def __init__(self, config=None):
         super(Miner, self).__init__(config=config)
 
+        # Validators that stream challenges get progress and heartbeats while the challenge is solved
+        self.axon.attach(
+            forward_fn=self.forward_stream,
+            blacklist_fn=self.blacklist_stream,
+            priority_fn=self.priority_stream,
+        )
+
+        # Validators ping the miner to open a connection before they send the next challenge
+        self.axon.attach(
+            forward_fn=self.forward_ping,
+            blacklist_fn=self.blacklist_ping,
+            priority_fn=self.priority_ping,
+        )
+
+        # The metagraph is broadcast to the miner server versioned, only changes are sent
+        self.neuron_broadcaster = NeuronBroadcaster(self.post_broadcast)
+
         # TODO(developer): Anything specific to your use case you can do here
 
     async def forward(
@@ -75,6 +96,89 @@ class Miner(BaseMinerNeuron):
             bt.logging.error(f"Error solving challenge: {e}")
             return synapse
 
+    def forward_stream(
+        self, synapse: sybil.protocol.StreamingChallenge
+    ) -> sybil.protocol.StreamingChallenge:
+        """
+        Solves the incoming 'StreamingChallenge' synapse like :meth:`forward`, but streams progress back to the validator.
+
+        The progress events of the miner server are relayed as they come in, with a heartbeat whenever nothing else
+        was sent for ``synapse.heartbeat_interval`` seconds, so the validator can tell a working miner from a dead one.
+
+        Args:
+            synapse (sybil.protocol.StreamingChallenge): The synapse object containing the 'challenge_url' data.
+        """
+
+        bt.logging.info(f"Received streaming challenge: {synapse.challenge_url}")
+
+        async def relay_events(events: asyncio.Queue):
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(
+                        f"{self.miner_server}/challenge/stream",
+                        json={"url": synapse.challenge_url},
+                        headers={"Content-Type": "application/json"},
+                    ) as response:
+                        async for line in response.content:
+                            if line.strip():
+                                await events.put(json.loads(line))
+            except Exception as e:
+                bt.logging.error(f"Error solving challenge: {e}")
+                await events.put({"event": "error", "error": str(e)})
+            finally:
+                await events.put(None)
+
+        async def stream_events(send: Send):
+            async def send_event(event: dict, more_body: bool = True):
+                await send({
+                    "type": "http.response.body",
+                    "body": (json.dumps(event) + "\n").encode("utf-8"),
+                    "more_body": more_body,
+                })
+
+            events = asyncio.Queue()
+            relay = asyncio.create_task(relay_events(events))
+            try:
+                await send_event({"event": "accepted"})
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.get(), timeout=synapse.heartbeat_interval)
+                    except asyncio.TimeoutError:
+                        await send_event({"event": "heartbeat"})
+                        continue
+                    if event is None:
+                        break
+                    if event.get("event") == "solved":
+                        bt.logging.info(f"Solved challenge: {event.get('response')}")
+                    await send_event(event)
+            finally:
+                relay.cancel()
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        return synapse.create_streaming_response(stream_events)
+
+    async def forward_ping(self, synapse: sybil.protocol.Ping) -> sybil.protocol.Ping:
+        """Answers a validator ping as it is, it only opens the connection for the next challenge."""
+        return synapse
+
+    async def blacklist_ping(self, synapse: sybil.protocol.Ping) -> typing.Tuple[bool, str]:
+        """Applies :meth:`blacklist` to pings."""
+        return await self.blacklist(synapse)
+
+    async def priority_ping(self, synapse: sybil.protocol.Ping) -> float:
+        """Applies :meth:`priority` to pings."""
+        return await self.priority(synapse)
+
+    async def blacklist_stream(
+        self, synapse: sybil.protocol.StreamingChallenge
+    ) -> typing.Tuple[bool, str]:
+        """Applies :meth:`blacklist` to streaming challenges."""
+        return await self.blacklist(synapse)
+
+    async def priority_stream(self, synapse: sybil.protocol.StreamingChallenge) -> float:
+        """Applies :meth:`priority` to streaming challenges."""
+        return await self.priority(synapse)
+
     async def blacklist(
         self, synapse: sybil.protocol.Challenge
     ) -> typing.Tuple[bool, str]:
@@ -179,41 +283,21 @@ class Miner(BaseMinerNeuron):
     
     async def broadcast_neurons(self):
         """
-        Broadcast the neurons to the miner server.
+        Broadcast the neurons to the miner server, only what changed since the last broadcast is sent.
         """
         bt.logging.info(f"Broadcasting neurons to {self.miner_server}/protocol/broadcast/neurons")
-
-        neurons_info = []
-        block = int(self.metagraph.block)
-        for neuron in self.metagraph.neurons:
-            uid = neuron.uid
-            neurons_info.append({
-                'uid': uid,
-                'ip': self.metagraph.axons[uid].ip,
-                'validator_trust': neuron.validator_trust,
-                'trust': neuron.trust,
-                "alpha_stake": float(self.metagraph.alpha_stake[uid].item()),
-                'stake_weight': float(self.metagraph.S[uid].item()),
-                'block': block,
-                'hotkey': neuron.hotkey,
-                'coldkey': neuron.coldkey,
-                'excluded': uid == BURN_UID,
-            })
-        bt.logging.info(f"Submitting neurons info: {len(neurons_info)} neurons")
-        try:     
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.miner_server}/protocol/broadcast/neurons",
-                    json={"neurons": neurons_info}
-                ) as resp:
-                    result = await resp.json()
-                    if result["success"]:
-                        bt.logging.info(f"Broadcasted neurons info: {len(neurons_info)} neurons")
-                    else:
-                        bt.logging.error(f"Failed to broadcast neurons info")
-        except Exception as e:
-            bt.logging.error(f"Failed to broadcast neurons info: {e}")
-
+        await self.neuron_broadcaster.broadcast(self.metagraph_snapshot)
+
+    async def post_broadcast(self, payload: dict, content_type: str = CONTENT_TYPE_JSON) -> dict:
+        """Posts a neurons broadcast payload encoded as `content_type` to the miner server and returns its json response."""
+        body, headers = encode(payload, content_type)
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{self.miner_server}/protocol/broadcast/neurons",
+                data=body,
+                headers=headers,
+            ) as resp:
+                return await resp.json(content_type=None)
 
 def check_if_miner_registered(neuron):
     """
@@ -241,12 +325,10 @@ if __name__ == "__main__":
             asyncio.set_event_loop(loop)
 
         async def periodic_broadcast():
-            last_broadcast = None
             while True:
                 check_if_miner_registered(miner)
-                if last_broadcast is None or time.time() - last_broadcast > 1800:
-                    await miner.broadcast_neurons()
-                    last_broadcast = time.time()
+                # Only sends when the metagraph changed, or a version probe every once in a while
+                await miner.broadcast_neurons()
                 await asyncio.sleep(60)  # 60 seconds between broadcasts
 
         # Run the periodic broadcast in the background
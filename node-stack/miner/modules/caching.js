@@ -49,6 +49,9 @@ const cache_persistence_path = `${ cache_dir }/.tpn_cache.json`
  * - `"last_known_validators"`: `{ uid: String, ip: String }[]`  
  *   List of validator IPs submitted by the neuron.
  *
+ * - `"neuron_broadcast"`: `{ version: { block: Number, hash: String }, neurons: Object[] }`  
+ *   The last neuron broadcast, neurons indexed by uid, that neuron deltas are applied on top of.
+ *
  * ### Challenge-related (dynamic keys):
  * - `"challenge_solution_${challenge}"`: `{ response: String, [extra]: any }`  
  *   Cached solution for a challenge string.
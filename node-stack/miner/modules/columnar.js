@@ -0,0 +1,66 @@
+/**
+ * Content type of request bodies that contain columnar record lists, see `expand_columnar`
+ */
+export const COLUMNAR_CONTENT_TYPE = 'application/vnd.sybil.columnar+json'
+
+/**
+ * Content types the broadcast routes accept, returned to the neuron so it knows it may send columnar bodies
+ */
+export const accepted_content_types = [ 'application/json', COLUMNAR_CONTENT_TYPE ]
+
+/**
+ * Checks whether a value is a columnar record list
+ * @param {*} value - Any value
+ * @returns {Boolean} Whether the value has a row count and one array of that length per field
+ */
+export function is_columnar( value ) {
+
+    if( !value || typeof value !== 'object' || Array.isArray( value ) ) return false
+    const { rows, columns } = value
+    if( !Number.isInteger( rows ) || rows < 0 ) return false
+    if( !columns || typeof columns !== 'object' || Array.isArray( columns ) ) return false
+    return Object.values( columns ).every( column => Array.isArray( column ) && column.length == rows )
+
+}
+
+/**
+ * Expands a columnar record list into one object per record
+ * @param {Object} value - Columnar record list
+ * @param {Number} value.rows - The number of records
+ * @param {Object} value.columns - The values of every field, one entry per record
+ * @param {Object} [value.tables] - Distinct values of fields whose column holds indexes into the table
+ * @param {Object} [value.constants] - Fields with the same value in every record
+ * @returns {Object[]} The records
+ */
+export function expand_columnar( { rows, columns, tables={}, constants={} } ) {
+
+    const fields = Object.entries( columns ).map( ( [ name, values ] ) => {
+        const table = tables?.[ name ]
+        return [ name, Array.isArray( table ) ? values.map( index => table[ index ] ) : values ]
+    } )
+
+    const records = []
+    for( let row = 0; row < rows; row++ ) {
+        const record = {}
+        for( const [ name, values ] of fields ) record[ name ] = values[ row ]
+        records.push( { ...record, ...constants } )
+    }
+    return records
+
+}
+
+/**
+ * Expands every columnar record list in a request body, at any depth of nested objects
+ * @param {*} body - The parsed request body
+ * @returns {*} The body with records in place of columnar record lists
+ */
+export function expand_columnar_body( body ) {
+
+    if( is_columnar( body ) ) return expand_columnar( body )
+    if( !body || typeof body !== 'object' || Array.isArray( body ) ) return body
+
+    const expanded = {}
+    for( const [ key, value ] of Object.entries( body ) ) expanded[ key ] = expand_columnar_body( value )
+    return expanded
+
+}
@@ -6,6 +6,45 @@ import { request_is_local } from '../modules/network.js'
 export const router = Router()
 
 
+/**
+ * Solves a challenge: fetches the challenge response, leases a wireguard config and posts both back to the validator
+ * @param {Object} params
+ * @param {string} params.url - The challenge url from the validator
+ * @param {Function} [params.on_progress] - Called with the name of every completed stage
+ * @returns {Promise<Object>} The score reported by the validator, together with the challenge response
+ */
+const solve_challenge = async ( { url, on_progress = () => {} } ) => {
+
+    // Get the { response } from the url body
+    const response_to_challenge = await fetch( url )
+    const { response } = await response_to_challenge.json()
+    log.info( `Response from ${ url }: ${ response }` )
+    on_progress( 'challenge_fetched' )
+
+    // Generate a valid wireguard config
+    const wireguard_config = await get_valid_wireguard_config( { validator: true, lease_minutes: 10 } ) 
+    log.info( `Generated wireguard config:`, wireguard_config )
+    on_progress( 'lease_acquired' )
+
+    // Call the challenge-response API with the wireguard config in POST body
+    log.info( `Building solution url`, { url, response } )
+    let solution_url = new URL( url )
+    solution_url.pathname = `${ solution_url.pathname.replace( /\/$/, '' ) }/${ response }`
+    solution_url = solution_url.toString()
+    log.info( `Calling solution and offering vpn config to validator: ${ solution_url }` )
+    const solution_res = await fetch( solution_url, { 
+        method: 'POST', 
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify( { wireguard_config } )
+    } )
+    const score = await solution_res.json()
+    log.info( `Solution score reported by the validator:`, score )
+    on_progress( 'solution_posted' )
+
+    return { ...score, response }
+
+}
+
 router.post( '/', async ( req, res ) => {
 
     // Check for request source
@@ -23,32 +62,10 @@ router.post( '/', async ( req, res ) => {
         // Check if the url is valid
         if( !url ) return res.status( 400 ).send( 'No url provided' )
         if( !url.startsWith( 'http' ) ) return res.status( 400 ).send( 'Invalid url' )
-            
-        // Get the { response } from the url body
-        const response_to_challenge = await fetch( url )
-        const { response } = await response_to_challenge.json()
-        log.info( `Response from ${ url }: ${ response }` )
-
-        // Generate a valid wireguard config
-        const wireguard_config = await get_valid_wireguard_config( { validator: true, lease_minutes: 10 } ) 
-        log.info( `Generated wireguard config:`, wireguard_config )
-
-        // Call the challenge-response API with the wireguard config in POST body
-        log.info( `Building solution url`, { url, response } )
-        let solution_url = new URL( url )
-        solution_url.pathname = `${ solution_url.pathname.replace( /\/$/, '' ) }/${ response }`
-        solution_url = solution_url.toString()
-        log.info( `Calling solution and offering vpn config to validator: ${ solution_url }` )
-        const solution_res = await fetch( solution_url, { 
-            method: 'POST', 
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify( { wireguard_config } )
-        } )
-        const score = await solution_res.json()
-        log.info( `Solution score reported by the validator:`, score )
-            
+
         // Send the score back to the client
-        return res.json( { ...score, response } )
+        const result = await solve_challenge( { url } )
+        return res.json( result )
 
     }
 
@@ -64,4 +81,37 @@ router.post( '/', async ( req, res ) => {
 
 } )
 
+/**
+ * Same as POST /, but streams newline delimited JSON events as the challenge is being solved so the miner neuron can
+ * relay progress to the validator: { event: 'progress', stage }, then { event: 'solved', response, ...score } or
+ * { event: 'error', error }
+ */
+router.post( '/stream', async ( req, res ) => {
+
+    // Check for request source
+    const is_local = request_is_local( req )
+    if( !is_local ) return res.status( 403 ).json( { error: 'Only local requests may call this endpoint, please read the public API documentation' } )
+
+    // Check if the url is valid
+    const { url } = req.body
+    log.info( `Received url to stream: ${ url }` )
+    if( !url ) return res.status( 400 ).send( 'No url provided' )
+    if( !url.startsWith( 'http' ) ) return res.status( 400 ).send( 'Invalid url' )
+
+    res.setHeader( 'Content-Type', 'application/x-ndjson' )
+    res.setHeader( 'Cache-Control', 'no-cache' )
+    res.flushHeaders()
+    const send_event = event => res.write( `${ JSON.stringify( event ) }\n` )
+
+    try {
+        const result = await solve_challenge( { url, on_progress: stage => send_event( { event: 'progress', stage } ) } )
+        send_event( { event: 'solved', ...result } )
+    } catch ( error ) {
+        log.error( `Error in streamed challenge-response: ${ error }` )
+        send_event( { event: 'error', error: `${ error }` } )
+    }
+    res.end()
+
+} )
+
 router.get( '/', ( req, res ) => res.send( 'Challenge-response router' ) )
\ No newline at end of file
@@ -41,4 +41,33 @@ describe(  'Challenge', () => {
 
     } )
 
+    test( 'Streams progress while solving provided challenges', { timeout: 60_000 }, async () => {
+
+        await wait_for_server_up()
+
+        // Grab a challenge and point it at the validator container
+        const challenge_res = await fetch( `${ PUBLIC_VALIDATOR_URL }/challenge/new` )
+        let { challenge_url } = await challenge_res.json()
+        challenge_url = challenge_url.replace( `localhost`, 'validator' )
+
+        // Post the challenge url to the streaming endpoint and collect the events
+        const stream_response = await fetch( 'http://localhost:3001/challenge/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify( { url: challenge_url } )
+        } )
+        expect( stream_response.headers.get( 'content-type' ) ).toContain( 'application/x-ndjson' )
+        const events = ( await stream_response.text() ).split( '\n' ).filter( Boolean ).map( line => JSON.parse( line ) )
+        console.log( `Events:`, JSON.stringify( events, null, 2 ) )
+
+        // Every stage is reported in order, followed by the score
+        const stages = events.filter( ( { event } ) => event === 'progress' ).map( ( { stage } ) => stage )
+        expect( stages ).toEqual( [ 'challenge_fetched', 'lease_acquired', 'solution_posted' ] )
+        const solved = events[ events.length - 1 ]
+        expect( solved.event ).toBe( 'solved' )
+        expect( solved ).toHaveProperty( 'response' )
+        expect( solved ).toHaveProperty( 'speed_score' )
+
+    } )
+
 } )
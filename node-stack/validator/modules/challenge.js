@@ -1,5 +1,5 @@
 import { v4 as uuidv4 } from 'uuid'
-import { get_challenge_response, mark_challenge_solved, save_challenge_response } from './database.js'
+import { bind_challenge_responses, get_challenge_response, mark_challenge_solved, save_challenge_response, save_challenge_responses } from './database.js'
 import { log } from 'mentie'
 
 /**
@@ -27,6 +27,52 @@ export async function generate_challenge( { miner_uid='unknown' }={} ) {
 
 }
 
+/**
+ * Generates one challenge and response per miner uid and saves them all to the database in a single insert.
+ *
+ * @async
+ * @function generate_challenges
+ * @param {Object} params - The input parameters.
+ * @param {string[]} params.miner_uids - The miner uids to generate challenges for.
+ * @returns {Promise<Object[]>} The generated challenges as `{ challenge, miner_uid }` objects, in the order of `miner_uids`.
+ */
+export async function generate_challenges( { miner_uids=[] }={} ) {
+
+    // Generate a challenge/response pair per miner uid
+    const entries = miner_uids.map( miner_uid => ( { challenge: uuidv4(), response: uuidv4(), miner_uid } ) )
+
+    // Log generation
+    log.info( `Generated ${ entries.length } new challenge/response pairs` )
+
+    // Save all pairs in one round trip
+    await save_challenge_responses( { entries } )
+
+    return entries.map( ( { challenge, miner_uid } ) => ( { challenge, miner_uid } ) )
+
+}
+
+/**
+ * Binds pre-generated challenges to the miners they are dispatched to. The creation time of every bound challenge is
+ * reset to now, so the time to solve is measured from dispatch and not from generation.
+ *
+ * @async
+ * @function dispatch_challenges
+ * @param {Object} params - The input parameters.
+ * @param {Object[]} params.entries - The `{ challenge, miner_uid }` pairs to bind.
+ * @returns {Promise<Object[]>} The bound challenges as `{ challenge, miner_uid }` objects, challenges that are unknown or already solved are left out.
+ */
+export async function dispatch_challenges( { entries=[] }={} ) {
+
+    // Bind all challenges in one round trip
+    const bound = await bind_challenge_responses( { entries } )
+
+    // Log binding
+    log.info( `Dispatched ${ bound.length } of ${ entries.length } challenges` )
+
+    return bound
+
+}
+
 /**
  * Validates and solves a challenge by comparing the provided response 
  * against the expected challenge response.
@@ -1,5 +1,6 @@
 import postgres from 'pg'
 import { log } from 'mentie'
+import { publish_score } from './score-events.js'
 
 // Create a connection pool to the postgres container
 const { POSTGRES_PASSWORD='setthispasswordinthedotenvfile', POSTGRES_HOST='postgres', POSTGRES_PORT=5432, POSTGRES_USER='postgres', CI_MODE } = process.env
@@ -317,6 +318,47 @@ export async function save_challenge_response( { challenge, response, miner_uid=
     return { challenge, response, miner_uid }
 }
 
+export async function save_challenge_responses( { entries=[] } ) {
+
+    // Save many challenge responses with a single multi-row insert; errors if any challenge already exists
+    if( !entries.length ) return []
+    log.info( `Saving ${ entries.length } challenge responses` )
+    const now = Date.now()
+    const values = []
+    const placeholders = entries.map( ( { challenge, response, miner_uid='unknown' }, index ) => {
+        const offset = index * 4
+        values.push( challenge, response, miner_uid, now )
+        return `($${ offset + 1 }, $${ offset + 2 }, $${ offset + 3 }, $${ offset + 4 })`
+    } )
+    await pool.query(
+        `INSERT INTO challenges (challenge, response, miner_uid, created) VALUES ${ placeholders.join( ', ' ) }`,
+        values
+    )
+    return entries
+}
+
+export async function bind_challenge_responses( { entries=[] } ) {
+
+    // Point unsolved challenges at their miner uid and restart their clock, in a single update
+    if( !entries.length ) return []
+    log.info( `Binding ${ entries.length } challenges to miner uids` )
+    const now = Date.now()
+    const values = [ now ]
+    const placeholders = entries.map( ( { challenge, miner_uid }, index ) => {
+        const offset = index * 2 + 1
+        values.push( challenge, `${ miner_uid }` )
+        return `($${ offset + 1 }, $${ offset + 2 })`
+    } )
+    const result = await pool.query(
+        `UPDATE challenges SET miner_uid = bound.miner_uid, created = $1
+        FROM ( VALUES ${ placeholders.join( ', ' ) } ) AS bound (challenge, miner_uid)
+        WHERE challenges.challenge = bound.challenge AND challenges.solved IS NULL
+        RETURNING challenges.challenge, challenges.miner_uid`,
+        values
+    )
+    return result.rows
+}
+
 export async function get_challenge_response( { challenge } ) {
     
     // Retrieve challenge response and creation time
@@ -362,6 +404,9 @@ export async function save_challenge_response_score( { correct, challenge, score
     )
     log.info( `Score saved for ${ challenge }:`, { challenge, correct, score, speed_score, uniqueness_score, country_uniqueness_score, solved_at } )
 
+    // Push the score to the neurons waiting on it
+    publish_score( { challenge, correct, score, speed_score, uniqueness_score, country_uniqueness_score, solved_at } )
+
     // TEMPORARY DEBUGGING, read the entry we just wrote
     const result = await pool.query(
         `SELECT correct, score, speed_score, uniqueness_score, country_uniqueness_score, solved_at FROM scores WHERE challenge = $1 ORDER BY solved_at ASC LIMIT 1`,
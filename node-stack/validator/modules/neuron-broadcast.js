@@ -0,0 +1,52 @@
+/**
+ * Indexes a neuron list by uid so a delta can replace single entries.
+ *
+ * @param {Object[]} neurons - Neuron entries with a `uid` property.
+ * @returns {Object[]} The entries at the index of their uid.
+ */
+export function index_neurons( neurons=[] ) {
+
+    const indexed = []
+    for( const entry of neurons ) {
+        const uid = Number( entry?.uid )
+        if( Number.isInteger( uid ) && uid >= 0 ) indexed[ uid ] = entry
+    }
+    return indexed
+
+}
+
+/**
+ * Resolves the complete neuron list a broadcast describes, given the broadcast this node already holds.
+ *
+ * Broadcasts come in three shapes:
+ * - `{ version, neurons }`: the full neuron list
+ * - `{ version, delta: { base_hash, n, changed } }`: the changed neurons on top of the version with hash `base_hash`, `n` is the new neuron count
+ * - `{ version }`: a probe asking which version this node holds
+ *
+ * @param {Object} body - The broadcast request body.
+ * @param {Object} [held] - The held broadcast as `{ version: { block, hash }, neurons }` with neurons indexed by uid.
+ * @returns {{ neurons?: Object[], mismatch?: Boolean, probe?: Boolean }} The complete neuron list, or whether the delta did not apply or the request was a probe.
+ */
+export function resolve_neuron_broadcast( body={}, held={} ) {
+
+    const { neurons, delta } = body || {}
+    const { version: held_version, neurons: held_neurons=[] } = held || {}
+
+    // Full broadcast, also what older neurons without versioning send
+    if( Array.isArray( neurons ) ) return { neurons }
+
+    // Version probe
+    if( !delta ) return { probe: true }
+
+    // A delta only applies on top of the exact version it was computed against
+    const { base_hash, n, changed=[] } = delta
+    if( !held_version?.hash || held_version.hash !== base_hash ) return { mismatch: true }
+
+    const merged = held_neurons.slice( 0, Number( n ) )
+    for( const entry of changed ) {
+        const uid = Number( entry?.uid )
+        if( Number.isInteger( uid ) && uid >= 0 && uid < Number( n ) ) merged[ uid ] = entry
+    }
+    return { neurons: merged.filter( Boolean ) }
+
+}
@@ -0,0 +1,49 @@
+import { EventEmitter } from 'events'
+import { log } from 'mentie'
+
+// Emitter that carries every saved challenge score to the subscribed neurons
+const score_events = new EventEmitter()
+
+// Every open score stream adds a listener, there is one per validator neuron connection
+score_events.setMaxListeners( 100 )
+
+/**
+ * Publishes a saved challenge score to all score stream subscribers.
+ *
+ * @param {Object} score - The saved score.
+ * @param {string} score.challenge - The challenge the score belongs to.
+ * @param {boolean} score.correct - Whether the challenge was solved correctly.
+ * @param {number} score.score - The final score.
+ * @param {number} score.speed_score - The speed component of the score.
+ * @param {number} score.uniqueness_score - The uniqueness component of the score.
+ * @param {number} score.country_uniqueness_score - The country uniqueness component of the score.
+ * @param {number} score.solved_at - The timestamp when the challenge was solved.
+ */
+export function publish_score( { challenge, correct, score, speed_score, uniqueness_score, country_uniqueness_score, solved_at } ) {
+
+    const subscribers = score_events.listenerCount( 'score' )
+    log.info( `Publishing score for ${ challenge } to ${ subscribers } subscribers` )
+    score_events.emit( 'score', {
+        challenge,
+        correct,
+        score: Number( score ),
+        speed_score: Number( speed_score ),
+        uniqueness_score: Number( uniqueness_score ),
+        country_uniqueness_score: Number( country_uniqueness_score ),
+        solved_at: Number( solved_at )
+    } )
+
+}
+
+/**
+ * Subscribes to published challenge scores.
+ *
+ * @param {Function} handler - Called with every published score.
+ * @returns {Function} Unsubscribe function.
+ */
+export function subscribe_to_scores( handler ) {
+
+    score_events.on( 'score', handler )
+    return () => score_events.off( 'score', handler )
+
+}
@@ -1,5 +1,5 @@
 import { Router } from "express"
-import { generate_challenge, solve_challenge } from "../modules/challenge.js"
+import { dispatch_challenges, generate_challenge, generate_challenges, solve_challenge } from "../modules/challenge.js"
 import { score_request_uniqueness } from "../modules/scoring.js"
 import { cache, log, make_retryable, wait } from "mentie"
 import { base_url } from "../modules/url.js"
@@ -7,9 +7,21 @@ import { validate_wireguard_config } from "../modules/wireguard.js"
 import { get_challenge_response, get_challenge_response_score, get_sma_for_miner_uid, save_challenge_response_score } from "../modules/database.js"
 import { ip_from_req, request_is_local } from "../modules/network.js"
 import { get_tpn_cache } from "../modules/caching.js"
+import { subscribe_to_scores } from "../modules/score-events.js"
 export const router = Router()
 const { CI_MODE } = process.env
 
+// Maximum amount of challenges that can be generated in one batch request
+const max_batch_size = 1024
+
+// Formulate the public challenge URL that is sent to a miner
+const make_challenge_url = ( { challenge, miner_uid } ) => {
+    const challenge_url = new URL( base_url )
+    challenge_url.pathname = `/challenge/${ challenge }`
+    challenge_url.searchParams.set( 'miner_uid', miner_uid )
+    return challenge_url.toString()
+}
+
 // Generate challenge route
 router.get( "/new", async ( req, res ) => {
 
@@ -30,10 +42,7 @@ router.get( "/new", async ( req, res ) => {
         const challenge = await generate_challenge( { miner_uid } )
 
         // Formulate public challenge URL
-        let challenge_url = new URL( base_url )
-        challenge_url.pathname = `/challenge/${ challenge }`
-        challenge_url.searchParams.set( 'miner_uid', miner_uid )
-        challenge_url = challenge_url.toString()
+        const challenge_url = make_challenge_url( { challenge, miner_uid } )
         log.info( `New challenge url generated for ${ miner_uid }: ${ challenge_url }` )
 
         return res.json( { challenge, challenge_url } )
@@ -47,6 +56,105 @@ router.get( "/new", async ( req, res ) => {
 
 } )
 
+// Generate a batch of challenges in one round trip, body: { miner_uids: [ String|Number ] }
+router.post( "/new", async ( req, res ) => {
+
+    try {
+
+        // Allow only localhost to call this route
+        if( !request_is_local( req ) ) return res.status( 403 ).json( { error: `Request not from localhost` } )
+
+        // Get miner uids from the body
+        const { miner_uids=[] } = req.body || {}
+        if( !Array.isArray( miner_uids ) || miner_uids.length == 0 ) return res.status( 400 ).json( { error: `No miner uids provided` } )
+        if( miner_uids.length > max_batch_size ) return res.status( 400 ).json( { error: `Too many miner uids, maximum is ${ max_batch_size }` } )
+
+        // If any miner uid is not \d+ format, log warning. Unbound challenges are pre-generated by the neuron with the "unknown" placeholder
+        const misformatted_uids = miner_uids.filter( miner_uid => miner_uid !== 'unknown' && !/^\d+$/.test( `${ miner_uid }` ) )
+        if( misformatted_uids.length ) log.warn( `Miner uids are not numbers, this implies the neuron is misconfigured: `, misformatted_uids )
+
+        // Generate all challenges with a single database insert
+        const generated = await generate_challenges( { miner_uids: miner_uids.map( miner_uid => `${ miner_uid }` ) } )
+        const challenges = generated.map( ( { challenge, miner_uid } ) => ( { challenge, miner_uid, challenge_url: make_challenge_url( { challenge, miner_uid } ) } ) )
+        log.info( `New batch of ${ challenges.length } challenge urls generated` )
+
+        return res.json( { challenges } )
+
+    } catch ( e ) {
+
+        log.error( e )
+        return res.status( 200 ).json( { error: e.message } )
+
+    }
+
+} )
+
+// Bind pre-generated challenges to miners right before they are sent out, body: { challenges: [ { challenge, miner_uid } ] }
+// Resets the creation time of every challenge so the time to solve does not include the time it spent in the neuron's pool
+router.post( "/dispatch", async ( req, res ) => {
+
+    try {
+
+        // Allow only localhost to call this route
+        if( !request_is_local( req ) ) return res.status( 403 ).json( { error: `Request not from localhost` } )
+
+        // Get the challenges from the body
+        const { challenges=[] } = req.body || {}
+        if( !Array.isArray( challenges ) || challenges.length == 0 ) return res.status( 400 ).json( { error: `No challenges provided` } )
+        if( challenges.length > max_batch_size ) return res.status( 400 ).json( { error: `Too many challenges, maximum is ${ max_batch_size }` } )
+
+        // If any miner uid is not \d+ format, log warning
+        const misformatted_uids = challenges.map( ( { miner_uid } ) => miner_uid ).filter( miner_uid => !/^\d+$/.test( `${ miner_uid }` ) )
+        if( misformatted_uids.length ) log.warn( `Miner uids are not numbers, this implies the neuron is misconfigured: `, misformatted_uids )
+
+        // Bind all challenges with a single database update
+        const bound = await dispatch_challenges( { entries: challenges } )
+        const dispatched = bound.map( ( { challenge, miner_uid } ) => ( { challenge, miner_uid, challenge_url: make_challenge_url( { challenge, miner_uid } ) } ) )
+        log.info( `Dispatched ${ dispatched.length } of ${ challenges.length } pooled challenges` )
+
+        return res.json( { challenges: dispatched } )
+
+    } catch ( e ) {
+
+        log.error( e )
+        return res.status( 200 ).json( { error: e.message } )
+
+    }
+
+} )
+
+// Score stream route, the validator neuron subscribes here and receives every score as soon as it is saved
+// NOTE: this route must be registered before /:challenge/:response? or it would be shadowed by it
+router.get( "/scores/stream", ( req, res ) => {
+
+    // Allow only localhost to call this route
+    if( !request_is_local( req ) ) return res.status( 403 ).json( { error: `Request not from localhost` } )
+
+    // Open a server-sent events stream
+    res.set( {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        Connection: 'keep-alive'
+    } )
+    res.flushHeaders()
+    log.info( `Score stream subscriber connected` )
+
+    // Forward every saved score to the subscriber
+    const unsubscribe = subscribe_to_scores( score => res.write( `event: score\ndata: ${ JSON.stringify( score ) }\n\n` ) )
+
+    // Send heartbeats so the subscriber can detect a dead connection
+    const heartbeat_ms = 15_000
+    const heartbeat = setInterval( () => res.write( `: heartbeat\n\n` ), heartbeat_ms )
+
+    // Clean up when the subscriber goes away
+    req.on( 'close', () => {
+        log.info( `Score stream subscriber disconnected` )
+        clearInterval( heartbeat )
+        unsubscribe()
+    } )
+
+} )
+
 // Scoring helper
 const calculate_score = ( { uniqueness_score, ms_to_solve } ) => {
 
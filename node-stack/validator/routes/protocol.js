@@ -3,12 +3,17 @@ import { cache, is_ipv4, log, make_retryable, require_props, sanetise_ipv4, sane
 import { request_is_local } from "../modules/network.js"
 import { save_balance } from "../modules/database.js"
 import { get_complete_tpn_cache, save_tpn_cache_to_disk } from "../modules/caching.js"
+import { index_neurons, resolve_neuron_broadcast } from "../modules/neuron-broadcast.js"
+import { accepted_content_types } from "../modules/columnar.js"
 import { validators_ip_fallback } from "../modules/validators.js"
 export const router = Router()
 
 /**
  * Route to handle neuron broadcasts
  * @params {Object} req.body.neurons - Array of neuron objects with properties: uid, ip, validator_trust, trust, stake, block, hotkey, coldkey, balance
+ * @params {Object} req.body.delta - Instead of neurons, the changed neurons on top of a held version: { base_hash, n, changed }
+ * @params {Object} req.body.version - The { block, hash } version of the broadcast, a body with only a version asks which version is held
+ * Neuron lists may be sent columnar, see modules/columnar.js, the server expands them before they reach this route
  */
 router.post( "/broadcast/neurons", async ( req, res ) => {
 
@@ -16,8 +21,15 @@ router.post( "/broadcast/neurons", async ( req, res ) => {
 
     const handle_route = async () => {
 
-        // Get neurons from the request
-        const { neurons=[] } = req.body || {}
+        // Resolve the complete neuron list from a full broadcast, or a delta on top of the version we hold
+        const held = cache( 'neuron_broadcast' ) || {}
+        const { version=null } = req.body || {}
+        const { neurons=[], mismatch, probe } = resolve_neuron_broadcast( req.body, held )
+        if( probe ) return res.json( { success: true, version: held.version || null, accept: accepted_content_types } )
+        if( mismatch ) {
+            log.info( `Neuron delta does not apply to held version, requesting a full broadcast. Held: `, held.version )
+            return res.json( { success: false, version_mismatch: true, version: held.version || null, accept: accepted_content_types } )
+        }
 
         // Validate that all properties are present
         let valid_entries = neurons.filter( entry => require_props( entry, [ 'uid', 'ip', 'validator_trust', 'trust', 'alpha_stake', 'stake_weight', 'block', 'hotkey', 'coldkey' ], false ) )
@@ -85,8 +97,13 @@ router.post( "/broadcast/neurons", async ( req, res ) => {
         // ///////////////////////////
         // ⚒️ Cache miners to memory
         // ///////////////////////////
+        const known_ip_to_country = cache( 'miner_ip_to_country' ) || {}
         const country_annotated_ips = await Promise.all( miners.map( async miner => {
 
+            // Miners whose ip did not change keep the country it was annotated with before
+            const known_country = known_ip_to_country[ miner.ip ]?.country
+            if( known_country && known_country != 'unknown' ) return { ...miner, country: known_country }
+
             try {
 
                 const { default: geoip } = await import( 'geoip-lite' )
@@ -194,6 +211,9 @@ router.post( "/broadcast/neurons", async ( req, res ) => {
         log.info( `Caching uid to ip mapping at key "miner_uid_to_ip":`, Object.keys( uid_to_ip ).length )
         cache( `miner_uid_to_ip`, uid_to_ip )
 
+        // Remember the broadcast version and neurons so the next broadcast can be a delta on top of them
+        cache( 'neuron_broadcast', { version, neurons: index_neurons( neurons ) } )
+
         // Persist cache to disk
         await save_tpn_cache_to_disk()
 
@@ -202,6 +222,8 @@ router.post( "/broadcast/neurons", async ( req, res ) => {
             validators: validators.length,
             miners: miners.length,
             weight_copiers: weight_copiers.length,
+            version,
+            accept: accepted_content_types,
             success: true,
         } )
 
@@ -484,6 +506,7 @@ router.post( `/broadcast/balances/miners`, async ( req, res ) => {
 
         return res.json( {
             valid_entries,
+            accept: accepted_content_types,
             success: true
         } )
 
@@ -1,11 +1,19 @@
 import express from 'express'
+import { COLUMNAR_CONTENT_TYPE, expand_columnar_body } from '../modules/columnar.js'
 import { log } from 'mentie'
 import { ip_from_req } from '../modules/network.js'
 export const app = express()
 
-// Add body parser for post requests
+// Add body parser for post requests, columnar bodies are larger broadcasts and are usually gzipped
+app.use( express.json( { type: COLUMNAR_CONTENT_TYPE, limit: '10mb' } ) )
 app.use( express.json() )
 
+// Expand columnar record lists so routes always see one object per record
+app.use( ( req, res, next ) => {
+    if( req.is( COLUMNAR_CONTENT_TYPE ) ) req.body = expand_columnar_body( req.body )
+    next()
+} )
+
 // Handle bad json body formats
 app.use( ( err, req, res, next ) => {
     const matches = [ 'body', 'JSON', 'unexpected' ]
@@ -76,3 +76,63 @@ describe( 'GET /challenge/new', () => {
     } )
 
 } )
+
+
+describe( 'POST /challenge/new', () => {
+
+    test( 'Generates one challenge per miner uid in a single request', async () => {
+
+        // Wait for the server to start
+        await wait_for_server_up()
+
+        // Make POST request with a batch of miner uids
+        const miner_uids = [ '1', '2', '3' ]
+        const response = await fetch( 'http://localhost:3000/challenge/new', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify( { miner_uids } )
+        } )
+
+        // Check if request was successful
+        expect( response.ok ).toBe( true )
+
+        // Parse body as JSON
+        const { challenges } = await response.json()
+        console.log( `Batch challenge data:`, challenges )
+
+        // Expect one challenge per miner uid, in order, each with a url bound to that miner
+        expect( challenges ).toHaveLength( miner_uids.length )
+        challenges.forEach( ( { challenge, challenge_url, miner_uid }, index ) => {
+            expect( miner_uid ).toBe( miner_uids[ index ] )
+            expect( challenge_url ).toContain( challenge )
+            expect( challenge_url ).toContain( `miner_uid=${ miner_uid }` )
+        } )
+
+        // Expect all challenges to be unique
+        expect( new Set( challenges.map( ( { challenge } ) => challenge ) ).size ).toBe( miner_uids.length )
+
+    } )
+
+} )
+
+
+describe( 'GET /challenge/scores/stream', () => {
+
+    test( 'Opens a server-sent events stream', async () => {
+
+        // Wait for the server to start
+        await wait_for_server_up()
+
+        // Open the stream and close it as soon as the headers are in
+        const controller = new AbortController()
+        const response = await fetch( 'http://localhost:3000/challenge/scores/stream', { signal: controller.signal } )
+
+        // Check if request was successful and is an event stream
+        expect( response.ok ).toBe( true )
+        expect( response.headers.get( 'content-type' ) ).toContain( 'text/event-stream' )
+
+        controller.abort()
+
+    } )
+
+} )
@@ -0,0 +1,78 @@
+"""
+Compares the per-miner overhead of querying miners one dendrite forward at a time against a single fan-out dispatch.
+
+Both paths use MockDendrite, so no network is involved and the numbers only reflect the dendrite-side overhead of
+copying, signing and scheduling each query.
+
+Usage:
+    python scripts/benchmark_fanout.py --miners 256 --rounds 5
+"""
+
+import time
+import asyncio
+import argparse
+import bittensor as bt
+
+from sybil.dendrite import fan_out_all
+from sybil.mock import MockDendrite
+from sybil.protocol import Challenge
+
+
+def make_pairs(n: int):
+    axons = [
+        bt.AxonInfo(
+            version=1,
+            ip="127.0.0.1",
+            port=8091 + i,
+            ip_type=4,
+            hotkey=bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic()).ss58_address,
+            coldkey="mock-coldkey",
+        )
+        for i in range(n)
+    ]
+    challenges = [Challenge(challenge_url=f"http://localhost/challenge/{i}", challenge=str(i)) for i in range(n)]
+    return list(zip(axons, challenges))
+
+
+async def per_miner_forward(dendrite: MockDendrite, pairs):
+    # What the validator used to do: one forward per miner, each wrapping a single axon
+    responses = await asyncio.gather(
+        *(dendrite(axons=[axon], synapse=challenge, deserialize=True, timeout=120.0) for axon, challenge in pairs)
+    )
+    return [resp[0] for resp in responses]
+
+
+async def fan_out(dendrite: MockDendrite, pairs):
+    responses = await fan_out_all(dendrite, pairs, timeout=120.0)
+    return [response.deserialize() for response in responses]
+
+
+async def bench(dendrite: MockDendrite, n: int, rounds: int):
+    results = {}
+    for name, query in (("per-miner forward", per_miner_forward), ("fan-out", fan_out)):
+        elapsed = []
+        for _ in range(rounds):
+            pairs = make_pairs(n)
+            start = time.perf_counter()
+            responses = await query(dendrite, pairs)
+            elapsed.append(time.perf_counter() - start)
+            assert responses == [challenge.challenge for _, challenge in pairs]
+        best = min(elapsed)
+        results[name] = best
+        print(f"{name:>18}: {best * 1000:8.2f} ms for {n} miners, {best / n * 1e6:8.1f} us per miner")
+
+    print(f"{'speedup':>18}: {results['per-miner forward'] / results['fan-out']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--miners", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    dendrite = MockDendrite(wallet=bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic()))
+    asyncio.run(bench(dendrite, args.miners, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Times the vectorized weight processing against the previous loop-based implementation.
+
+Both run ``process_weights_for_netuid`` followed by ``convert_weights_and_uids_for_emit``. The reference
+implementation lives in ``sybil/base/utils/weight_utils_reference.py``, the checks that both give identical outputs
+in ``tests/test_weight_utils.py``.
+
+Usage:
+    python scripts/benchmark_weights.py --rounds 5
+"""
+
+import time
+import argparse
+import numpy as np
+
+from types import SimpleNamespace
+from unittest import mock
+
+from sybil.base.consts import BURN_UID, BURN_WEIGHT
+from sybil.base.utils import weight_utils
+from sybil.base.utils.weight_utils_reference import (
+    reference_convert_weights_and_uids_for_emit,
+    reference_normalize_max_weight,
+)
+
+
+SIZES = [256, 1024, 4096, 16384, 65536]
+
+
+class StaticSubtensor:
+    """Serves the two hyperparameters process_weights_for_netuid reads from the chain."""
+
+    def min_allowed_weights(self, netuid: int) -> int:
+        return 8
+
+    def max_weight_limit(self, netuid: int) -> float:
+        return 0.05
+
+
+def run_engine(raw_weights: np.ndarray, normalize, convert):
+    n = len(raw_weights)
+    with mock.patch.object(weight_utils, "normalize_max_weight", normalize):
+        uids, weights = weight_utils.process_weights_for_netuid(
+            uids=np.arange(n),
+            weights=raw_weights,
+            netuid=1,
+            subtensor=StaticSubtensor(),
+            metagraph=SimpleNamespace(n=n),
+            burn_uid=BURN_UID,
+            burn_weight=BURN_WEIGHT,
+        )
+    return convert(uids=uids, weights=weights)
+
+
+def bench(rounds: int, seed: int):
+    rng = np.random.default_rng(seed)
+    print(f"{'n':>8} {'reference':>12} {'vectorized':>12} {'speedup':>8}")
+    for n in SIZES:
+        raw_weights = rng.random(n)
+
+        timings = {}
+        for name, normalize, convert in (
+            ("reference", reference_normalize_max_weight, reference_convert_weights_and_uids_for_emit),
+            ("vectorized", weight_utils.normalize_max_weight, weight_utils.convert_weights_and_uids_for_emit),
+        ):
+            elapsed = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                run_engine(raw_weights, normalize, convert)
+                elapsed.append(time.perf_counter() - start)
+            timings[name] = min(elapsed)
+
+        print(
+            f"{n:>8} {timings['reference'] * 1000:>10.2f}ms {timings['vectorized'] * 1000:>10.2f}ms "
+            f"{timings['reference'] / timings['vectorized']:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bench(args.rounds, args.seed)
+
+
+if __name__ == "__main__":
+    main()
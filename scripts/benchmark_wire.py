@@ -0,0 +1,121 @@
+"""
+Compares the json record encoding of neuron and balance broadcasts against the columnar encoding, with and without
+gzip.
+
+A synthetic metagraph is built for every size, with the ip and coldkey reuse typical of a subnet. Encoding is
+timed from the snapshot, so it includes building the records or columns. Every encoding is decoded again the way the
+node-stack does it (inflate, parse and expand the columns into records) and must give back exactly the json records
+before it is timed.
+
+Usage:
+    python scripts/benchmark_wire.py --rounds 5
+"""
+
+import gzip
+import json
+import time
+import argparse
+import numpy as np
+
+from types import SimpleNamespace
+
+from sybil.metagraph_snapshot import MetagraphSnapshot
+from sybil.wire import CONTENT_TYPE_COLUMNAR, CONTENT_TYPE_JSON, columnar, encode, expand
+
+
+SIZES = [256, 1024, 4096, 16384]
+
+
+def fake_metagraph(n: int, rng: np.random.Generator) -> SimpleNamespace:
+    # Miners share ips and coldkeys, roughly four neurons per coldkey and two per ip
+    coldkeys = [f"5C{i:046d}" for i in range(max(1, n // 4))]
+    ips = [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(max(1, n // 2))]
+    axons = [
+        SimpleNamespace(hotkey=f"5H{uid:046d}", coldkey=rng.choice(coldkeys), ip=rng.choice(ips))
+        for uid in range(n)
+    ]
+    trust = rng.integers(0, 65536, n) / 65535
+    return SimpleNamespace(
+        block=5_000_000,
+        axons=axons,
+        T=trust.astype(np.float32),
+        Tv=np.where(rng.random(n) < 0.05, trust, 0).astype(np.float32),
+        alpha_stake=(rng.pareto(1.5, n) * 100).astype(np.float32),
+        S=(rng.pareto(1.5, n) * 100).astype(np.float32),
+        total_stake=(rng.pareto(1.5, n) * 10).astype(np.float32),
+    )
+
+
+def balances(snapshot: MetagraphSnapshot, metagraph: SimpleNamespace) -> dict:
+    return columnar(
+        rows=len(snapshot),
+        columns={
+            "miner_uid": snapshot.uids.tolist(),
+            "hotkey": snapshot.hotkeys,
+            "balance": np.asarray(metagraph.total_stake, dtype=np.float64).tolist(),
+        },
+        constants={"block": snapshot.block},
+    )
+
+
+def decode(body: bytes, headers: dict, key: str) -> list:
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    value = json.loads(body)[key]
+    return expand(value) if headers["Content-Type"] == CONTENT_TYPE_COLUMNAR else value
+
+
+def timed(fn, rounds: int) -> float:
+    elapsed = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def bench(rounds: int, seed: int):
+    rng = np.random.default_rng(seed)
+    print(f"{'payload':>9} {'n':>6} {'encoding':>15} {'bytes':>10} {'ratio':>6} {'encode':>10} {'decode':>10}")
+    for n in SIZES:
+        metagraph = fake_metagraph(n, rng)
+        snapshot = MetagraphSnapshot.from_metagraph(metagraph)
+
+        for key, build_records, build in (
+            ("neurons", snapshot.to_records, snapshot.to_columnar),
+            ("balances", lambda: expand(balances(snapshot, metagraph)), lambda: balances(snapshot, metagraph)),
+        ):
+            records = build_records()
+            encodings = (
+                ("json", lambda: encode({key: build_records()}, CONTENT_TYPE_JSON)),
+                ("columnar", lambda: (
+                    json.dumps({key: build()}, separators=(",", ":")).encode(),
+                    {"Content-Type": CONTENT_TYPE_COLUMNAR},
+                )),
+                ("columnar+gzip", lambda: encode({key: build()}, CONTENT_TYPE_COLUMNAR)),
+            )
+            baseline = None
+            for name, encoder in encodings:
+                body, headers = encoder()
+                assert decode(body, headers, key) == records, f"{name} does not round trip for {key} at n={n}"
+                baseline = baseline or len(body)
+
+                encode_time = timed(encoder, rounds)
+                decode_time = timed(lambda: decode(body, headers, key), rounds)
+                print(
+                    f"{key:>9} {n:>6} {name:>15} {len(body):>10} {len(body) / baseline:>6.2f} "
+                    f"{encode_time * 1000:>8.2f}ms {decode_time * 1000:>8.2f}ms"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bench(args.rounds, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ import traceback
 import bittensor as bt
 
 from sybil.base.neuron import BaseNeuron
+from sybil.metagraph_snapshot import MetagraphSnapshot
 from sybil.utils.config import add_miner_args
 
 from typing import Union
@@ -195,7 +196,8 @@ class BaseMinerNeuron(BaseNeuron):
         # bt.logging.info("resync_metagraph()")
 
         # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+        self.chain.metagraph_sync(self.metagraph)
+        self.metagraph_snapshot = MetagraphSnapshot.from_metagraph(self.metagraph)
         
     def init_state(self):
         self.step = 0
@@ -24,7 +24,8 @@ from abc import ABC, abstractmethod
 
 # Sync calls set weights and also resyncs the metagraph.
 from sybil.utils.config import check_config, add_args, config
-from sybil.utils.misc import ttl_get_block
+from sybil.chain import ChainCache
+from sybil.metagraph_snapshot import MetagraphSnapshot
 from sybil import __spec_version__ as spec_version
 from sybil.mock import MockSubtensor, MockMetagraph
 
@@ -57,7 +58,7 @@ class BaseNeuron(ABC):
 
     @property
     def block(self):
-        return ttl_get_block(self)
+        return self.chain.block()
 
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
@@ -91,6 +92,12 @@ class BaseNeuron(ABC):
             self.wallet = bt.wallet(config=self.config)
             self.subtensor = bt.subtensor(config=self.config)
             self.metagraph = self.subtensor.metagraph(self.config.netuid)
+
+        # Block height, registration and hyperparameter lookups go through a cache keyed by block and epoch.
+        self.chain = ChainCache(self.subtensor, self.config.netuid)
+
+        # Columnar copy of the metagraph for the node-stack broadcasts, rebuilt on every metagraph sync.
+        self.metagraph_snapshot = MetagraphSnapshot.from_metagraph(self.metagraph)
         
         bt.logging.info(f"Wallet: {self.wallet}")
         bt.logging.info(f"Subtensor: {self.subtensor}")
@@ -135,12 +142,19 @@ class BaseNeuron(ABC):
         # Always save state.
         self.save_state()
 
+        self.log_chain_usage()
+
+    def log_chain_usage(self):
+        """Logs the chain RPCs sent and the lookups served from the cache since the last call."""
+        usage = self.chain.report()
+        bt.logging.debug(
+            f"Chain RPCs since last sync: {sum(usage['rpcs'].values())} {usage['rpcs']}, "
+            f"cache hits: {sum(usage['hits'].values())} {usage['hits']}"
+        )
+
     def check_registered(self):
         # --- Check for registration.
-        if not self.subtensor.is_hotkey_registered(
-            netuid=self.config.netuid,
-            hotkey_ss58=self.wallet.hotkey.ss58_address,
-        ):
+        if not self.chain.is_hotkey_registered(self.wallet.hotkey.ss58_address):
             bt.logging.error(
                 f"Wallet: {self.wallet} is not registered on netuid {self.config.netuid}."
                 f" Please register the hotkey using `btcli subnets register` before trying again"
@@ -1,3 +1,4 @@
+import logging
 import numpy as np
 from typing import Tuple, List, Union, Any
 import bittensor
@@ -7,6 +8,17 @@ U32_MAX = 4294967295
 U16_MAX = 65535
 
 
+def _debug_enabled() -> bool:
+    """Whether debug logs are emitted, formatting a few hundred weights for a dropped log costs milliseconds."""
+    return bittensor.logging.get_level() <= logging.DEBUG
+
+
+def _debug(*args):
+    """Logs at debug level, the arguments are only formatted when debug logging is on."""
+    if _debug_enabled():
+        bittensor.logging.debug(*args)
+
+
 def normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
     r"""Normalizes the numpy array x so that sum(x) = 1 and the max value is not greater than the limit.
     Args:
@@ -34,10 +46,10 @@ def normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
         # Find the cumulative sum and sorted array
         cumsum = np.cumsum(estimation, 0)
 
-        # Determine the index of cutoff
-        estimation_sum = np.array(
-            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
-        )
+        # Determine the index of cutoff. The multipliers are cast to the dtype of the estimation so the products
+        # match an element-wise Python scalar multiplication exactly.
+        multipliers = np.arange(len(values) - 1, -1, -1).astype(estimation.dtype)
+        estimation_sum = multipliers * estimation
         n_values = (
             estimation / (estimation_sum + cumsum + epsilon) < limit
         ).sum()
@@ -80,10 +92,12 @@ def convert_weights_and_uids_for_emit(
     non_zero_weight_uids = uids[weights > 0]
 
     # Debugging information
-    bittensor.logging.debug(f"weights: {weights}")
-    bittensor.logging.debug(f"non_zero_weights: {non_zero_weights}")
-    bittensor.logging.debug(f"uids: {uids}")
-    bittensor.logging.debug(f"non_zero_weight_uids: {non_zero_weight_uids}")
+    debug = _debug_enabled()
+    if debug:
+        bittensor.logging.debug(f"weights: {weights}")
+        bittensor.logging.debug(f"non_zero_weights: {non_zero_weights}")
+        bittensor.logging.debug(f"uids: {uids}")
+        bittensor.logging.debug(f"non_zero_weight_uids: {non_zero_weight_uids}")
 
     if np.min(weights) < 0:
         raise ValueError(
@@ -106,28 +120,52 @@ def convert_weights_and_uids_for_emit(
         return [], []  # Nothing to set on chain.
     else:
         max_weight = float(np.max(weights))
-        weights = [
-            float(value) / max_weight for value in weights
-        ]  # max-upscale values (max_weight = 1).
-        bittensor.logging.debug(
-            f"setting on chain max: {max_weight} and weights: {weights}"
-        )
+        # max-upscale values (max_weight = 1), in float64 like Python floats.
+        weights = weights.astype(np.float64) / max_weight
+        if debug:
+            bittensor.logging.debug(
+                f"setting on chain max: {max_weight} and weights: {weights}"
+            )
 
-    weight_vals = []
-    weight_uids = []
-    for i, (weight_i, uid_i) in enumerate(list(zip(weights, uids))):
-        uint16_val = round(
-            float(weight_i) * int(U16_MAX)
-        )  # convert to int representation.
-
-        # Filter zeros
-        if uint16_val != 0:  # Filter zeros
-            weight_vals.append(uint16_val)
-            weight_uids.append(uid_i)
-    bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
+    # Convert to int representation, np.rint rounds half to even like Python's round().
+    uint16_vals = np.rint(weights * int(U16_MAX)).astype(np.int64)
+
+    # Filter zeros
+    keep = uint16_vals != 0
+    weight_vals = uint16_vals[keep].tolist()
+    weight_uids = uids[keep].tolist()
+    if debug:
+        bittensor.logging.debug(f"final params: {weight_uids} : {weight_vals}")
     return weight_uids, weight_vals
 
 
+def emitted_weights_distance(
+    uids_a: List[int], weights_a: List[int], uids_b: List[int], weights_b: List[int]
+) -> float:
+    r"""L1 distance between two emitted weight vectors, each normalized to sum to one.
+    Args:
+        uids_a (List[int]):
+            Uids of the first vector.
+        weights_a (List[int]):
+            uint16 weights of the first vector.
+        uids_b (List[int]):
+            Uids of the second vector.
+        weights_b (List[int]):
+            uint16 weights of the second vector.
+    Returns:
+        distance (float):
+            The L1 distance, between 0 for identical and 2 for disjoint weight vectors.
+    """
+    n = max(max(uids_a, default=-1), max(uids_b, default=-1)) + 1
+    dense = []
+    for uids, weights in ((uids_a, weights_a), (uids_b, weights_b)):
+        vector = np.zeros(n, dtype=np.float64)
+        vector[np.asarray(uids, dtype=np.int64)] = weights
+        total = vector.sum()
+        dense.append(vector / total if total > 0 else vector)
+    return float(np.abs(dense[0] - dense[1]).sum())
+
+
 def process_weights_for_netuid(
     uids,
     weights: np.ndarray,
@@ -151,13 +189,13 @@ def process_weights_for_netuid(
     tuple[ndarray[Any, dtype[Any]], ndarray],
     tuple[Any, ndarray],
 ]:
-    bittensor.logging.debug("process_weights_for_netuid()")
-    bittensor.logging.debug("weights", weights)
-    bittensor.logging.debug("netuid", netuid)
-    bittensor.logging.debug("subtensor", subtensor)
-    bittensor.logging.debug("metagraph", metagraph)
-    bittensor.logging.debug("burn_uid", burn_uid)
-    bittensor.logging.debug("burn_weight", burn_weight)
+    _debug("process_weights_for_netuid()")
+    _debug("weights", weights)
+    _debug("netuid", netuid)
+    _debug("subtensor", subtensor)
+    _debug("metagraph", metagraph)
+    _debug("burn_uid", burn_uid)
+    _debug("burn_weight", burn_weight)
 
     # Get latest metagraph from chain if metagraph is None.
     if metagraph is None:
@@ -167,9 +205,9 @@ def process_weights_for_netuid(
         # check if uids contains burn_uid and get index
         burn_idx = np.where(uids == burn_uid)[0]
         if len(burn_idx) == 0:
-            bittensor.logging.debug(f"Burn uid {burn_uid} not found in uids")
+            _debug(f"Burn uid {burn_uid} not found in uids")
         else:
-            bittensor.logging.debug(f"Burn uid {burn_uid} found in uids. Removing from uids and weights.")
+            _debug(f"Burn uid {burn_uid} found in uids. Removing from uids and weights.")
             # remove burn_uid from uids and weights
             uids = np.delete(uids, burn_idx)
             weights = np.delete(weights, burn_idx)
@@ -183,9 +221,9 @@ def process_weights_for_netuid(
     quantile = exclude_quantile / U16_MAX
     min_allowed_weights = subtensor.min_allowed_weights(netuid=netuid)
     max_weight_limit = subtensor.max_weight_limit(netuid=netuid)
-    bittensor.logging.debug("quantile", quantile)
-    bittensor.logging.debug("min_allowed_weights", min_allowed_weights)
-    bittensor.logging.debug("max_weight_limit", max_weight_limit)
+    _debug("quantile", quantile)
+    _debug("min_allowed_weights", min_allowed_weights)
+    _debug("max_weight_limit", max_weight_limit)
 
     # Find all non zero weights.
     non_zero_weight_idx = np.argwhere(weights > 0).squeeze()
@@ -198,10 +236,10 @@ def process_weights_for_netuid(
         if burn_uid is not None:
             final_weights = np.ones(metagraph.n) / (metagraph.n - 1) * (1 - burn_weight)
             final_weights[burn_uid] = burn_weight
-            bittensor.logging.debug("final_weights", final_weights)
+            _debug("final_weights", final_weights)
         else:
             final_weights = np.ones(metagraph.n) / metagraph.n
-            bittensor.logging.debug("final_weights", final_weights)
+            _debug("final_weights", final_weights)
         return np.arange(len(final_weights)), final_weights
 
     elif non_zero_weights.size < min_allowed_weights:
@@ -212,20 +250,20 @@ def process_weights_for_netuid(
             np.ones(metagraph.n) * 1e-5
         )  # creating minimum even non-zero weights
         weights[non_zero_weight_idx] += non_zero_weights
-        bittensor.logging.debug("final_weights", weights)
+        _debug("final_weights", weights)
         normalized_weights = normalize_max_weight(
             x=weights, limit=max_weight_limit
         )
         if burn_uid is not None:
             final_weights = normalized_weights * (1 - burn_weight)
             final_weights[burn_uid] = burn_weight
-            bittensor.logging.debug("final_weights", final_weights)
+            _debug("final_weights", final_weights)
         else:
             final_weights = normalized_weights
-            bittensor.logging.debug("final_weights", final_weights)
+            _debug("final_weights", final_weights)
         return np.arange(len(final_weights)), final_weights
 
-    bittensor.logging.debug("non_zero_weights", non_zero_weights)
+    _debug("non_zero_weights", non_zero_weights)
 
     # Compute the exclude quantile and find the weights in the lowest quantile
     max_exclude = max(0, len(non_zero_weights) - min_allowed_weights) / len(
@@ -233,17 +271,17 @@ def process_weights_for_netuid(
     )
     exclude_quantile = min([quantile, max_exclude])
     lowest_quantile = np.quantile(non_zero_weights, exclude_quantile)
-    bittensor.logging.debug("max_exclude", max_exclude)
-    bittensor.logging.debug("exclude_quantile", exclude_quantile)
-    bittensor.logging.debug("lowest_quantile", lowest_quantile)
+    _debug("max_exclude", max_exclude)
+    _debug("exclude_quantile", exclude_quantile)
+    _debug("lowest_quantile", lowest_quantile)
 
     # Exclude all weights below the allowed quantile.
     non_zero_weight_uids = non_zero_weight_uids[
         lowest_quantile <= non_zero_weights
     ]
     non_zero_weights = non_zero_weights[lowest_quantile <= non_zero_weights]
-    bittensor.logging.debug("non_zero_weight_uids", non_zero_weight_uids)
-    bittensor.logging.debug("non_zero_weights", non_zero_weights)
+    _debug("non_zero_weight_uids", non_zero_weight_uids)
+    _debug("non_zero_weights", non_zero_weights)
 
     # Normalize weights and return.
     normalized_weights = normalize_max_weight(
@@ -253,10 +291,10 @@ def process_weights_for_netuid(
         final_weights = normalized_weights * (1 - burn_weight)
         final_weights = np.append(final_weights, burn_weight)
         final_weight_uids = np.append(non_zero_weight_uids, burn_uid)
-        bittensor.logging.debug("final_weights", final_weights)
+        _debug("final_weights", final_weights)
     else:
         final_weights = normalized_weights
         final_weight_uids = non_zero_weight_uids
-    bittensor.logging.debug("final_weights", final_weights)
+    _debug("final_weights", final_weights)
 
     return final_weight_uids, final_weights
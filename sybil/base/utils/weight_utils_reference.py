@@ -0,0 +1,72 @@
+"""
+The loop-based weight processing the vectorized functions in :mod:`sybil.base.utils.weight_utils` replaced, kept
+verbatim (minus their debug logging). The tests check the two give identical outputs, and
+``scripts/benchmark_weights.py`` times them against each other.
+"""
+
+import numpy as np
+
+from sybil.base.utils.weight_utils import U16_MAX
+
+
+def reference_normalize_max_weight(x: np.ndarray, limit: float = 0.1) -> np.ndarray:
+    """Loop-based :func:`~sybil.base.utils.weight_utils.normalize_max_weight`."""
+    epsilon = 1e-7
+
+    weights = x.copy()
+    values = np.sort(weights)
+
+    if x.sum() == 0 or len(x) * limit <= 1:
+        return np.ones_like(x) / x.size
+    else:
+        estimation = values / values.sum()
+
+        if estimation.max() <= limit:
+            return weights / weights.sum()
+
+        cumsum = np.cumsum(estimation, 0)
+
+        estimation_sum = np.array(
+            [(len(values) - i - 1) * estimation[i] for i in range(len(values))]
+        )
+        n_values = (
+            estimation / (estimation_sum + cumsum + epsilon) < limit
+        ).sum()
+
+        cutoff_scale = (limit * cumsum[n_values - 1] - epsilon) / (
+            1 - (limit * (len(estimation) - n_values))
+        )
+        cutoff = cutoff_scale * values.sum()
+
+        weights[weights > cutoff] = cutoff
+
+        y = weights / weights.sum()
+
+        return y
+
+
+def reference_convert_weights_and_uids_for_emit(uids: np.ndarray, weights: np.ndarray):
+    """Loop-based :func:`~sybil.base.utils.weight_utils.convert_weights_and_uids_for_emit`."""
+    uids = np.asarray(uids)
+    weights = np.asarray(weights)
+
+    if np.min(weights) < 0:
+        raise ValueError("Passed weight is negative cannot exist on chain {}".format(weights))
+    if np.min(uids) < 0:
+        raise ValueError("Passed uid is negative cannot exist on chain {}".format(uids))
+    if len(uids) != len(weights):
+        raise ValueError("Passed weights and uids must have the same length")
+    if np.sum(weights) == 0:
+        return [], []
+    else:
+        max_weight = float(np.max(weights))
+        weights = [float(value) / max_weight for value in weights]
+
+    weight_vals = []
+    weight_uids = []
+    for i, (weight_i, uid_i) in enumerate(list(zip(weights, uids))):
+        uint16_val = round(float(weight_i) * int(U16_MAX))
+        if uint16_val != 0:
+            weight_vals.append(uint16_val)
+            weight_uids.append(uid_i)
+    return weight_uids, weight_vals
@@ -24,21 +24,41 @@ import asyncio
 import argparse
 import threading
 import bittensor as bt
-import requests
 import os
 
-from typing import List, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Union
 from traceback import print_exception
 
 from sybil.base.neuron import BaseNeuron
 from sybil.base.utils.weight_utils import (
     process_weights_for_netuid,
     convert_weights_and_uids_for_emit,
+    emitted_weights_distance,
 )  # TODO: Replace when bittensor switches to numpy
 from sybil.mock import MockDendrite
+from sybil.dendrite import PooledDendrite
+from sybil.validator.client import ValidatorServerClient
+from sybil.validator.score_stream import ScoreStream
+from sybil.validator.challenge_pool import ChallengePool
+from sybil.validator.latency import LatencyTracker
+from sybil.validator.concurrency import AIMDLimiter
+from sybil.validator.scheduler import MinerScheduler
+from sybil.validator.metagraph_index import MetagraphIndex
+from sybil.validator.metagraph_diff import MetagraphFingerprint
+from sybil.metagraph_snapshot import MetagraphSnapshot
+from sybil.broadcast import NeuronBroadcaster
+from sybil.validator.broadcast_queue import BroadcastQueue
+from sybil.validator.checkpoint import CheckpointWriter, pack_hotkeys, unpack_hotkeys
+from sybil.wire import CONTENT_TYPE_COLUMNAR, CONTENT_TYPE_JSON, columnar, expand
+from sybil.validator.pipeline import QueryPacer
+from sybil.validator.weight_submitter import WeightSubmission, WeightSubmitter
 from sybil.utils.config import add_validator_args
 from sybil.base.consts import BURN_UID, BURN_WEIGHT
 
+# Arrays every checkpoint holds, older checkpoints may lack the last weights
+STATE_KEYS = ("step", "scores", "hotkeys")
+
 class BaseValidatorNeuron(BaseNeuron):
     """
     Base class for Bittensor validators. Your validator should inherit from this class.
@@ -54,16 +74,100 @@ class BaseValidatorNeuron(BaseNeuron):
     def __init__(self, config=None):
         super().__init__(config=config)
 
+        # Guards scores and hotkeys, which are touched from the event loop and from the executors.
+        self.state_lock = threading.Lock()
+
         # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.hotkeys = list(self.metagraph.hotkeys)
 
         # Dendrite lets us send messages to other nodes (axons) in the network.
         if self.config.mock:
             self.dendrite = MockDendrite(wallet=self.wallet)
+        elif self.config.neuron.pooled_dendrite:
+            self.dendrite = PooledDendrite(
+                wallet=self.wallet,
+                pool_size=self.config.neuron.axon_pool_size,
+                keepalive_timeout=self.config.neuron.axon_keepalive,
+            )
         else:
             self.dendrite = bt.dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
+        # Shared, pooled client for every call to the validator server.
+        self.validator_server = ValidatorServerClient(
+            self.validator_server_url,
+            max_connections=self.config.validator_server.max_connections,
+            max_concurrency=self.config.validator_server.max_concurrency,
+        )
+
+        # The metagraph is broadcast to the validator server versioned, only changes are sent.
+        self.neuron_broadcaster = NeuronBroadcaster(
+            lambda payload, content_type: self.validator_server.post_encoded(
+                "/protocol/broadcast/neurons", "broadcast", payload, content_type
+            )
+        )
+
+        # Balances are posted from a background queue, resyncs only hand over the newest snapshot.
+        self.balance_queue = BroadcastQueue(
+            "balances",
+            self.post_balances,
+            timeout=self.config.neuron.broadcast_timeout,
+            max_retries=self.config.neuron.broadcast_max_retries,
+        )
+
+        # Scores are pushed by the validator server as soon as they are saved.
+        self.score_stream = ScoreStream(self.validator_server)
+
+        # Challenges are generated ahead of time so dispatching a batch never waits on the validator server.
+        self.challenge_pool = ChallengePool(
+            self.validator_server,
+            size=self.config.neuron.challenge_pool_size,
+            ttl=self.config.neuron.challenge_ttl,
+            dispatch_margin=self.config.neuron.timeout,
+        )
+
+        # Miners are queried continuously, the ones scored longest ago first, at a steady rate. The query rate and the
+        # concurrency bounds below are set per forward pipeline, the pipelines share one pacer and one limiter scaled
+        # by their number, so adding pipelines adds throughput.
+        pipelines = max(1, self.config.neuron.num_concurrent_forwards)
+        self.scheduler = MinerScheduler()
+        self.query_pacer = QueryPacer(self.config.neuron.query_rate * pipelines)
+
+        # Per-miner query timeouts follow each miner's recent response times.
+        self.latency = LatencyTracker(
+            default_timeout=self.config.neuron.timeout,
+            min_timeout=self.config.neuron.min_timeout,
+            percentile=self.config.neuron.timeout_percentile,
+            margin=self.config.neuron.timeout_margin,
+        )
+
+        # Miner queries in flight grow while things stay healthy and back off when the validator saturates.
+        self.concurrency = AIMDLimiter(
+            initial_limit=self.config.neuron.sample_size * pipelines,
+            min_limit=self.config.neuron.min_concurrency * pipelines,
+            max_limit=self.config.neuron.max_concurrency * pipelines,
+            server_errors=lambda: sum(self.validator_server.errors.values()),
+        )
+
+        # Weights are set from a background thread with its own chain connection, the mock subtensor is shared.
+        self.weight_submitter = WeightSubmitter(
+            subtensor_factory=(lambda: self.subtensor) if self.config.mock else (lambda: bt.subtensor(config=self.config)),
+            wallet=self.wallet,
+            netuid=self.config.netuid,
+            version_key=self.spec_version,
+            max_backoff_blocks=self.config.neuron.weights_max_backoff,
+            on_included=self.record_included_weights,
+        )
+
+        # Block of the last weights that were computed but skipped, they are not computed again for an epoch.
+        self.last_weights_check_block = -1
+
+        # Ip and hotkey lookups over the metagraph, kept up to date by resync_metagraph.
+        self.metagraph_index = MetagraphIndex(self.metagraph)
+
+        # Hotkeys and axons of the last synced metagraph, resyncs only act on what changed since.
+        self.metagraph_fingerprint = MetagraphFingerprint.from_metagraph(self.metagraph)
+
         # Init sync with the network. Updates the metagraph.
         self.resync_metagraph()
         bt.logging.info(f"===> Resynced metagraph: {self.step}, {len(self.scores)}, {len(self.hotkeys)}")
@@ -78,6 +182,10 @@ class BaseValidatorNeuron(BaseNeuron):
         # Create asyncio event loop to manage async tasks.
         self.loop = asyncio.get_event_loop()
 
+        # Blocking work is pushed off the event loop. Chain calls share a single worker because the
+        # subtensor websocket is not safe to use from several threads at once. Checkpoints have their own writer.
+        self.chain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="validator-chain")
+
         # Instantiate runners
         self.should_exit: bool = False
         self.is_running: bool = False
@@ -110,30 +218,107 @@ class BaseValidatorNeuron(BaseNeuron):
             pass
 
     async def concurrent_forward(self):
-        coroutines = [
-            self.forward()
-            for _ in range(self.config.neuron.num_concurrent_forwards)
-        ]
-        await asyncio.gather(*coroutines)
+        # Concurrency is handled inside forward, which splits one round of miners across
+        # neuron.num_concurrent_forwards pipelines instead of running duplicate rounds.
+        await self.forward()
+
+    async def run_blocking(self, executor: ThreadPoolExecutor, fn: Callable, *args):
+        """Runs a blocking call on the given executor without stalling the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    async def supervise(self, name: str, step: Callable[[], Awaitable], interval: float):
+        """
+        Runs ``step`` repeatedly until the validator exits, sleeping ``interval`` seconds between runs.
+        Errors are logged and the task keeps going, so one failing task never takes down the others.
+        """
+        while not self.should_exit:
+            try:
+                await step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                bt.logging.error(f"Error in {name} task: {str(err)}")
+                bt.logging.debug(
+                    str(print_exception(type(err), err, err.__traceback__))
+                )
+            await asyncio.sleep(interval)
+
+    async def forward_step(self):
+        """Runs one sweep of forwards and advances the step counter."""
+        bt.logging.info(f"step({self.step})")
+        await self.concurrent_forward()
+        self.step += 1
+
+    async def sync_step(self):
+        """Checks registration and resyncs the metagraph when an epoch has passed."""
+        await self.run_blocking(self.chain_executor, self.check_registered)
+        if await self.run_blocking(self.chain_executor, self.should_sync_metagraph):
+            await self.run_blocking(self.chain_executor, self.resync_metagraph)
+        self.log_chain_usage()
+
+    async def weights_step(self):
+        """Sets weights on chain when an epoch has passed."""
+        # Wait for the previous weights to land, and do not resend them before the metagraph shows the update.
+        if self.weight_submitter.busy:
+            return
+        block = await self.run_blocking(self.chain_executor, self.chain.block)
+        if self.last_weights_block >= 0 and block - self.last_weights_block <= self.config.neuron.epoch_length:
+            return
+        if self.last_weights_check_block >= 0 and block - self.last_weights_check_block <= self.config.neuron.epoch_length:
+            return
+        if await self.run_blocking(self.chain_executor, self.should_set_weights):
+            await self.run_blocking(self.chain_executor, self.set_weights)
+
+    async def save_step(self):
+        """Persists the validator state to disk, the checkpoint is written in the background."""
+        self.save_state()
+
+    async def run_async(self):
+        """
+        Runs the forward sweeps, metagraph sync, weight setting and persistence as concurrent supervised tasks
+        on a single event loop.
+        """
+        interval = self.config.neuron.sync_interval
+        self.score_stream.start()
+        self.challenge_pool.start()
+        self.weight_submitter.start()
+        self.balance_queue.start()
+        try:
+            await asyncio.gather(
+                self.supervise("forward", self.forward_step, 0),
+                self.supervise("sync", self.sync_step, interval),
+                self.supervise("weights", self.weights_step, interval),
+                self.supervise("save", self.save_step, interval),
+            )
+        finally:
+            # Write the latest scores before shutting down.
+            self.save_state()
+            await asyncio.to_thread(self.checkpoints.flush)
+            self.weight_submitter.stop()
+            await self.balance_queue.stop()
+            await self.challenge_pool.stop()
+            await self.score_stream.stop()
+            await self.validator_server.close()
 
     def run(self):
         """
-        Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
+        Initiates and manages the main loop for the validator on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
 
         This function performs the following primary tasks:
         1. Check for registration on the Bittensor network.
         2. Continuously forwards queries to the miners on the network, rewarding their responses and updating the scores accordingly.
         3. Periodically resynchronizes with the chain; updating the metagraph with the latest network state and setting weights.
 
-        The essence of the validator's operations is in the forward function, which is called every step. The forward function is responsible for querying the network and scoring the responses.
+        The forward sweeps and the chain syncing run as separate tasks on one long-lived event loop. Blocking chain and
+        disk calls are pushed to executors so a slow chain endpoint never pauses miner querying.
 
         Note:
-            - The function leverages the global configurations set during the initialization of the miner.
-            - The miner's axon serves as its interface to the Bittensor network, handling incoming and outgoing requests.
+            - The function leverages the global configurations set during the initialization of the validator.
+            - The validator's axon serves as its interface to the Bittensor network, handling incoming and outgoing requests.
 
         Raises:
-            KeyboardInterrupt: If the miner is stopped by a manual interruption.
-            Exception: For unforeseen errors during the miner's operation, which are logged for diagnosis.
+            KeyboardInterrupt: If the validator is stopped by a manual interruption.
+            Exception: For unforeseen errors during the validator's operation, which are logged for diagnosis.
         """
 
         # Check that validator is registered on the network.
@@ -143,24 +328,14 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # This loop maintains the validator's operations until intentionally stopped.
         try:
-            while True:
-                bt.logging.info(f"step({self.step}) block({self.block})")
-
-                # Run multiple forwards concurrently.
-                self.loop.run_until_complete(self.concurrent_forward())
-
-                # Check if we should exit.
-                if self.should_exit:
-                    break
-
-                # Sync metagraph and potentially set weights.
-                self.sync()
-
-                self.step += 1
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.run_async())
 
         # If someone intentionally stops the validator, it'll safely terminate operations.
         except KeyboardInterrupt:
             self.axon.stop()
+            self.save_final_state()
             bt.logging.success("Validator killed by keyboard interrupt.")
             exit()
 
@@ -192,9 +367,19 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.save_final_state()
             self.is_running = False
             bt.logging.debug("Stopped")
 
+    def save_final_state(self):
+        """
+        Saves the latest state and waits, without a timeout, until the checkpoint writer has put it on disk.
+        The run thread is a daemon thread and may still be busy or already gone when the validator stops, so the
+        final checkpoint is written from the stopping thread instead of relying on the run loop to flush it.
+        """
+        self.save_state()
+        self.checkpoints.flush()
+
     def __enter__(self):
         self.run_in_background_thread()
         return self
@@ -216,6 +401,7 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.save_final_state()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -224,8 +410,12 @@ class BaseValidatorNeuron(BaseNeuron):
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
         """
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if np.isnan(self.scores).any():
+        # Work on a snapshot of the scores, forwards keep updating them while weights are being set.
+        with self.state_lock:
+            scores = self.scores.copy()
+
+        # Check if scores contains any NaN values and log a warning if it does.
+        if np.isnan(scores).any():
             bt.logging.warning(
                 f"Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
@@ -233,14 +423,14 @@ class BaseValidatorNeuron(BaseNeuron):
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
         # Compute the norm of the scores
-        norm = np.linalg.norm(self.scores, ord=1, axis=0, keepdims=True)
+        norm = np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
 
         # Check if the norm is zero or contains NaN values
         if np.any(norm == 0) or np.isnan(norm).any():
             norm = np.ones_like(norm)  # Avoid division by zero or NaN
 
         # Compute raw_weights safely
-        raw_weights = self.scores / norm
+        raw_weights = scores / norm
 
         bt.logging.debug("raw_weights", raw_weights)
         bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
@@ -252,7 +442,7 @@ class BaseValidatorNeuron(BaseNeuron):
             uids=self.metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
-            subtensor=self.subtensor,
+            subtensor=self.chain,
             metagraph=self.metagraph,
             burn_uid=BURN_UID,
             burn_weight=BURN_WEIGHT,
@@ -270,81 +460,108 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.debug("uint_weights", uint_weights)
         bt.logging.debug("uint_uids", uint_uids)
 
-        # Set the weights on chain via our subtensor connection.
-        # Retry 20 times if it fails
-        for _ in range(20):
-            result, msg = self.subtensor.set_weights(
-                wallet=self.wallet,
-                netuid=self.config.netuid,
-                uids=uint_uids,
-                weights=uint_weights,
-                wait_for_finalization=False,
-                wait_for_inclusion=False,
-                version_key=self.spec_version,
-            )
-            if result is True:
-                bt.logging.info("set_weights on chain successfully!")
-                break
-            else:
-                bt.logging.error("set_weights failed. Retrying... ", msg)
+        # Skip an extrinsic that would barely move the weights on chain, unless they are getting stale.
+        with self.state_lock:
+            last_uids, last_weights, last_block = self.last_weight_uids, self.last_weight_values, self.last_weights_block
+        if last_block >= 0:
+            distance = emitted_weights_distance(uint_uids, uint_weights, last_uids.tolist(), last_weights.tolist())
+            block = self.block
+            age = block - last_block
+            if distance < self.config.neuron.weights_change_threshold and age < self.config.neuron.weights_max_staleness:
+                bt.logging.info(
+                    f"Skipping set_weights, weights moved by {distance:.4f} since block {last_block} ({age} blocks ago)"
+                )
+                self.last_weights_check_block = block
+                return
+
+        # Hand the weights to the background submitter, it retries with backoff until they are included.
+        self.weight_submitter.submit(uint_uids, uint_weights)
+        bt.logging.info(f"Queued weights for {len(uint_uids)} uids, submitter: {self.weight_submitter.stats()}")
+
+    def record_included_weights(self, submission: WeightSubmission, block: int):
+        """Remembers the weights that made it on chain, they are the baseline for skipping unchanged weights."""
+        with self.state_lock:
+            self.last_weight_uids = np.array(submission.uids, dtype=np.int64)
+            self.last_weight_values = np.array(submission.weights, dtype=np.int64)
+            self.last_weights_block = block
 
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.info("resync_metagraph()")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
-
-        # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+        # Sync a copy and diff it against the fingerprint of the previous sync. Forwards keep reading the current
+        # metagraph on the event loop, the copy only replaces it once it is complete.
+        metagraph = copy.copy(self.metagraph)
+        self.chain.metagraph_sync(metagraph)
+        self.metagraph_snapshot = MetagraphSnapshot.from_metagraph(metagraph)
+        fingerprint = MetagraphFingerprint.from_metagraph(metagraph)
+        diff = fingerprint.diff(self.metagraph_fingerprint)
+        self.metagraph_fingerprint = fingerprint
 
         bt.logging.info(
-            "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
+            f"Metagraph updated ({diff}), re-syncing hotkeys, dendrite pool and moving averages"
         )
-        # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
-
-        # Check to see if the metagraph has changed size.
-        # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys) or len(self.scores) < len(self.metagraph.hotkeys):
-            # Update the size of the moving average scores.
-            new_moving_average = np.zeros((self.metagraph.n))
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
-
-        # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        with self.state_lock:
+            # Zero out all hotkeys that have been replaced.
+            self.scores[diff.replaced[diff.replaced < len(self.scores)]] = 0
+
+            # Check to see if the metagraph has changed size.
+            # If so, we need to add new hotkeys and moving averages.
+            if len(self.hotkeys) < len(metagraph.hotkeys) or len(self.scores) < len(metagraph.hotkeys):
+                # Update the size of the moving average scores.
+                new_moving_average = np.zeros((metagraph.n))
+                min_len = min(len(self.hotkeys), len(self.scores))
+                new_moving_average[:min_len] = self.scores[:min_len]
+                self.scores = new_moving_average
+
+            # Update the hotkeys.
+            self.hotkeys = list(metagraph.hotkeys)
         
+        # Only re-index the uids whose axon or hotkey changed.
+        if diff.changed.size or diff.removed.size:
+            self.metagraph_index.update(metagraph, diff.changed.tolist())
+
+        # Pooled connections to axons that moved, changed hands or left must not be reused.
+        if isinstance(self.dendrite, PooledDendrite):
+            stale = np.union1d(np.union1d(diff.replaced, diff.moved), diff.removed)
+            self.dendrite.mark_stale([self.metagraph.axons[uid] for uid in stale.tolist()])
+
+        # Swap in the synced metagraph, a single reference assignment the event loop sees whole.
+        self.metagraph = metagraph
+
         # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        if not diff.axons_changed:
             return
-        
-        # Get balances from the database
-        neurons: List[bt.NeuronInfo] = self.metagraph.neurons
-        balances = [
-            {
-                "block": self.block,
-                "miner_uid": neuron.uid,
-                "hotkey": neuron.hotkey,
-                "balance": neuron.total_stake,
-            } for neuron in neurons
-        ]
 
-        try:
-            with requests.post(
-                f"{self.validator_server_url}/protocol/broadcast/balances/miners",
-                json={"balances": balances}
-            ) as resp:
-                result = resp.json()
-                if result["success"]:
-                    bt.logging.info(f"Broadcasted balances: {len(balances)} balances")
-                else:
-                    bt.logging.error(f"Failed to broadcast balances")
-        except Exception as e:
-            bt.logging.error(f"Failed to broadcast balances: {e}")
+        # Hand the balances to the broadcast queue, a slow validator server must not hold up the resync.
+        snapshot = self.metagraph_snapshot
+        self.balance_queue.submit(columnar(
+            rows=len(snapshot),
+            columns={
+                "miner_uid": snapshot.uids.tolist(),
+                "hotkey": snapshot.hotkeys,
+                "balance": np.asarray(metagraph.total_stake, dtype=np.float64).tolist(),
+            },
+            constants={"block": snapshot.block},
+        ))
+
+    async def post_balances(self, balances: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Posts balances to the validator server, as columns once it accepted columnar neuron broadcasts.
+
+        Args:
+            balances (Dict[str, Any]): The balance of every uid as a columnar record list.
+
+        Returns:
+            Dict[str, Any]: The decoded json response.
+        """
+        if self.neuron_broadcaster.compact:
+            payload, content_type = {"balances": balances}, CONTENT_TYPE_COLUMNAR
+        else:
+            payload, content_type = {"balances": expand(balances)}, CONTENT_TYPE_JSON
+        return await self.validator_server.post_encoded(
+            "/protocol/broadcast/balances/miners", "balances", payload, content_type
+        )
 
     def update_scores(self, rewards: np.ndarray, uids: List[int]):
         """Performs exponential moving average on the scores based on the rewards received from the miners."""
@@ -379,57 +596,79 @@ class BaseValidatorNeuron(BaseNeuron):
                 f"cannot be broadcast to uids array of shape {uids_array.shape}"
             )
 
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        scattered_rewards: np.ndarray = np.zeros_like(self.scores)
+        # Scores may be resized by a metagraph resync running on the chain executor.
+        with self.state_lock:
+            # Drop uids the scores do not cover (yet), e.g. right after the metagraph grew.
+            in_range = uids_array < len(self.scores)
+            uids_array, rewards = uids_array[in_range], rewards[in_range]
 
-        bt.logging.info(f"Scores: {len(self.scores)}")
-        bt.logging.info(f"Scattered rewards: {len(scattered_rewards)}")
-        bt.logging.info(f"Uids array: {len(uids_array)}")
-        bt.logging.info(f"Rewards: {len(rewards)}")
-        
-        bt.logging.info(f"Uids array: {uids_array}")
-
-        scattered_rewards[uids_array] = rewards
-        bt.logging.debug(f"Scattered rewards: {rewards}")
+            bt.logging.info(f"Scores: {len(self.scores)}")
+            bt.logging.info(f"Uids array: {uids_array}")
+            bt.logging.info(f"Rewards: {len(rewards)}")
 
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha: float = self.config.neuron.moving_average_alpha
-        self.scores: np.ndarray = (
-            alpha * scattered_rewards + (1 - alpha) * self.scores
-        )
-        bt.logging.debug(f"Updated moving avg scores: {self.scores}")
+            # Update the scores of the given uids with their rewards, assumes uids are mutually exclusive.
+            # Uids that were not part of this update keep their score, results are committed batch by batch.
+            alpha: float = self.config.neuron.moving_average_alpha
+            self.scores[uids_array] = alpha * rewards + (1 - alpha) * self.scores[uids_array]
+            bt.logging.debug(f"Updated moving avg scores: {self.scores}")
 
     def save_state(self):
-        """Saves the state of the validator to a file."""
+        """Hands the state of the validator to the checkpoint writer, which saves it in the background."""
         bt.logging.info("Saving validator state.")
 
-        # Save the state of the validator to file.
-        np.savez(
-            self.config.neuron.full_path + "/state.npz",
-            step=self.step,
-            scores=self.scores,
-            hotkeys=self.hotkeys,
-        )
+        with self.state_lock:
+            step, scores, hotkeys = self.step, self.scores.copy(), list(self.hotkeys)
+            last_weight_uids, last_weight_values = self.last_weight_uids, self.last_weight_values
+            last_weights_block = self.last_weights_block
+
+        # Scores are saved as float32, hotkeys as ascii bytes and the last weights as the u16 values set on chain.
+        self.checkpoints.submit({
+            "step": np.int64(step),
+            "scores": np.asarray(scores, dtype=np.float32),
+            "hotkeys": pack_hotkeys(hotkeys),
+            "last_weight_uids": np.asarray(last_weight_uids, dtype=np.uint16),
+            "last_weight_values": np.asarray(last_weight_values, dtype=np.uint16),
+            "last_weights_block": np.int64(last_weights_block),
+        })
 
     def load_state(self):
-        """Loads the state of the validator from a file."""
+        """Loads the state of the validator from the newest valid checkpoint."""
         bt.logging.info("Loading validator state.")
 
-        # Load the state of the validator from file.
-        state = np.load(self.config.neuron.full_path + "/state.npz")
-        self.step = state["step"]
-        self.scores = state["scores"]
-        self.hotkeys = state["hotkeys"]
-        
+        state = self.checkpoints.load(required=STATE_KEYS)
+        if state is None:
+            bt.logging.warning(f"No valid checkpoint found at {self.checkpoints.path}")
+            return
+        self.restore_state(state)
+
     def init_state(self):
-        if os.path.exists(self.config.neuron.full_path + "/state.npz"):
-            state = np.load(self.config.neuron.full_path + "/state.npz")
-            self.step = state["step"]
-            self.scores = state["scores"]
-            self.hotkeys = state["hotkeys"]
+        self.checkpoints = CheckpointWriter(
+            os.path.join(self.config.neuron.full_path, "state.npz"),
+            generations=self.config.neuron.checkpoint_generations,
+        )
+        state = self.checkpoints.load(required=STATE_KEYS)
+        if state is not None:
+            self.restore_state(state)
         else:
             self.step = 0
             self.scores = np.zeros(1, dtype=np.float32)
             self.hotkeys = []
+            self.load_last_weights({})
+
+    def restore_state(self, state):
+        """Restores the validator state from a loaded checkpoint, older checkpoints hold float64 scores and unicode hotkeys."""
+        self.step = int(state["step"])
+        self.scores = np.asarray(state["scores"], dtype=np.float64)
+        self.hotkeys = unpack_hotkeys(state["hotkeys"])
+        self.load_last_weights(state)
+
+    def load_last_weights(self, state):
+        """Restores the last weights set on chain, states saved before they were tracked have none."""
+        if "last_weights_block" in state:
+            self.last_weight_uids = np.asarray(state["last_weight_uids"], dtype=np.int64)
+            self.last_weight_values = np.asarray(state["last_weight_values"], dtype=np.int64)
+            self.last_weights_block = int(state["last_weights_block"])
+        else:
+            self.last_weight_uids = np.zeros(0, dtype=np.int64)
+            self.last_weight_values = np.zeros(0, dtype=np.int64)
+            self.last_weights_block = -1
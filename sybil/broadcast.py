@@ -0,0 +1,151 @@
+import time
+import bittensor as bt
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sybil.metagraph_snapshot import MetagraphSnapshot
+from sybil.wire import CONTENT_TYPE_COLUMNAR, CONTENT_TYPE_JSON, accepts_columnar
+
+
+# Seconds between version checks while nothing changed, catches a node-stack that restarted without its cache
+PROBE_INTERVAL = 600
+
+
+class NeuronBroadcaster:
+    """
+    Keeps the local node-stack's copy of the metagraph up to date with as little traffic as possible.
+
+    Every broadcast is versioned by the block and content hash of the snapshot. Nothing is sent while the content is
+    unchanged, apart from an occasional version-only probe. When it changed and the node-stack confirmed holding the
+    previously sent version, only the records of changed uids are sent as a delta on top of that version. A node-stack
+    that holds another version answers the delta with ``version_mismatch`` and gets the full list instead. Node-stacks
+    that do not report a version get a full broadcast whenever the content changed.
+
+    Neurons are sent as json records until the node-stack lists the columnar content type as accepted in a response,
+    from then on they are sent as columns.
+    """
+
+    def __init__(
+        self,
+        post: Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]],
+        probe_interval: float = PROBE_INTERVAL,
+    ):
+        """
+        Args:
+            post (Callable): Posts a payload with the given content type to the broadcast endpoint and returns the
+                decoded json response.
+            probe_interval (float): Seconds between version probes while the content is unchanged.
+        """
+        self._post = post
+        self.probe_interval = probe_interval
+        self.compact = False
+
+        self.sent: Optional[MetagraphSnapshot] = None
+        self.acknowledged: Optional[str] = None
+        self.last_probe = 0.0
+
+        self.full = 0
+        self.deltas = 0
+        self.probes = 0
+        self.skipped = 0
+        self.mismatches = 0
+
+    async def broadcast(self, snapshot: MetagraphSnapshot) -> bool:
+        """
+        Brings the node-stack up to the given snapshot.
+
+        Args:
+            snapshot (MetagraphSnapshot): The latest metagraph snapshot.
+
+        Returns:
+            bool: Whether the node-stack holds the snapshot afterwards, as far as it reported.
+        """
+        try:
+            if self.sent is not None and self.sent.content_hash == snapshot.content_hash:
+                if self.acknowledged != snapshot.content_hash or time.time() - self.last_probe < self.probe_interval:
+                    self.skipped += 1
+                    return True
+                if await self._probe(snapshot):
+                    return True
+            elif self.sent is not None and self.acknowledged == self.sent.content_hash:
+                if await self._send_delta(snapshot):
+                    return True
+            return await self._send_full(snapshot)
+        except Exception as e:
+            bt.logging.error(f"Failed to broadcast neurons info: {e}")
+            return False
+
+    async def post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        content_type = CONTENT_TYPE_COLUMNAR if self.compact else CONTENT_TYPE_JSON
+        result = await self._post(payload, content_type)
+        if not isinstance(result, dict):
+            return {}
+        self.compact = accepts_columnar(result)
+        return result
+
+    def _neurons(self, snapshot: MetagraphSnapshot, uids=None) -> Any:
+        return snapshot.to_columnar(uids) if self.compact else snapshot.to_records(uids)
+
+    @staticmethod
+    def _version(snapshot: MetagraphSnapshot) -> Dict[str, Any]:
+        return {"block": snapshot.block, "hash": snapshot.content_hash}
+
+    def _held_hash(self, result: Dict[str, Any]) -> Optional[str]:
+        version = result.get("version")
+        return version.get("hash") if isinstance(version, dict) else None
+
+    async def _probe(self, snapshot: MetagraphSnapshot) -> bool:
+        self.probes += 1
+        result = await self.post({"version": self._version(snapshot)})
+        if self._held_hash(result) == snapshot.content_hash:
+            self.last_probe = time.time()
+            return True
+        bt.logging.info("Node-stack lost the neurons broadcast, sending the full list")
+        self.mismatches += 1
+        return False
+
+    async def _send_delta(self, snapshot: MetagraphSnapshot) -> bool:
+        changed = snapshot.changed_uids(self.sent)
+        bt.logging.info(f"Submitting neurons delta: {len(changed)} of {len(snapshot)} neurons changed")
+        result = await self.post({
+            "version": self._version(snapshot),
+            "delta": {"base_hash": self.sent.content_hash, "n": len(snapshot), "changed": self._neurons(snapshot, changed)},
+        })
+        if result.get("success") and self._held_hash(result) == snapshot.content_hash:
+            self._sent(snapshot, snapshot.content_hash)
+            self.deltas += 1
+            return True
+        if result.get("version_mismatch"):
+            self.mismatches += 1
+            bt.logging.info(f"Node-stack holds another neurons version {result.get('version')}, sending the full list")
+        else:
+            bt.logging.error(f"Failed to broadcast neurons delta: {result.get('error')}")
+        return False
+
+    async def _send_full(self, snapshot: MetagraphSnapshot) -> bool:
+        bt.logging.info(f"Submitting neurons info: {len(snapshot)} neurons")
+        result = await self.post({"version": self._version(snapshot), "neurons": self._neurons(snapshot)})
+        if not result.get("success"):
+            bt.logging.error(f"Failed to broadcast neurons info")
+            return False
+        bt.logging.info(f"Broadcasted neurons info: {len(snapshot)} neurons")
+        self._sent(snapshot, self._held_hash(result))
+        self.full += 1
+        return True
+
+    def _sent(self, snapshot: MetagraphSnapshot, acknowledged: Optional[str]):
+        self.sent, self.acknowledged = snapshot, acknowledged
+        self.last_probe = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns broadcast counters and the version the node-stack confirmed."""
+        return {
+            "full": self.full,
+            "deltas": self.deltas,
+            "probes": self.probes,
+            "skipped": self.skipped,
+            "mismatches": self.mismatches,
+            "compact": self.compact,
+            "block": self.sent.block if self.sent is not None else None,
+            "acknowledged": self.acknowledged,
+        }
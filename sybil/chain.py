@@ -0,0 +1,195 @@
+import time
+import threading
+import bittensor as bt
+
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+# Seconds per block, the cached block height is refreshed at most this often
+BLOCK_TIME = 12
+
+# Lookups scoped to a block are valid until the next block, lookups scoped to an epoch until the next tempo boundary
+SCOPE_BLOCK = "block"
+SCOPE_EPOCH = "epoch"
+
+
+class ChainCache:
+    """
+    Caching facade over the subtensor calls a neuron makes on every sync.
+
+    The block height is fetched at most once per block time. Registration state is cached for the current block and
+    subnet hyperparameters for the current epoch, so repeated syncs within a tempo cost no chain round trips. Cached
+    values are dropped as soon as a newer block or epoch is observed.
+
+    Concurrent lookups of the same key share a single request: the first caller fetches and everyone else waits for
+    its result. Every request that actually reaches the chain is counted, so the number of RPCs per sync can be logged.
+
+    The facade exposes ``min_allowed_weights`` and ``max_weight_limit`` with the subtensor signatures, so it can be
+    handed to :func:`process_weights_for_netuid` in place of the subtensor.
+    """
+
+    def __init__(self, subtensor: "bt.subtensor", netuid: int, block_time: float = BLOCK_TIME):
+        self.subtensor = subtensor
+        self.netuid = netuid
+        self.block_time = block_time
+
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, Hashable], Tuple[str, int, Any]] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], Future] = {}
+
+        self._block: Optional[int] = None
+        self._block_fetched_at = 0.0
+        self._tempo: Optional[int] = None
+        self._epoch: Optional[int] = None
+
+        self.rpcs: Counter = Counter()
+        self.hits: Counter = Counter()
+        self._reported_rpcs: Counter = Counter()
+        self._reported_hits: Counter = Counter()
+
+    def block(self) -> int:
+        """Returns the current block height, fetched from the chain at most once per block time."""
+        with self._lock:
+            if self._block is not None and time.time() - self._block_fetched_at < self.block_time:
+                self.hits["block"] += 1
+                return self._block
+
+        block = self._dedupe(("block", None), self.subtensor.get_current_block)
+        self.observe_block(block)
+        with self._lock:
+            self._block_fetched_at = time.time()
+        return block
+
+    def observe_block(self, block: int):
+        """
+        Records a block height seen elsewhere, e.g. from a metagraph sync, and drops values that went stale.
+
+        Args:
+            block (int): The block height.
+        """
+        with self._lock:
+            if self._block is not None and block <= self._block:
+                return
+            self._block, self._block_fetched_at = block, time.time()
+
+            epoch = self._epoch_of(block)
+            if epoch != self._epoch:
+                # The tempo itself is a hyperparameter and is re-read at every epoch boundary
+                self._epoch, self._tempo = epoch, None
+
+            self._values = {
+                key: (scope, marker, value) for key, (scope, marker, value) in self._values.items()
+                if marker == (block if scope == SCOPE_BLOCK else self._epoch)
+            }
+
+    def _epoch_of(self, block: int) -> Optional[int]:
+        # Subnets run their epoch when (block + netuid + 1) is a multiple of (tempo + 1)
+        if self._tempo is None:
+            return self._epoch
+        return (block + self.netuid + 1) // (self._tempo + 1)
+
+    def get(self, name: str, fetch: Callable[[], Any], scope: str = SCOPE_EPOCH, key: Hashable = None) -> Any:
+        """
+        Returns a cached chain value, fetching it when the cache has none for the current block or epoch.
+
+        Args:
+            name (str): The name of the value, used for the cache key and the RPC counters.
+            fetch (Callable[[], Any]): Fetches the value from the chain.
+            scope (str): Either ``"block"`` or ``"epoch"``, how long the value stays valid.
+            key (Hashable, optional): Extra cache key, e.g. the hotkey of a registration lookup.
+
+        Returns:
+            Any: The cached or freshly fetched value.
+        """
+        self.block()
+        self._ensure_tempo()
+
+        cache_key = (name, key)
+        with self._lock:
+            marker = self._block if scope == SCOPE_BLOCK else self._epoch
+            cached = self._values.get(cache_key)
+            if cached is not None and cached[1] == marker:
+                self.hits[name] += 1
+                return cached[2]
+
+        value = self._dedupe(cache_key, fetch)
+        with self._lock:
+            # Only keep the value if no newer block or epoch arrived while it was being fetched
+            if marker == (self._block if scope == SCOPE_BLOCK else self._epoch):
+                self._values[cache_key] = (scope, marker, value)
+        return value
+
+    def _ensure_tempo(self):
+        with self._lock:
+            if self._tempo is not None:
+                return
+        tempo = self._dedupe(("tempo", None), lambda: self.subtensor.tempo(netuid=self.netuid))
+        with self._lock:
+            self._tempo = tempo
+            if self._block is not None:
+                self._epoch = self._epoch_of(self._block)
+
+    def _dedupe(self, cache_key: Tuple[str, Hashable], fetch: Callable[[], Any]) -> Any:
+        # Join a request for the same key that is already running instead of sending another one
+        with self._lock:
+            future = self._in_flight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[cache_key] = Future()
+                self.rpcs[cache_key[0]] += 1
+            else:
+                self.hits[cache_key[0]] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(fetch())
+        except Exception as err:
+            future.set_exception(err)
+        finally:
+            with self._lock:
+                del self._in_flight[cache_key]
+        return future.result()
+
+    def is_hotkey_registered(self, hotkey_ss58: str) -> bool:
+        """Returns whether the hotkey is registered on the subnet, cached for the current block."""
+        return self.get(
+            "is_hotkey_registered",
+            lambda: self.subtensor.is_hotkey_registered(netuid=self.netuid, hotkey_ss58=hotkey_ss58),
+            scope=SCOPE_BLOCK,
+            key=hotkey_ss58,
+        )
+
+    def min_allowed_weights(self, netuid: int) -> int:
+        """Returns the minimum number of weights a validator must set, cached for the current epoch."""
+        return self.get(
+            "min_allowed_weights", lambda: self.subtensor.min_allowed_weights(netuid=netuid), key=netuid
+        )
+
+    def max_weight_limit(self, netuid: int) -> float:
+        """Returns the maximum weight a single uid may receive, cached for the current epoch."""
+        return self.get(
+            "max_weight_limit", lambda: self.subtensor.max_weight_limit(netuid=netuid), key=netuid
+        )
+
+    def metagraph_sync(self, metagraph: "bt.metagraph"):
+        """Syncs the metagraph through the subtensor and records the block it was synced at."""
+        with self._lock:
+            self.rpcs["metagraph"] += 1
+        metagraph.sync(subtensor=self.subtensor)
+        self.observe_block(int(metagraph.block))
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the RPCs sent and cache hits per lookup since the previous report.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The ``rpcs`` and ``hits`` counters by lookup name.
+        """
+        with self._lock:
+            rpcs, hits = self.rpcs - self._reported_rpcs, self.hits - self._reported_hits
+            self._reported_rpcs, self._reported_hits = self.rpcs.copy(), self.hits.copy()
+        return {"rpcs": dict(rpcs), "hits": dict(hits)}
@@ -0,0 +1,292 @@
+import time
+import asyncio
+import aiohttp
+import threading
+import bittensor as bt
+
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from sybil.protocol import Ping
+from sybil.validator.concurrency import AIMDLimiter
+
+
+async def fan_out(
+    dendrite: bt.dendrite,
+    pairs: Sequence[Tuple[bt.AxonInfo, bt.Synapse]],
+    timeout: Union[float, Sequence[float]] = 12.0,
+    limiter: Optional[AIMDLimiter] = None,
+) -> AsyncIterator[Tuple[int, bt.Synapse]]:
+    """
+    Sends a different synapse to each axon in one dispatch and yields the responses as they complete.
+
+    ``dendrite.forward`` is built around one synapse for many axons: every call wraps the axons in a list, copies the
+    synapse per axon and gathers a task per call, so querying miners with their own synapse through it costs one
+    full forward per miner. This goes straight to ``dendrite.call``, or ``dendrite.call_stream`` for streaming
+    synapses, for every ``(axon, synapse)`` pair instead. The synapses are used as they are, the dendrite session is
+    opened once up front and shared by every request, and only the per-request signing is left per miner.
+
+    Args:
+        dendrite (bt.dendrite): The dendrite to send the requests with.
+        pairs (Sequence[Tuple[bt.AxonInfo, bt.Synapse]]): The axons to query, each with its own synapse. The synapses are filled in place.
+        timeout (Union[float, Sequence[float]]): Seconds each axon gets to answer, either one value for all or one per pair.
+        limiter (AIMDLimiter, optional): Bounds the number of requests in flight and is told how each one went.
+
+    Yields:
+        Tuple[int, bt.Synapse]: The index of the pair in ``pairs`` and its undeserialized response synapse, in completion order.
+    """
+    if len(pairs) == 0:
+        return
+
+    timeouts = [timeout] * len(pairs) if isinstance(timeout, (int, float)) else list(timeout)
+
+    # Open the shared session once so every request reuses its connection pool
+    await dendrite.session
+
+    async def call(axon: bt.AxonInfo, synapse: bt.Synapse, axon_timeout: float) -> bt.Synapse:
+        if not isinstance(synapse, bt.StreamingSynapse):
+            return await dendrite.call(target_axon=axon, synapse=synapse, timeout=axon_timeout, deserialize=False)
+
+        # Streaming synapses consume their own events, the last item of the stream is the filled synapse
+        async def consume() -> bt.Synapse:
+            response = synapse
+            async for response in dendrite.call_stream(target_axon=axon, synapse=synapse, timeout=axon_timeout, deserialize=False):
+                pass
+            return response
+
+        heartbeat_timeout = getattr(synapse, "heartbeat_timeout", None)
+        if not heartbeat_timeout:
+            return await consume()
+
+        # The synapse enforces its heartbeat deadline between events, but waiting for the response headers is only
+        # bounded by the full timeout. Watch the event count and give up when it stops moving.
+        stream = asyncio.ensure_future(consume())
+        seen = -1
+        try:
+            while True:
+                done, _ = await asyncio.wait({stream}, timeout=heartbeat_timeout)
+                if done:
+                    return stream.result()
+                if len(synapse.events) == seen:
+                    break
+                seen = len(synapse.events)
+        finally:
+            stream.cancel()
+
+        try:
+            await stream
+        except asyncio.CancelledError:
+            pass
+        synapse.dendrite.status_code = 408
+        synapse.dendrite.status_message = f"No heartbeat for {heartbeat_timeout} seconds"
+        return synapse
+
+    async def query(index: int, axon: bt.AxonInfo, synapse: bt.Synapse, axon_timeout: float) -> Tuple[int, bt.Synapse]:
+        if limiter is None:
+            return index, await call(axon, synapse, axon_timeout)
+
+        await limiter.acquire()
+        ok, latency = False, None
+        try:
+            response = await call(axon, synapse, axon_timeout)
+            ok = response.dendrite.status_code == 200
+            if ok and response.dendrite.process_time is not None:
+                latency = float(response.dendrite.process_time)
+            return index, response
+        finally:
+            limiter.release(ok, latency)
+
+    tasks = [
+        asyncio.ensure_future(query(index, axon, synapse, axon_timeout))
+        for index, ((axon, synapse), axon_timeout) in enumerate(zip(pairs, timeouts))
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # If the caller stops early, do not leave requests running in the background
+        for task in tasks:
+            task.cancel()
+
+
+async def fan_out_all(
+    dendrite: bt.dendrite,
+    pairs: Sequence[Tuple[bt.AxonInfo, bt.Synapse]],
+    timeout: Union[float, Sequence[float]] = 12.0,
+    limiter: Optional[AIMDLimiter] = None,
+) -> List[bt.Synapse]:
+    """
+    Same as :func:`fan_out`, but waits for every response and returns them in the order of ``pairs``.
+    """
+    responses: List[bt.Synapse] = [None] * len(pairs)
+    async for index, response in fan_out(dendrite, pairs, timeout, limiter):
+        responses[index] = response
+    return responses
+
+
+class PooledDendrite(bt.dendrite):
+    """
+    Dendrite that keeps keep-alive connections to recently queried axons between sweeps.
+
+    The stock dendrite opens a plain ``aiohttp.ClientSession`` whose connections are closed after a few seconds of
+    idling, so every sweep reaches each miner from cold. This one uses a connector sized for the whole metagraph with
+    a keep-alive longer than a sweep, so the next sweep reuses the connection to every miner that answered.
+
+    Connections are pooled by aiohttp per ``(ip, port)``. :meth:`warm` opens connections to the axons of the next
+    batch that have none, with a signed :class:`~sybil.protocol.Ping` the miner answers without doing any work.
+    Endpoints that moved, changed hands or left are marked with :meth:`mark_stale`. aiohttp has no public way to drop
+    the connections to a single host, so when a marked endpoint has a pooled connection the session is replaced by a
+    fresh one and the old session is closed once its requests had ``keepalive_timeout`` seconds to finish. Hits,
+    misses, evictions and warmed connections are counted and exposed through :meth:`stats`.
+    """
+
+    def __init__(self, wallet, pool_size: int = 512, keepalive_timeout: float = 120.0, warmup_timeout: float = 5.0):
+        super().__init__(wallet)
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.warmup_timeout = warmup_timeout
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.warmed = 0
+        self.resets = 0
+
+        # When each endpoint last answered on the current session, its connection is pooled until the keep-alive ends
+        self._last_used: Dict[Tuple[str, int], float] = {}
+
+        # Endpoints whose pooled connections must be dropped. Filled from the sync thread, applied on the event loop.
+        self._stale: Set[Tuple[str, int]] = set()
+        self._stale_lock = threading.Lock()
+
+        # Replaced sessions, with the time they were replaced at, waiting for their requests to finish
+        self._retired: List[Tuple[float, aiohttp.ClientSession]] = []
+
+    @property
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._new_session()
+        self._evict_stale()
+        if self._retired:
+            await self._close_retired()
+        return self._session
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+        trace_config.on_connection_create_end.append(self._on_connection_created)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=None,
+        )
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def _on_request_start(self, session, context, params):
+        # Warm-up pings are left out of the pool counters, they would count every warmed connection as a miss
+        context.warmup = params.url.path == f"/{Ping.__name__}"
+
+    async def _on_request_end(self, session, context, params):
+        if session is self._session:
+            self._last_used[(params.url.host, params.url.port)] = time.monotonic()
+        if context.warmup:
+            self.warmed += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        if not context.warmup:
+            self.hits += 1
+
+    async def _on_connection_created(self, session, context, params):
+        if not context.warmup:
+            self.misses += 1
+
+    def _endpoint(self, axon: bt.AxonInfo) -> Tuple[str, int]:
+        # The host the dendrite sends requests for this axon to, axons on this machine are reached locally
+        ip = "0.0.0.0" if axon.ip == str(self.external_ip) else axon.ip
+        return ip, axon.port
+
+    def _pooled_endpoints(self) -> Set[Tuple[str, int]]:
+        cutoff = time.monotonic() - self.keepalive_timeout
+        return {endpoint for endpoint, last_used in self._last_used.items() if last_used > cutoff}
+
+    async def warm(self, axons: Sequence[bt.AxonInfo]):
+        """
+        Opens pooled connections to axons that do not have one yet.
+
+        Each of them is sent a signed :class:`~sybil.protocol.Ping`. Whatever the axon answers, including miners that
+        do not know the synapse yet, the connection stays in the pool for the next real query. Unreachable axons are
+        ignored, they will simply time out on the real query as before.
+
+        Args:
+            axons (Sequence[bt.AxonInfo]): The axons that are about to be queried.
+        """
+        pooled = self._pooled_endpoints()
+        cold = {}
+        for axon in axons:
+            endpoint = self._endpoint(axon)
+            if axon.is_serving and endpoint not in pooled:
+                cold.setdefault(endpoint, axon)
+        if not cold:
+            return
+
+        await asyncio.gather(*(
+            self.call(target_axon=axon, synapse=Ping(), timeout=self.warmup_timeout, deserialize=False)
+            for axon in cold.values()
+        ))
+
+    def mark_stale(self, axons: Iterable[bt.AxonInfo]):
+        """
+        Marks axons whose pooled connections should no longer be used, e.g. after they moved or changed hands.
+
+        Safe to call from any thread, the connections are dropped the next time the session is used.
+
+        Args:
+            axons (Iterable[bt.AxonInfo]): The axon infos the connections were opened for.
+        """
+        endpoints = {self._endpoint(axon) for axon in axons}
+        with self._stale_lock:
+            self._stale.update(endpoints)
+
+    def _evict_stale(self):
+        with self._stale_lock:
+            stale, self._stale = self._stale, set()
+        evicted = stale & self._pooled_endpoints()
+        if not evicted:
+            return
+
+        # Requests still running on the old session finish there, everything else starts over on the new one
+        self._retired.append((time.monotonic(), self._session))
+        self._session = self._new_session()
+        self._last_used.clear()
+        self.evictions += len(evicted)
+        self.resets += 1
+
+    async def _close_retired(self):
+        cutoff = time.monotonic() - self.keepalive_timeout
+        while self._retired and self._retired[0][0] <= cutoff:
+            _, session = self._retired.pop(0)
+            await session.close()
+
+    async def aclose_session(self):
+        for _, session in self._retired:
+            await session.close()
+        self._retired.clear()
+        await super().aclose_session()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the pool hit, miss, eviction and warm-up counters."""
+        requests = self.hits + self.misses
+        return {
+            "pooled": len(self._pooled_endpoints()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "resets": self.resets,
+            "warmed": self.warmed,
+        }
+
+    def __str__(self) -> str:
+        return "PooledDendrite({})".format(self.keypair.ss58_address)
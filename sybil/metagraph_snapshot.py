@@ -0,0 +1,213 @@
+import hashlib
+import numpy as np
+import bittensor as bt
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sybil.base.consts import BURN_UID
+from sybil.wire import columnar
+
+
+U16_MAX = 65535
+
+
+def _table(values: List[str]) -> Tuple[List[str], np.ndarray]:
+    # Distinct values in order of first appearance, plus the position of every value in that table
+    if not values:
+        return [], np.empty(0, dtype=np.int32)
+    distinct, first, inverse = np.unique(np.array(values, dtype=str), return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return distinct[order].tolist(), rank[inverse.reshape(-1)].astype(np.int32)
+
+
+def _u16_float(values: np.ndarray) -> np.ndarray:
+    # The metagraph keeps u16 normalized values as float32, recover the exact float64 the chain value maps to
+    return np.rint(np.asarray(values, dtype=np.float64) * U16_MAX) / U16_MAX
+
+
+class MetagraphSnapshot:
+    """
+    Columnar view of the metagraph fields the local node-stack is told about, taken once per synced block.
+
+    Every per-neuron field is a NumPy column indexed by uid, ips and coldkeys are stored once in a table with an index
+    column since many neurons share them. Nothing is read from ``metagraph.neurons``, so no ``NeuronInfo`` objects are
+    materialized. The content hash covers every column but not the block, two snapshots of an unchanged metagraph
+    taken at different blocks hash the same.
+    """
+
+    COLUMNS = ("uids", "validator_trust", "trust", "alpha_stake", "stake_weight", "excluded", "ip_index", "coldkey_index")
+
+    def __init__(
+        self,
+        block: int,
+        uids: np.ndarray,
+        hotkeys: List[str],
+        ip_table: List[str],
+        ip_index: np.ndarray,
+        coldkey_table: List[str],
+        coldkey_index: np.ndarray,
+        validator_trust: np.ndarray,
+        trust: np.ndarray,
+        alpha_stake: np.ndarray,
+        stake_weight: np.ndarray,
+        excluded: np.ndarray,
+    ):
+        self.block = block
+        self.uids = uids
+        self.hotkeys = hotkeys
+        self.ip_table = ip_table
+        self.ip_index = ip_index
+        self.coldkey_table = coldkey_table
+        self.coldkey_index = coldkey_index
+        self.validator_trust = validator_trust
+        self.trust = trust
+        self.alpha_stake = alpha_stake
+        self.stake_weight = stake_weight
+        self.excluded = excluded
+        self.content_hash = self._hash()
+
+    @classmethod
+    def from_metagraph(cls, metagraph: "bt.metagraph") -> "MetagraphSnapshot":
+        """
+        Builds a snapshot from the array attributes of a synced metagraph.
+
+        Args:
+            metagraph (bt.metagraph): The synced metagraph.
+
+        Returns:
+            MetagraphSnapshot: The snapshot at the metagraph's block.
+        """
+        axons = metagraph.axons
+        ip_table, ip_index = _table([axon.ip for axon in axons])
+        coldkey_table, coldkey_index = _table([axon.coldkey for axon in axons])
+        uids = np.arange(len(axons), dtype=np.int64)
+        return cls(
+            block=int(metagraph.block),
+            uids=uids,
+            hotkeys=[axon.hotkey for axon in axons],
+            ip_table=ip_table,
+            ip_index=ip_index,
+            coldkey_table=coldkey_table,
+            coldkey_index=coldkey_index,
+            validator_trust=_u16_float(metagraph.Tv),
+            trust=_u16_float(metagraph.T),
+            alpha_stake=np.asarray(metagraph.alpha_stake, dtype=np.float64),
+            stake_weight=np.asarray(metagraph.S, dtype=np.float64),
+            excluded=uids == BURN_UID,
+        )
+
+    def __len__(self) -> int:
+        return len(self.uids)
+
+    def _hash(self) -> str:
+        digest = hashlib.sha256()
+        for name in self.COLUMNS:
+            column = np.ascontiguousarray(getattr(self, name))
+            digest.update(f"{name}:{column.dtype.str}:{column.shape}".encode())
+            digest.update(column.tobytes())
+        for table in (self.hotkeys, self.ip_table, self.coldkey_table):
+            digest.update("\0".join(table).encode())
+            digest.update(b"\1")
+        return digest.hexdigest()
+
+    @property
+    def ips(self) -> List[str]:
+        """The ip of every uid."""
+        return [self.ip_table[i] for i in self.ip_index.tolist()]
+
+    @property
+    def coldkeys(self) -> List[str]:
+        """The coldkey of every uid."""
+        return [self.coldkey_table[i] for i in self.coldkey_index.tolist()]
+
+    def changed_uids(self, previous: "MetagraphSnapshot") -> np.ndarray:
+        """
+        Finds the uids whose record differs from an earlier snapshot, including uids that joined since.
+
+        Args:
+            previous (MetagraphSnapshot): The earlier snapshot.
+
+        Returns:
+            np.ndarray: The changed uids in ascending order.
+        """
+        common = min(len(self), len(previous))
+        changed = np.zeros(common, dtype=bool)
+        for name in ("validator_trust", "trust", "alpha_stake", "stake_weight", "excluded"):
+            changed |= getattr(self, name)[:common] != getattr(previous, name)[:common]
+        for name in ("hotkeys", "ips", "coldkeys"):
+            current, earlier = getattr(self, name)[:common], getattr(previous, name)[:common]
+            changed |= np.array(current, dtype=str) != np.array(earlier, dtype=str)
+        return np.concatenate([np.flatnonzero(changed), np.arange(common, len(self))]).astype(np.int64)
+
+    def to_records(self, uids: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Serializes the snapshot into the per-neuron records the node-stack broadcast endpoint accepts.
+
+        Args:
+            uids (np.ndarray, optional): Only serialize these uids, all uids by default.
+
+        Returns:
+            List[Dict[str, Any]]: One record per uid.
+        """
+        block = self.block
+        if uids is None:
+            uids = self.uids
+        uids = np.asarray(uids, dtype=np.int64)
+        ip_table, coldkey_table, hotkeys = self.ip_table, self.coldkey_table, self.hotkeys
+        return [
+            {
+                "uid": uid,
+                "ip": ip,
+                "validator_trust": validator_trust,
+                "trust": trust,
+                "alpha_stake": alpha_stake,
+                "stake_weight": stake_weight,
+                "block": block,
+                "hotkey": hotkey,
+                "coldkey": coldkey,
+                "excluded": excluded,
+            }
+            for uid, ip, validator_trust, trust, alpha_stake, stake_weight, hotkey, coldkey, excluded in zip(
+                self.uids[uids].tolist(),
+                [ip_table[i] for i in self.ip_index[uids].tolist()],
+                self.validator_trust[uids].tolist(),
+                self.trust[uids].tolist(),
+                self.alpha_stake[uids].tolist(),
+                self.stake_weight[uids].tolist(),
+                [hotkeys[uid] for uid in uids.tolist()],
+                [coldkey_table[i] for i in self.coldkey_index[uids].tolist()],
+                self.excluded[uids].tolist(),
+            )
+        ]
+
+    def to_columnar(self, uids: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Serializes the snapshot as a columnar record list, the compact counterpart of :meth:`to_records`.
+
+        Args:
+            uids (np.ndarray, optional): Only serialize these uids, all uids by default.
+
+        Returns:
+            Dict[str, Any]: The columnar record list, see :func:`sybil.wire.columnar`.
+        """
+        if uids is None:
+            uids = self.uids
+        uids = np.asarray(uids, dtype=np.int64)
+        return columnar(
+            rows=len(uids),
+            columns={
+                "uid": self.uids[uids].tolist(),
+                "ip": self.ip_index[uids].tolist(),
+                "validator_trust": self.validator_trust[uids].tolist(),
+                "trust": self.trust[uids].tolist(),
+                "alpha_stake": self.alpha_stake[uids].tolist(),
+                "stake_weight": self.stake_weight[uids].tolist(),
+                "hotkey": [self.hotkeys[uid] for uid in uids.tolist()],
+                "coldkey": self.coldkey_index[uids].tolist(),
+                "excluded": self.excluded[uids].tolist(),
+            },
+            tables={"ip": self.ip_table, "coldkey": self.coldkey_table},
+            constants={"block": self.block},
+        )
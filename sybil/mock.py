@@ -74,44 +74,69 @@ class MockDendrite(bt.dendrite):
         async def query_all_axons(streaming: bool):
             """Queries all axons for responses."""
 
-            async def single_axon_response(i, axon):
-                """Queries a single axon for a response."""
-
-                start_time = time.time()
-                s = synapse.copy()
-                # Attach some more required data so it looks real
-                s = self.preprocess_synapse_for_request(axon, s, timeout)
-                # We just want to mock the response, so we'll just fill in some data
-                process_time = random.random()
-                if process_time < timeout:
-                    s.dendrite.process_time = str(time.time() - start_time)
-                    # Update the status code and status message of the dendrite to match the axon
-                    # TODO (developer): replace with your own expected synapse data
-                    s.dummy_output = s.dummy_input * 2
-                    s.dendrite.status_code = 200
-                    s.dendrite.status_message = "OK"
-                    synapse.dendrite.process_time = str(process_time)
-                else:
-                    s.dummy_output = 0
-                    s.dendrite.status_code = 408
-                    s.dendrite.status_message = "Timeout"
-                    synapse.dendrite.process_time = str(timeout)
-
-                # Return the updated synapse object after deserializing if requested
-                if deserialize:
-                    return s.deserialize()
-                else:
-                    return s
-
             return await asyncio.gather(
                 *(
-                    single_axon_response(i, target_axon)
-                    for i, target_axon in enumerate(axons)
+                    self.call(target_axon, synapse.copy(), timeout, deserialize)
+                    for target_axon in axons
                 )
             )
 
         return await query_all_axons(streaming)
 
+    async def call(
+        self,
+        target_axon: bt.axon,
+        synapse: bt.Synapse = bt.Synapse(),
+        timeout: float = 12.0,
+        deserialize: bool = True,
+    ):
+        """Queries a single axon for a response."""
+
+        start_time = time.time()
+        s = synapse
+        # Attach some more required data so it looks real
+        s = self.preprocess_synapse_for_request(target_axon, s, timeout)
+        # We just want to mock the response, so we'll just fill in some data
+        process_time = random.random()
+        if process_time < timeout:
+            s.dendrite.process_time = str(time.time() - start_time)
+            # Update the status code and status message of the dendrite to match the axon
+            self.fill_response(s)
+            s.dendrite.status_code = 200
+            s.dendrite.status_message = "OK"
+            synapse.dendrite.process_time = str(process_time)
+        else:
+            if hasattr(s, "dummy_output"):
+                s.dummy_output = 0
+            s.dendrite.status_code = 408
+            s.dendrite.status_message = "Timeout"
+            synapse.dendrite.process_time = str(timeout)
+
+        # Return the updated synapse object after deserializing if requested
+        if deserialize:
+            return s.deserialize()
+        else:
+            return s
+
+    async def call_stream(
+        self,
+        target_axon: bt.axon,
+        synapse: bt.StreamingSynapse = bt.Synapse(),
+        timeout: float = 12.0,
+        deserialize: bool = True,
+    ):
+        """Queries a single axon for a streamed response, the mock stream only yields the final synapse."""
+
+        yield await self.call(target_axon, synapse, timeout, deserialize)
+
+    def fill_response(self, synapse: bt.Synapse):
+        """Fills in the response fields a miner would have set."""
+        # TODO (developer): replace with your own expected synapse data
+        if hasattr(synapse, "challenge"):
+            synapse.challenge_response = synapse.challenge
+        elif hasattr(synapse, "dummy_input"):
+            synapse.dummy_output = synapse.dummy_input * 2
+
     def __str__(self) -> str:
         """
         Returns a string representation of the Dendrite object.
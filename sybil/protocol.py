@@ -17,7 +17,9 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import json
 import typing
+import asyncio
 import bittensor as bt
 
 # TODO(developer): Rewrite with your protocol definition.
@@ -76,6 +78,16 @@ class Dummy(bt.Synapse):
         return self.dummy_output
 
 
+class Ping(bt.Synapse):
+    """
+    A no-op request validators send to open a connection to a miner axon ahead of the next challenge. The miner
+    answers it as it is.
+    """
+
+    def deserialize(self) -> None:
+        return None
+
+
 class Challenge(bt.Synapse):
     """
     A challenge protocol representation which uses bt.Synapse as its base.
@@ -95,3 +107,86 @@ class Challenge(bt.Synapse):
         """
         
         return self.challenge_response
+
+
+class StreamingChallenge(bt.StreamingSynapse):
+    """
+    Streaming variant of the Challenge protocol.
+
+    Instead of staying silent until the challenge is solved, the miner streams newline delimited JSON events while it
+    works: progress events for each stage (challenge fetched, lease acquired, solution posted), heartbeats in between
+    and finally a ``solved`` event carrying the challenge response. The validator gives up on a miner as soon as no
+    event arrives for ``heartbeat_timeout`` seconds, instead of waiting out the full query timeout.
+    """
+
+    challenge: str
+    challenge_url: str
+    challenge_response: typing.Optional[str] = None
+
+    # Seconds between heartbeats sent by the miner, and seconds without any event after which the validator gives up
+    heartbeat_interval: float = 5.0
+    heartbeat_timeout: float = 20.0
+
+    # Names of the events received so far, in order
+    events: typing.List[str] = []
+
+    async def process_streaming_response(self, response):
+        """
+        Reads the event stream from the miner, recording progress and the final challenge response.
+
+        Raises:
+            asyncio.TimeoutError: If the miner goes quiet for longer than ``heartbeat_timeout`` seconds.
+        """
+        while True:
+            line = await asyncio.wait_for(response.content.readline(), timeout=self.heartbeat_timeout)
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                event = json.loads(line)
+            except ValueError:
+                bt.logging.debug(f"Ignoring malformed challenge event: {line}")
+                continue
+
+            name = event.get("stage") or event.get("event")
+            self.events.append(name)
+            if event.get("event") == "solved":
+                self.challenge_response = event.get("response")
+            yield event
+
+    def extract_response_json(self, response) -> dict:
+        headers = {
+            k.decode("utf-8"): v.decode("utf-8")
+            for k, v in response.__dict__["_raw_headers"]
+        }
+
+        def extract_info(prefix):
+            return {
+                key.split("_")[-1]: value
+                for key, value in headers.items()
+                if key.startswith(prefix)
+            }
+
+        return {
+            "name": headers.get("name", ""),
+            "timeout": float(headers.get("timeout", 0)),
+            "total_size": int(headers.get("total_size", 0)),
+            "header_size": int(headers.get("header_size", 0)),
+            "dendrite": extract_info("bt_header_dendrite"),
+            "axon": extract_info("bt_header_axon"),
+            "challenge": self.challenge,
+            "challenge_url": self.challenge_url,
+            "challenge_response": self.challenge_response,
+            "heartbeat_interval": self.heartbeat_interval,
+            "heartbeat_timeout": self.heartbeat_timeout,
+            "events": self.events,
+        }
+
+    def deserialize(self) -> str:
+        """
+        Deserialize the challenge response, the same way as :meth:`Challenge.deserialize`.
+        """
+        return self.challenge_response
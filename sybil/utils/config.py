@@ -190,14 +190,49 @@ def add_validator_args(cls, parser):
     parser.add_argument(
         "--neuron.timeout",
         type=float,
-        help="The timeout for each forward call in seconds.",
-        default=60,
+        help="The timeout in seconds for miners without latency history, and the upper bound of every miner timeout.",
+        default=120,
+    )
+
+    parser.add_argument(
+        "--neuron.stream_challenges",
+        action="store_true",
+        help="Send streaming challenges, dropping miners that stop sending progress or heartbeats.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.heartbeat_timeout",
+        type=float,
+        help="Seconds without progress or heartbeat after which a streaming challenge is abandoned.",
+        default=20,
+    )
+
+    parser.add_argument(
+        "--neuron.min_timeout",
+        type=float,
+        help="The lower bound in seconds of the adaptive per-miner timeout.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--neuron.timeout_percentile",
+        type=float,
+        help="The percentile of a miner's recent response times its timeout is based on.",
+        default=95,
+    )
+
+    parser.add_argument(
+        "--neuron.timeout_margin",
+        type=float,
+        help="Seconds added to the response time percentile to get a miner's timeout.",
+        default=5,
     )
 
     parser.add_argument(
         "--neuron.num_concurrent_forwards",
         type=int,
-        help="The number of concurrent forwards running at any time.",
+        help="The number of pipelines sharing each round of miner queries. The query rate and concurrency bounds scale with it.",
         default=1,
     )
 
@@ -208,6 +243,83 @@ def add_validator_args(cls, parser):
         default=50,
     )
 
+    parser.add_argument(
+        "--neuron.min_concurrency",
+        type=int,
+        help="The lower bound of the adaptive number of miner queries in flight, per forward pipeline.",
+        default=8,
+    )
+
+    parser.add_argument(
+        "--neuron.max_concurrency",
+        type=int,
+        help="The upper bound of the adaptive number of miner queries in flight, per forward pipeline.",
+        default=256,
+    )
+
+    parser.add_argument(
+        "--neuron.query_rate",
+        type=float,
+        help="The number of miners queried per second by each forward pipeline, 0 to query as fast as possible.",
+        default=2,
+    )
+
+    parser.add_argument(
+        "--neuron.pipeline_depth",
+        type=int,
+        help="The number of miner batches in flight in each forward pipeline stage.",
+        default=4,
+    )
+
+    parser.add_argument(
+        "--neuron.max_score_misses",
+        type=int,
+        help="The number of rounds in a row a miner may go without a score before it decays as if it scored 0.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.challenge_pool_size",
+        type=int,
+        help="The number of pre-generated challenges kept ready for the forward pipeline.",
+        default=200,
+    )
+
+    parser.add_argument(
+        "--neuron.challenge_ttl",
+        type=float,
+        help="Seconds after which a pre-generated challenge is considered stale.",
+        default=600,
+    )
+
+    parser.add_argument(
+        "--neuron.sync_interval",
+        type=float,
+        help="Seconds between chain sync, weight setting and state saving checks.",
+        default=12,
+    )
+
+    parser.add_argument(
+        "--neuron.pooled_dendrite",
+        action="store_true",
+        help="Keep connections to miner axons open between sweeps and warm them up before each batch.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.axon_pool_size",
+        type=int,
+        help="The maximum number of pooled connections to miner axons.",
+        default=512,
+    )
+
+    parser.add_argument(
+        "--neuron.axon_keepalive",
+        type=float,
+        help="Seconds an idle pooled connection to a miner axon is kept open.",
+        default=120,
+    )
+
     parser.add_argument(
         "--neuron.disable_set_weights",
         action="store_true",
@@ -215,6 +327,48 @@ def add_validator_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.weights_max_backoff",
+        type=int,
+        help="The maximum number of blocks to wait before retrying a failed set_weights.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--neuron.weights_change_threshold",
+        type=float,
+        help="The L1 distance between normalized weight vectors below which set_weights is skipped.",
+        default=0.02,
+    )
+
+    parser.add_argument(
+        "--neuron.weights_max_staleness",
+        type=int,
+        help="The number of blocks after which weights are set even if they have not changed.",
+        default=1000,
+    )
+
+    parser.add_argument(
+        "--neuron.broadcast_timeout",
+        type=float,
+        help="The number of seconds a balances broadcast to the validator server may take.",
+        default=30,
+    )
+
+    parser.add_argument(
+        "--neuron.broadcast_max_retries",
+        type=int,
+        help="How many times a failed balances broadcast is retried before it is dropped.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.checkpoint_generations",
+        type=int,
+        help="The number of validator state checkpoints kept on disk, the newest readable one is loaded on start.",
+        default=3,
+    )
+
     parser.add_argument(
         "--neuron.moving_average_alpha",
         type=float,
@@ -260,6 +414,20 @@ def add_validator_args(cls, parser):
         default="http://127.0.0.1:3000",
     )
 
+    parser.add_argument(
+        "--validator_server.max_connections",
+        type=int,
+        help="The maximum number of pooled keep-alive connections to the validator server. Score long-polls use a pool of their own.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--validator_server.max_concurrency",
+        type=int,
+        help="The maximum number of requests in flight to a single validator server endpoint.",
+        default=64,
+    )
+
 
 def config(cls):
     """
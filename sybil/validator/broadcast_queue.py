@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import bittensor as bt
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class BroadcastQueue:
+    """
+    Outbound queue that sends snapshots to the validator server in the background, newest first and only once.
+
+    :meth:`submit` is thread-safe and returns right away, so the chain executor resyncing the metagraph never waits on
+    the validator server. Only the newest snapshot matters, a snapshot that is still pending when a newer one is
+    submitted is dropped. A send that fails or times out is retried with a doubling backoff, up to ``max_retries``
+    times, unless a newer snapshot arrived in the meantime. A response without ``success`` is a rejection of the
+    snapshot itself and is not retried.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[Any], Awaitable[Dict[str, Any]]],
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 2,
+    ):
+        """
+        Args:
+            name (str): Name of the broadcast, used in logs.
+            send (Callable): Posts a snapshot to the validator server and returns the decoded json response.
+            timeout (float): Seconds a single send may take.
+            max_retries (int): How many times a failed send is retried.
+            backoff (float): Seconds before the first retry, doubled on every further retry.
+        """
+        self.name = name
+        self.send = send
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.submitted = 0
+        self.sent = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failed = 0
+        self.retries = 0
+        self.in_flight = False
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Any] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Number of snapshots not delivered yet, the pending one plus the one being sent."""
+        with self._lock:
+            return int(self._pending is not None) + int(self.in_flight)
+
+    def submit(self, snapshot: Any):
+        """
+        Queues a snapshot for sending, replacing the pending one. Safe to call from any thread.
+
+        Args:
+            snapshot (Any): The payload handed to ``send``.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = snapshot
+            self.submitted += 1
+            loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self):
+        """Starts sending in the background on the running event loop, snapshots submitted before are sent first."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            if self._pending is not None:
+                self._wake.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops sending, a pending snapshot is kept for the next :meth:`start`."""
+        with self._lock:
+            self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _take(self) -> Optional[Any]:
+        with self._lock:
+            snapshot, self._pending = self._pending, None
+            self.in_flight = snapshot is not None
+            return snapshot
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            snapshot = self._take()
+            if snapshot is None:
+                continue
+            try:
+                await self._deliver(snapshot)
+            finally:
+                self.in_flight = False
+
+    async def _deliver(self, snapshot: Any):
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Wait out the backoff, but give up on this snapshot as soon as a newer one is submitted
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.backoff * 2 ** (attempt - 1))
+                except asyncio.TimeoutError:
+                    pass
+                with self._lock:
+                    if self._pending is not None:
+                        self.dropped += 1
+                        return
+                self.retries += 1
+
+            try:
+                result = await asyncio.wait_for(self.send(snapshot), self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bt.logging.warning(f"Failed to broadcast {self.name} (attempt {attempt + 1}/{self.max_retries + 1}): {e!r}")
+                continue
+
+            if isinstance(result, dict) and result.get("success"):
+                self.sent += 1
+                return
+            self.rejected += 1
+            error = result.get("error") if isinstance(result, dict) else result
+            bt.logging.error(f"Validator server rejected the {self.name} broadcast: {error}")
+            return
+
+        self.failed += 1
+        bt.logging.error(f"Giving up on the {self.name} broadcast after {self.max_retries + 1} attempts")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the queue depth and delivery counters."""
+        return {
+            "depth": self.depth,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
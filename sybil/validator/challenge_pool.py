@@ -0,0 +1,199 @@
+import time
+import asyncio
+import bittensor as bt
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sybil.protocol import Challenge
+from sybil.validator.client import ValidatorServerClient
+from sybil.validator.utils import dispatch_challenges, generate_challenges, wait_for_validator_container
+
+
+# Placeholder uid the validator server stores for challenges that are not bound to a miner yet
+UNBOUND_UID = "unknown"
+
+# Largest number of challenges requested in one refill, the server caps batch requests
+MAX_REFILL = 512
+
+
+class ChallengePool:
+    """
+    Keeps a stock of pre-generated challenges ahead of the forward pipeline.
+
+    A background task tops the pool up whenever it drops below its target size, so dispatching a batch only costs the
+    validator server a single update instead of generating challenges. Challenges are generated unbound and bound to a
+    miner uid on the server when they are taken, which also restarts their clock, so the time to solve a challenge does
+    not include the time it spent in the pool. Entries that would go stale before a miner could finish them, that is
+    older than ``ttl - dispatch_margin`` seconds, are dropped instead of handed out.
+
+    Validator servers that cannot bind challenges would measure the time to solve from generation, against those the
+    pool stays empty and every challenge is generated for its miner uid on the spot.
+    """
+
+    def __init__(
+        self,
+        client: ValidatorServerClient,
+        size: int,
+        ttl: float,
+        dispatch_margin: float,
+        refill_interval: float = 1.0,
+    ):
+        self.client = client
+        self.size = size
+        self.ttl = ttl
+        self.dispatch_margin = dispatch_margin
+        self.refill_interval = refill_interval
+
+        self._entries: Deque[Tuple[float, Challenge]] = deque()
+        self._low = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.generated = 0
+        self.served = 0
+        self.expired = 0
+        self.misses = 0
+        self.unbound = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self):
+        """Starts topping up the pool in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._low.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the background refill."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _expire(self):
+        deadline = time.monotonic() - (self.ttl - self.dispatch_margin)
+        while self._entries and self._entries[0][0] < deadline:
+            self._entries.popleft()
+            self.expired += 1
+
+    def _seconds_until_expiry(self) -> float:
+        if not self._entries:
+            return self.refill_interval
+        expires_at = self._entries[0][0] + (self.ttl - self.dispatch_margin)
+        return max(self.refill_interval, expires_at - time.monotonic())
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the validator server can bind pooled challenges, unknown until the first dispatch."""
+        return self.client.capabilities.get("dispatch_challenges") is not False
+
+    async def take(self, miner_uids: List[int]) -> List[Challenge]:
+        """
+        Hands out one challenge per miner uid, bound to that uid on the validator server.
+
+        Challenges come from the pool when it has fresh ones, anything missing or failing to bind is generated on the
+        spot.
+
+        Args:
+            miner_uids (List[int]): The miner uids to dispatch to.
+
+        Returns:
+            List[Challenge]: The bound challenges in the order of ``miner_uids``, or an empty list if the missing
+                challenges could not be generated.
+        """
+        self._expire()
+
+        pooled = []
+        while self.enabled and self._entries and len(pooled) < len(miner_uids):
+            pooled.append(self._entries.popleft()[1])
+        self._low.set()
+
+        # Bind the pooled challenges, only the ones the server confirms are handed out
+        challenges: List[Optional[Challenge]] = [None] * len(miner_uids)
+        if pooled:
+            bound = await self._dispatch(pooled, miner_uids[:len(pooled)])
+            for index, challenge in enumerate(pooled):
+                challenges[index] = bound.get(challenge.challenge)
+            self.unbound += sum(challenge is None for challenge in challenges[:len(pooled)])
+
+        # Generate whatever the pool could not cover directly for the remaining uids, the server health is left to
+        # the request retries so a miss does not add a health check round trip to the batch
+        missing = [index for index, challenge in enumerate(challenges) if challenge is None]
+        if len(missing) > 0:
+            self.misses += len(missing)
+            generated = await generate_challenges(
+                miner_uids=[miner_uids[index] for index in missing], client=self.client, check_health=False
+            )
+            if len(generated) != len(missing):
+                return []
+            self.generated += len(generated)
+            for index, challenge in zip(missing, generated):
+                challenges[index] = challenge
+
+        self.served += len(miner_uids)
+        return challenges
+
+    async def _dispatch(self, challenges: List[Challenge], miner_uids: List[int]) -> Dict[str, Challenge]:
+        try:
+            bound = await dispatch_challenges(challenges, miner_uids, client=self.client)
+        except Exception as e:
+            bt.logging.warning(f"Failed to dispatch {len(challenges)} pooled challenges: {e!r}")
+            return {}
+
+        # The server cannot bind challenges, drop the pool rather than hand out challenges timed from generation
+        if bound is None:
+            self.expired += len(self._entries)
+            self._entries.clear()
+            return {}
+        return bound
+
+    async def _run(self):
+        healthy = False
+        while True:
+            # Wake up when challenges are taken, or when the oldest entry is about to go stale
+            try:
+                await asyncio.wait_for(self._low.wait(), timeout=self._seconds_until_expiry())
+            except asyncio.TimeoutError:
+                pass
+            self._low.clear()
+            self._expire()
+
+            if not self.enabled:
+                bt.logging.info("Challenge pool disabled, the validator server cannot bind pooled challenges")
+                return
+
+            missing = min(self.size - len(self._entries), MAX_REFILL)
+            if missing <= 0:
+                continue
+
+            # Only block on the health check when the last refill did not work out
+            if not healthy:
+                await wait_for_validator_container(self.client)
+
+            generated = await generate_challenges(miner_uids=[UNBOUND_UID] * missing, client=self.client, check_health=False)
+            healthy = len(generated) > 0
+            now = time.monotonic()
+            self._entries.extend((now, challenge) for challenge in generated)
+            self.generated += len(generated)
+            bt.logging.debug(f"Challenge pool refilled with {len(generated)} challenges, {len(self._entries)} ready")
+
+            # Go again right away while the pool is short, after a pause if the refill failed
+            if not healthy:
+                await asyncio.sleep(self.refill_interval)
+            if len(self._entries) < self.size:
+                self._low.set()
+
+    def stats(self) -> dict:
+        """Returns pool size and usage counters."""
+        return {
+            "ready": len(self._entries),
+            "generated": self.generated,
+            "served": self.served,
+            "expired": self.expired,
+            "misses": self.misses,
+            "unbound": self.unbound,
+        }
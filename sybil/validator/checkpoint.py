@@ -0,0 +1,195 @@
+import os
+import glob
+import time
+import tempfile
+import threading
+import numpy as np
+import bittensor as bt
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def pack_hotkeys(hotkeys: List[str]) -> np.ndarray:
+    """Packs hotkeys as fixed width ascii bytes, a quarter of the size of a NumPy unicode array."""
+    return np.array([hotkey.encode() for hotkey in hotkeys], dtype=np.bytes_)
+
+
+def unpack_hotkeys(packed: np.ndarray) -> List[str]:
+    """Unpacks hotkeys saved by :func:`pack_hotkeys`, or as a unicode array by older checkpoints."""
+    return [hotkey.decode() if isinstance(hotkey, bytes) else str(hotkey) for hotkey in np.asarray(packed).tolist()]
+
+
+class CheckpointWriter:
+    """
+    Writes ``.npz`` checkpoints atomically from a background thread and keeps the last few generations.
+
+    :meth:`submit` only hands the state over, the write happens on the writer thread. States submitted while a write
+    is running are coalesced, only the newest one is written afterwards. Every write goes to a temporary file in the
+    same directory which is fsynced and then renamed over ``path``, so ``path`` always holds a complete checkpoint.
+    The previous checkpoint is kept as ``<name>.1.npz``, the one before as ``<name>.2.npz`` and so on, :meth:`load`
+    returns the newest one that can be read in full.
+    """
+
+    def __init__(self, path: str, generations: int = 3):
+        """
+        Args:
+            path (str): Path of the newest checkpoint, e.g. ``state.npz``.
+            generations (int): Number of checkpoints kept, including the newest.
+        """
+        self.path = path
+        self.generations = max(1, generations)
+
+        self.requested = 0
+        self.written = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.last_write_seconds: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._scheduled = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="validator-checkpoint")
+
+        self._remove_temporary_files()
+
+    def generation_path(self, generation: int) -> str:
+        """Returns the path of a generation, 0 being the newest."""
+        if generation == 0:
+            return self.path
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{generation}{ext}"
+
+    def submit(self, state: Dict[str, Any]):
+        """
+        Queues a state to be written, replacing a state that is still waiting. Returns right away.
+
+        Args:
+            state (Dict[str, Any]): The arrays to save, by name.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = state
+            self.requested += 1
+            if self._scheduled:
+                return
+            self._scheduled = True
+            self._idle.clear()
+        self._executor.submit(self._drain)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every submitted state is written.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait.
+
+        Returns:
+            bool: Whether the writer is idle.
+        """
+        return self._idle.wait(timeout)
+
+    def load(self, required: Iterable[str] = ()) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Loads the newest checkpoint that can be read in full and contains the required arrays.
+
+        Args:
+            required (Iterable[str]): Names of arrays a checkpoint must contain to be used.
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: The arrays by name, or None if there is no usable checkpoint.
+        """
+        for generation in range(self.generations):
+            path = self.generation_path(generation)
+            if not os.path.exists(path):
+                continue
+            try:
+                # Reading every array in full checks the crc of every member
+                with np.load(path, allow_pickle=False) as data:
+                    state = {name: data[name] for name in data.files}
+                missing = [name for name in required if name not in state]
+                if missing:
+                    raise KeyError(f"missing {missing}")
+            except Exception as e:
+                bt.logging.warning(f"Skipping unreadable checkpoint {path}: {e!r}")
+                continue
+            if generation:
+                bt.logging.warning(f"Loaded checkpoint generation {generation} from {path}")
+            return state
+        return None
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                state, self._pending = self._pending, None
+                if state is None:
+                    self._scheduled = False
+                    self._idle.set()
+                    return
+            try:
+                start = time.perf_counter()
+                self._write(state)
+                self.last_write_seconds = time.perf_counter() - start
+                self.written += 1
+            except Exception as e:
+                self.failed += 1
+                bt.logging.error(f"Failed to write checkpoint {self.path}: {e!r}")
+
+    def _write(self, state: Dict[str, Any]):
+        directory = os.path.dirname(self.path) or "."
+        root = os.path.splitext(os.path.basename(self.path))[0]
+        fd, temporary = tempfile.mkstemp(prefix=f"{root}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **state)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Shift the older generations up by one, the oldest one falls off
+            for generation in range(self.generations - 1, 0, -1):
+                older = self.generation_path(generation - 1)
+                if os.path.exists(older):
+                    os.replace(older, self.generation_path(generation))
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self._fsync_directory(directory)
+
+    @staticmethod
+    def _fsync_directory(directory: str):
+        # Makes the renames durable, not every platform allows opening a directory
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _remove_temporary_files(self):
+        # Left behind by a crash in the middle of a write
+        root, _ = os.path.splitext(self.path)
+        for temporary in glob.glob(f"{glob.escape(root)}.*.tmp"):
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns write counters and the duration of the last write."""
+        return {
+            "requested": self.requested,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "pending": not self._idle.is_set(),
+            "last_write_seconds": self.last_write_seconds,
+        }
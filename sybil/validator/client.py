@@ -0,0 +1,244 @@
+import time
+import random
+import asyncio
+import aiohttp
+import bittensor as bt
+
+from collections import defaultdict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from sybil.wire import CONTENT_TYPE_JSON, encode
+
+
+# Per-endpoint (timeout in seconds, retries, requests in flight). Score lookups are long-polled by the server so they
+# get a generous timeout and are not retried, retrying would only stack up more held connections. Balances are retried
+# by their broadcast queue, which drops a snapshot once a newer one is waiting. Every endpoint has its own bound on
+# requests in flight, so a burst on one endpoint cannot hold up the others.
+DEFAULT_ENDPOINTS: Dict[str, Tuple[float, int, int]] = {
+    "health": (10, 0, 4),
+    "challenge": (30, 2, 32),
+    "score": (150, 0, 64),
+    "broadcast": (60, 2, 4),
+    "balances": (30, 0, 2),
+}
+
+# Endpoints the server holds open until it has an answer. They are sent over a connection pool of their own, so
+# waiting on scores never takes a connection away from challenge generation or broadcasts.
+LONG_POLL_ENDPOINTS = frozenset({"score"})
+
+# Number of recent latencies kept per endpoint for the percentile stats
+LATENCY_WINDOW = 512
+
+
+class ValidatorServerError(Exception):
+    """Raised when the validator server answers with a server side error."""
+
+
+class ValidatorServerClient:
+    """
+    Shared HTTP client for all calls from the validator neuron to the local validator server.
+
+    Holds keep-alive connection pools so sweeps do not pay a TCP handshake per request, bounds the number of requests
+    in flight per endpoint, and retries transient failures with jittered exponential backoff. Long-polled endpoints,
+    see ``LONG_POLL_ENDPOINTS``, and the score stream use a second pool, the connections they hold open for minutes
+    are never the ones challenge generation and broadcasts need. Connection reuse and per-endpoint latency are tracked
+    and exposed through :meth:`stats`.
+
+    The aiohttp sessions are created lazily so they are bound to the event loop that first uses the client.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_connections: int = 64,
+        max_concurrency: int = 64,
+        keepalive_timeout: float = 60,
+        backoff: float = 0.5,
+        endpoints: Optional[Dict[str, Tuple[float, int, int]]] = None,
+    ):
+        """
+        Args:
+            base_url (str): The url of the validator server.
+            max_connections (int): The number of keep-alive connections in the pool for regular requests.
+            max_concurrency (int): The largest number of requests in flight to a single endpoint, caps the limits in
+                ``endpoints``.
+            keepalive_timeout (float): Seconds an idle pooled connection is kept open.
+            backoff (float): Seconds before the first retry of a failed request.
+            endpoints (dict, optional): Overrides of ``DEFAULT_ENDPOINTS`` by endpoint name.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.keepalive_timeout = keepalive_timeout
+        self.backoff = backoff
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+
+        self._sessions: Dict[bool, aiohttp.ClientSession] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Optional server features, learned on first use so older servers are only probed once
+        self.capabilities: Dict[str, bool] = {}
+
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.retries = 0
+        self.errors = defaultdict(int)
+        self.latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    async def session(self, long_poll: bool = False) -> aiohttp.ClientSession:
+        """
+        Returns a pooled session, creating it on first use.
+
+        Args:
+            long_poll (bool): Whether to return the session for requests the server holds open.
+        """
+        session = self._sessions.get(long_poll)
+        if session is None or session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_created)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+
+            # Held requests are bounded by their endpoint limits, the pool itself is not capped so the score stream
+            # always gets a connection next to them
+            connector = aiohttp.TCPConnector(
+                limit=0 if long_poll else self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+            self._sessions[long_poll] = session
+        return session
+
+    def semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        """Returns the semaphore that bounds the requests in flight to an endpoint."""
+        if endpoint not in self._semaphores:
+            _, _, limit = self.endpoints[endpoint]
+            self._semaphores[endpoint] = asyncio.Semaphore(max(1, min(limit, self.max_concurrency)))
+        return self._semaphores[endpoint]
+
+    async def _on_connection_created(self, session, context, params):
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self.connections_reused += 1
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Any]:
+        """
+        Sends a request to the validator server and returns the status code and decoded JSON body.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path on the validator server, starting with a slash.
+            endpoint (str): The endpoint class used to pick the timeout, retry budget, request limit and connection
+                pool, see ``DEFAULT_ENDPOINTS``.
+            params (dict, optional): Query string parameters.
+            json (Any, optional): JSON body to send.
+            data (bytes, optional): Raw body to send instead of ``json``, see :func:`sybil.wire.encode`.
+            headers (dict, optional): Extra request headers, such as the content type of ``data``.
+
+        Returns:
+            Tuple[int, Any]: The HTTP status code and the decoded JSON body, or None if the body is not JSON.
+
+        Raises:
+            ValidatorServerError: If the server keeps answering with a 5xx status after all retries.
+            aiohttp.ClientError, asyncio.TimeoutError: If the server keeps being unreachable after all retries.
+        """
+        timeout, retries, _ = self.endpoints[endpoint]
+        session = await self.session(long_poll=endpoint in LONG_POLL_ENDPOINTS)
+        semaphore = self.semaphore(endpoint)
+        url = f"{self.base_url}{path}"
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                async with semaphore:
+                    async with session.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json,
+                        data=data,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as resp:
+                        if resp.status >= 500:
+                            raise ValidatorServerError(f"{method} {path} returned {resp.status}")
+                        try:
+                            body = await resp.json(content_type=None)
+                        except ValueError:
+                            body = None
+                        self.latencies[endpoint].append(time.perf_counter() - start)
+                        return resp.status, body
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValidatorServerError) as e:
+                self.errors[endpoint] += 1
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                delay = self.backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                bt.logging.debug(f"{method} {path} failed ({e}), retry {attempt}/{retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def get_json(self, path: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Sends a GET request and returns the decoded JSON body."""
+        _, data = await self.request("GET", path, endpoint, params=params)
+        return data
+
+    async def post_json(self, path: str, endpoint: str, payload: Any) -> Any:
+        """Sends a POST request with a JSON body and returns the decoded JSON body."""
+        _, data = await self.request("POST", path, endpoint, json=payload)
+        return data
+
+    async def post_encoded(self, path: str, endpoint: str, payload: Any, content_type: str = CONTENT_TYPE_JSON) -> Any:
+        """Sends a POST request with the payload encoded as ``content_type`` and returns the decoded JSON body."""
+        body, headers = encode(payload, content_type)
+        _, data = await self.request("POST", path, endpoint, data=body, headers=headers)
+        return data
+
+    async def is_healthy(self) -> bool:
+        """Returns True if the validator server root route answers with 200."""
+        try:
+            status, _ = await self.request("GET", "/", "health")
+            return status == 200
+        except Exception as e:
+            bt.logging.error(f"Validator server not ready yet: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns connection reuse and per-endpoint latency statistics."""
+        connections = self.connections_created + self.connections_reused
+        latency = {}
+        for endpoint, samples in self.latencies.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            latency[endpoint] = {
+                "count": len(ordered),
+                "p50": ordered[len(ordered) // 2],
+                "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max": ordered[-1],
+            }
+        return {
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.connections_reused / connections if connections else 0.0,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "latency": latency,
+        }
+
+    async def close(self):
+        """Closes the pooled sessions."""
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
@@ -0,0 +1,157 @@
+import time
+import asyncio
+import numpy as np
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+# Number of past limit adjustments kept for the metrics
+HISTORY_SIZE = 256
+
+# Weight of the latest window in the healthy error rate and latency baselines
+BASELINE_WEIGHT = 0.2
+
+
+class AIMDLimiter:
+    """
+    Adaptive limit on the number of miner queries in flight, using additive increase and multiplicative decrease.
+
+    Every ``window`` completed queries the limiter compares the window against a baseline learned from healthy windows.
+    When the share of failed queries rises above the baseline error rate by more than ``error_tolerance``, the median
+    response time exceeds the baseline by more than ``latency_tolerance`` times, or the validator server reported new
+    errors, the limit is multiplied by ``decrease``. Otherwise it grows by ``increase``. The limit always stays within
+    ``[min_limit, max_limit]``.
+
+    Miners that never answer fail at a steady rate and end up in the baseline, so only a rise in failures, which points
+    at the validator or its network being saturated, shrinks the limit.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        window: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        error_tolerance: float = 0.1,
+        latency_tolerance: float = 2.0,
+        server_errors: Optional[Callable[[], int]] = None,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(np.clip(initial_limit, self.min_limit, self.max_limit))
+        self.window = window
+        self.increase = increase
+        self.decrease = decrease
+        self.error_tolerance = error_tolerance
+        self.latency_tolerance = latency_tolerance
+        self.server_errors = server_errors
+
+        self.in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._outcomes: List[bool] = []
+        self._latencies: List[float] = []
+        self._baseline_error_rate: Optional[float] = None
+        self._baseline_latency: Optional[float] = None
+        self._server_errors_seen = server_errors() if server_errors is not None else 0
+
+    async def acquire(self):
+        """Waits until a query may be sent."""
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass the wake-up on if it arrived together with the cancellation
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, ok: bool, latency: Optional[float] = None):
+        """
+        Marks a query as finished and feeds its outcome into the limit.
+
+        Args:
+            ok (bool): Whether the query succeeded.
+            latency (float, optional): The response time in seconds, for successful queries.
+        """
+        self.in_flight -= 1
+        self._outcomes.append(ok)
+        if ok and latency is not None:
+            self._latencies.append(latency)
+        if len(self._outcomes) >= self.window:
+            self._adjust()
+        self._wake()
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _adjust(self):
+        error_rate = 1 - sum(self._outcomes) / len(self._outcomes)
+        latency = float(np.median(self._latencies)) if self._latencies else None
+        self._outcomes, self._latencies = [], []
+
+        server_errors = 0
+        if self.server_errors is not None:
+            total = self.server_errors()
+            server_errors, self._server_errors_seen = total - self._server_errors_seen, total
+
+        congested = server_errors > 0
+        if self._baseline_error_rate is not None and error_rate > self._baseline_error_rate + self.error_tolerance:
+            congested = True
+        if latency is not None and self._baseline_latency is not None and latency > self._baseline_latency * self.latency_tolerance:
+            congested = True
+
+        if congested:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self.decreases += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+            self.increases += 1
+
+            # Only healthy windows move the baselines, a saturated window must not become the new normal
+            self._baseline_error_rate = self._update_baseline(self._baseline_error_rate, error_rate)
+            if latency is not None:
+                self._baseline_latency = self._update_baseline(self._baseline_latency, latency)
+
+        self.history.append({
+            "time": time.time(),
+            "limit": int(self.limit),
+            "error_rate": error_rate,
+            "latency_p50": latency,
+            "server_errors": server_errors,
+            "congested": congested,
+        })
+
+    @staticmethod
+    def _update_baseline(baseline: Optional[float], value: float) -> float:
+        if baseline is None:
+            return value
+        return (1 - BASELINE_WEIGHT) * baseline + BASELINE_WEIGHT * value
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the current limit and adjustment counters."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "baseline_error_rate": self._baseline_error_rate,
+            "baseline_latency": self._baseline_latency,
+        }
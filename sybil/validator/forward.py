@@ -17,16 +17,11 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import time
-import math
-import bittensor as bt
 import asyncio
-import aiohttp
+import bittensor as bt
 import numpy as np
 
-from sybil.validator.utils import generate_challenges
-from sybil.validator.reward import get_rewards
-from sybil.base.consts import BURN_UID, BURN_WEIGHT
+from sybil.validator.pipeline import run_pipeline
 
 async def forward(self):
     """
@@ -39,128 +34,48 @@ async def forward(self):
 
     """
     
-    # Post miner and validator info to the container    
-    await broadcast_neurons(self.metagraph, self.validator_server_url)
-    
-    # initialize the total rewards
-    all_rewards = []
-    
-    # shuffle the miner uids
-    shuffled_miner_uids = np.random.permutation(self.metagraph.n.item())
-    bt.logging.info(f"Number of shuffled miner uids in total: {len(shuffled_miner_uids)}")
-    
-    # remove the uids with duplicate ips
-    unique_ips = set()
-    unique_miner_uids = []
-    for uid in shuffled_miner_uids:
-        ip = self.metagraph.axons[uid].ip
-        if ip not in unique_ips:
-            unique_ips.add(ip)
-            unique_miner_uids.append(uid)
-    
-    shuffled_miner_uids = np.array(unique_miner_uids)
-    bt.logging.info(f"Number of miner uids after removing duplicate IPs: {len(shuffled_miner_uids)}")
-    
-    batch_size = self.config.neuron.sample_size
-    num_batches = math.ceil(len(shuffled_miner_uids) / batch_size)
+    # The metagraph is swapped for a new one on every resync, the round works on the one it started with
+    metagraph = self.metagraph
+
+    # Post miner and validator info to the container, only what changed since the last broadcast is sent
+    await self.neuron_broadcaster.broadcast(self.metagraph_snapshot)
     
-    # iterate all the shuffled miner uids by batch size
-    for i in range(num_batches):
-        # get the miner uids for the current batch
-        miner_uids = shuffled_miner_uids[i*batch_size:(i+1)*batch_size]
-        bt.logging.info(f"Batch {i+1} ==> Miner uids: {miner_uids}")
-        
-        # Generate k challenges
-        challenges = await generate_challenges(miner_uids=miner_uids, validator_server_url=self.validator_server_url)
-        bt.logging.info(f"Batch {i+1} ==> Generated challenges:\n" + "\n".join([str(challenge) for challenge in challenges]))
-        
-        # Check if challenges is None or an empty list
-        if challenges is None or len(challenges) == 0:
-            bt.logging.error("Batch {i+1} ==> Failed to generate challenges")
-            time.sleep(10)
-            return
-
-        # Create concurrent queries, one for each challenge-miner pair
-        async_queries = [
-            self.dendrite(
-                axons=[self.metagraph.axons[uid]],
-                synapse=challenge,
-                deserialize=True,
-                timeout=120.0,
-            )
-            for uid, challenge in zip(miner_uids, challenges)
-        ]
-
-        # Execute all queries concurrently
-        responses = await asyncio.gather(*async_queries)
-
-        bt.logging.info(f"Batch {i+1} ==> Received Raw responses: {responses}")
-        # Flatten the responses list since each query returns a list with one item
-        responses = [resp[0] for resp in responses]
-
-        # Log the results for monitoring purposes.
-        bt.logging.info(f"Batch {i+1} ==> Received responses: {responses}")
-        
-        # Get scores for the responses
-        rewards = await get_rewards([challenge.challenge for challenge in challenges], responses, validator_server_url=self.validator_server_url)
-        bt.logging.info(f"Batch {i+1} ==> Scores: {rewards}")
-        
-        if rewards is None:
-            bt.logging.error(f"Batch {i+1} ==> Failed to get rewards. Adding 0 scores to the total rewards")
-            all_rewards.extend([0] * len(miner_uids))
-            continue
-
-        all_rewards.extend(rewards)
-
-    # Update the scores based on the rewards. You may want to define your own update_scores function for custom behavior.
-    bt.logging.info(f"Updating final scores: {all_rewards}")
-
-    # Check that the score array is of equal length to the shuffled miner uids, only post updates to chain if so
-    if len(all_rewards) == len(shuffled_miner_uids):
-        bt.logging.info(f"Length match: {len(all_rewards)} rewards for {len(shuffled_miner_uids)} miner uids. Posting updates to chain.")
-
-        # Update the scores in the metagraph
-        self.update_scores(all_rewards, shuffled_miner_uids)
-
-    else:
-        bt.logging.error(f"Length mismatch: {len(all_rewards)} rewards for {len(shuffled_miner_uids)} miner uids. Not posting updates to chain.")
-
-    time.sleep(10)
-
-
-async def broadcast_neurons(metagraph, server_url):
-    """
-    Broadcast the neurons to the server.
-    """
-    bt.logging.info(f"Broadcasting neurons to {server_url}/protocol/broadcast/neurons")
-
-    neurons_info = []
-    block = int(metagraph.block)
-    for neuron in metagraph.neurons:
-        uid = neuron.uid
-        neurons_info.append({
-            'uid': uid,
-            'ip': metagraph.axons[uid].ip,
-            'validator_trust': neuron.validator_trust,
-            'trust': neuron.trust,
-            "alpha_stake": float(metagraph.alpha_stake[uid].item()),
-            'stake_weight': float(metagraph.S[uid].item()),
-            'block': block,
-            'hotkey': neuron.hotkey,
-            'coldkey': neuron.coldkey,
-            'excluded': uid == BURN_UID,
-        })
-    bt.logging.info(f"Submitting neurons info: {len(neurons_info)} neurons")
-    try:     
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{server_url}/protocol/broadcast/neurons",
-                json={"neurons": neurons_info}
-            ) as resp:
-                result = await resp.json()
-                if result["success"]:
-                    bt.logging.info(f"Broadcasted neurons info: {len(neurons_info)} neurons")
-                else:
-                    bt.logging.error(f"Failed to broadcast neurons info")
-    except Exception as e:
-        bt.logging.error(f"Failed to broadcast neurons info: {e}")
\ No newline at end of file
+    # One miner per ip, picked at random so miners sharing an ip take turns
+    unique_miner_uids = [int(uid) for uid in self.metagraph_index.unique_ip_uids()]
+    bt.logging.info(f"Number of miner uids after removing duplicate IPs: {len(unique_miner_uids)} of {metagraph.n.item()}")
+
+    # Query every miner once this round, most stale first. The concurrent pipelines share the round, each one
+    # claiming the next batch from the scheduler when it has room, so no miner is challenged twice. Miners that
+    # register while the round runs are added to it.
+    self.scheduler.sync(metagraph.hotkeys, int(metagraph.block))
+    self.scheduler.begin_round(unique_miner_uids)
+    results = await asyncio.gather(
+        *(run_pipeline(self) for _ in range(max(1, self.config.neuron.num_concurrent_forwards)))
+    )
+    scored_uids = [uid for uids, _ in results for uid in uids]
+    all_rewards = [reward for _, rewards in results for reward in rewards]
+    round_uids = sorted(self.scheduler.round_members)
+
+    # Scores were committed batch by batch inside the pipelines
+    bt.logging.info(f"Scored {len(scored_uids)} of {len(round_uids)} miner uids this round: {all_rewards}")
+
+    # Miners sharing an ip with another miner are not queried, they decay towards 0 once per round as before
+    skipped_uids = np.setdiff1d(np.arange(metagraph.n.item()), round_uids)
+    if len(skipped_uids):
+        self.update_scores(np.zeros(len(skipped_uids)), skipped_uids)
+
+    bt.logging.info(f"Validator server client stats: {self.validator_server.stats()}")
+    bt.logging.info(f"Neuron broadcast stats: {self.neuron_broadcaster.stats()}")
+    bt.logging.info(f"Balance broadcast stats: {self.balance_queue.stats()}")
+    bt.logging.info(f"Checkpoint stats: {self.checkpoints.stats()}")
+    bt.logging.info(f"Challenge pool stats: {self.challenge_pool.stats()}")
+    bt.logging.info(f"Scheduler stats: {self.scheduler.stats()}")
+    bt.logging.info(f"Miner latency stats: {self.latency.stats()}")
+    bt.logging.info(f"Concurrency stats: {self.concurrency.stats()}")
+    if hasattr(self.dendrite, "stats"):
+        bt.logging.info(f"Dendrite pool stats: {self.dendrite.stats()}")
+
+    # Rounds are paced by the query rate, only back off when there was nothing to query
+    if not scored_uids:
+        await asyncio.sleep(10)
+
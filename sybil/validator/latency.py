@@ -0,0 +1,108 @@
+import numpy as np
+import bittensor as bt
+
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+
+# Number of recent successful response times kept per miner
+LATENCY_WINDOW = 32
+
+# A miner that has never answered still gets the full default timeout once every this many queries,
+# so a slow but working miner is not stuck behind the minimum timeout forever.
+PROBE_INTERVAL = 8
+
+# Cap on how many times the timeout is doubled after consecutive failures
+MAX_BACKOFF_DOUBLINGS = 6
+
+
+class MinerLatency:
+    """Recent response times and consecutive failures of a single miner."""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.failures = 0
+
+
+class LatencyTracker:
+    """
+    Derives a per-miner query timeout from how fast each miner has answered recently.
+
+    History is keyed by ``(uid, hotkey)`` so a uid that changes hands starts from scratch. A miner with no history gets
+    the configured default timeout. A miner that has answered before gets the chosen percentile of its recent response
+    times plus a margin, doubled for every consecutive failure since. A miner that has never answered gets the minimum
+    timeout, except for a periodic probe with the default. Every timeout is clipped to ``[min_timeout, default_timeout]``.
+    """
+
+    def __init__(self, default_timeout: float, min_timeout: float, percentile: float = 95, margin: float = 5.0):
+        self.default_timeout = default_timeout
+        self.min_timeout = min(min_timeout, default_timeout)
+        self.percentile = percentile
+        self.margin = margin
+
+        self._miners: Dict[Tuple[int, str], MinerLatency] = {}
+
+    def timeout(self, uid: int, hotkey: str) -> float:
+        """
+        Returns the timeout to use for the next query to a miner.
+
+        Args:
+            uid (int): The miner uid.
+            hotkey (str): The hotkey currently registered on that uid.
+
+        Returns:
+            float: The timeout in seconds.
+        """
+        miner = self._miners.get((uid, hotkey))
+        if miner is None or (not miner.latencies and miner.failures == 0):
+            return self.default_timeout
+
+        if not miner.latencies:
+            return self.default_timeout if miner.failures % PROBE_INTERVAL == 0 else self.min_timeout
+
+        timeout = np.percentile(miner.latencies, self.percentile) + self.margin
+        timeout *= 2 ** min(miner.failures, MAX_BACKOFF_DOUBLINGS)
+        return float(np.clip(timeout, self.min_timeout, self.default_timeout))
+
+    def record(self, uid: int, hotkey: str, response: bt.Synapse):
+        """
+        Records the outcome of a query.
+
+        Args:
+            uid (int): The miner uid.
+            hotkey (str): The hotkey the query was sent to.
+            response (bt.Synapse): The undeserialized response synapse.
+        """
+        miner = self._miners.setdefault((uid, hotkey), MinerLatency())
+
+        process_time = response.dendrite.process_time
+        if response.dendrite.status_code != 200 or process_time is None:
+            miner.failures += 1
+            return
+
+        miner.latencies.append(float(process_time))
+        miner.failures = 0
+
+    def prune(self, hotkeys: List[str]):
+        """
+        Drops the history of uids whose hotkey changed or that left the metagraph.
+
+        Args:
+            hotkeys (List[str]): The hotkeys currently in the metagraph, indexed by uid.
+        """
+        for uid, hotkey in list(self._miners.keys()):
+            if uid >= len(hotkeys) or hotkeys[uid] != hotkey:
+                del self._miners[(uid, hotkey)]
+
+    def stats(self) -> Dict[str, float]:
+        """Returns a summary of the tracked miners and the timeouts they currently get."""
+        keys = list(self._miners.keys())
+        if not keys:
+            return {"tracked": 0}
+        timeouts = [self.timeout(uid, hotkey) for uid, hotkey in keys]
+        return {
+            "tracked": len(keys),
+            "failing": sum(1 for key in keys if self._miners[key].failures > 0),
+            "timeout_p50": float(np.percentile(timeouts, 50)),
+            "timeout_max": float(np.max(timeouts)),
+        }
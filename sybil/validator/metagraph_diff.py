@@ -0,0 +1,85 @@
+import numpy as np
+import bittensor as bt
+
+
+class MetagraphDiff:
+    """
+    The uids that changed between two metagraph syncs.
+
+    Attributes:
+        replaced (np.ndarray): Uids present in both syncs whose hotkey changed.
+        added (np.ndarray): Uids that joined the metagraph.
+        removed (np.ndarray): Uids that left the metagraph.
+        moved (np.ndarray): Uids present in both syncs whose axon info changed.
+    """
+
+    def __init__(self, replaced: np.ndarray, added: np.ndarray, removed: np.ndarray, moved: np.ndarray):
+        self.replaced = replaced
+        self.added = added
+        self.removed = removed
+        self.moved = moved
+
+    @property
+    def changed(self) -> np.ndarray:
+        """Uids of the current metagraph whose hotkey or axon changed, or that are new."""
+        return np.union1d(np.union1d(self.replaced, self.moved), self.added)
+
+    @property
+    def axons_changed(self) -> bool:
+        """Whether any axon changed, joined or left."""
+        return bool(self.moved.size or self.added.size or self.removed.size)
+
+    def __str__(self) -> str:
+        return (
+            f"MetagraphDiff(replaced={self.replaced.size}, added={self.added.size}, "
+            f"removed={self.removed.size}, moved={self.moved.size})"
+        )
+
+
+class MetagraphFingerprint:
+    """
+    Compact copy of the parts of the metagraph a resync compares: the hotkeys and a hash of every axon info. Diffing
+    two fingerprints is a few vector comparisons, no copy of the metagraph itself is kept.
+    """
+
+    def __init__(self, hotkeys: np.ndarray, axon_hashes: np.ndarray):
+        self.hotkeys = hotkeys
+        self.axon_hashes = axon_hashes
+
+    @classmethod
+    def from_metagraph(cls, metagraph: "bt.metagraph") -> "MetagraphFingerprint":
+        axons = metagraph.axons
+        return cls(
+            hotkeys=np.array(metagraph.hotkeys, dtype=str),
+            axon_hashes=np.fromiter(
+                (
+                    hash((
+                        axon.version, axon.ip, axon.port, axon.ip_type, axon.hotkey, axon.coldkey,
+                        axon.protocol, axon.placeholder1, axon.placeholder2,
+                    ))
+                    for axon in axons
+                ),
+                dtype=np.int64,
+                count=len(axons),
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.hotkeys)
+
+    def diff(self, previous: "MetagraphFingerprint") -> MetagraphDiff:
+        """
+        Compares this fingerprint against the one of the previous sync.
+
+        Args:
+            previous (MetagraphFingerprint): The fingerprint taken before the sync.
+
+        Returns:
+            MetagraphDiff: The uids that were replaced, added, removed or whose axon changed.
+        """
+        common = min(len(self), len(previous))
+        replaced = np.flatnonzero(self.hotkeys[:common] != previous.hotkeys[:common])
+        moved = np.flatnonzero(self.axon_hashes[:common] != previous.axon_hashes[:common])
+        added = np.arange(common, len(self))
+        removed = np.arange(common, len(previous))
+        return MetagraphDiff(replaced, added, removed, moved)
@@ -0,0 +1,118 @@
+import threading
+import numpy as np
+import bittensor as bt
+
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class MetagraphIndex:
+    """
+    Lookup tables derived from the metagraph: uid to ip, ip to uids and hotkey to uid.
+
+    The index is built once from the full metagraph and afterwards only the uids reported as changed by
+    :meth:`update` are touched in the lookup tables. The ip groups used to pick one miner per ip are kept as numpy
+    arrays, so choosing the miners of a round is a handful of vector operations instead of a Python loop over the
+    metagraph.
+
+    Updates come from the metagraph sync on the chain executor while rounds read the index on the event loop, so
+    updates are serialized with a lock and readers always see a complete set of group arrays.
+    """
+
+    def __init__(self, metagraph: "bt.metagraph"):
+        self._lock = threading.Lock()
+        self.build(metagraph)
+
+    def build(self, metagraph: "bt.metagraph"):
+        """Rebuilds the whole index from the metagraph."""
+        with self._lock:
+            self.ips = np.array([axon.ip for axon in metagraph.axons], dtype=object)
+            self.hotkeys = np.array(metagraph.hotkeys, dtype=object)
+
+            self._uid_by_hotkey: Dict[str, int] = {hotkey: uid for uid, hotkey in enumerate(self.hotkeys)}
+            self._uids_by_ip: Dict[str, Set[int]] = {}
+            for uid, ip in enumerate(self.ips):
+                self._uids_by_ip.setdefault(ip, set()).add(uid)
+
+            self._rebuild_groups()
+
+    def update(self, metagraph: "bt.metagraph", uids: Iterable[int]):
+        """
+        Applies changed axons and hotkeys of the given uids, and any growth or shrinkage of the metagraph.
+
+        Args:
+            metagraph (bt.metagraph): The freshly synced metagraph.
+            uids (Iterable[int]): The uids whose axon or hotkey changed.
+        """
+        n = len(metagraph.hotkeys)
+        with self._lock:
+            changed = set(uids)
+            previous_n = len(self.ips)
+
+            # Drop uids that left the metagraph and make room for new ones
+            changed.update(range(n, previous_n))
+            if n != previous_n:
+                ips = np.empty(n, dtype=object)
+                hotkeys = np.empty(n, dtype=object)
+                keep = min(n, previous_n)
+                ips[:keep], hotkeys[:keep] = self.ips[:keep], self.hotkeys[:keep]
+                changed.update(range(previous_n, n))
+            else:
+                ips, hotkeys = self.ips, self.hotkeys
+
+            for uid in changed:
+                # Remove the old entries of the uid
+                if uid < previous_n:
+                    old_ip, old_hotkey = self.ips[uid], self.hotkeys[uid]
+                    uids_on_ip = self._uids_by_ip.get(old_ip)
+                    if uids_on_ip is not None:
+                        uids_on_ip.discard(uid)
+                        if not uids_on_ip:
+                            del self._uids_by_ip[old_ip]
+                    if self._uid_by_hotkey.get(old_hotkey) == uid:
+                        del self._uid_by_hotkey[old_hotkey]
+
+                # Add the new entries of the uid
+                if uid < n:
+                    ip, hotkey = metagraph.axons[uid].ip, metagraph.hotkeys[uid]
+                    ips[uid], hotkeys[uid] = ip, hotkey
+                    self._uids_by_ip.setdefault(ip, set()).add(uid)
+                    self._uid_by_hotkey[hotkey] = uid
+
+            self.ips, self.hotkeys = ips, hotkeys
+            if changed:
+                self._rebuild_groups()
+
+    def _rebuild_groups(self):
+        # Sort the uids by ip so every ip is one contiguous group in the order array
+        if len(self.ips) == 0:
+            self._groups = (np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=int))
+            return
+        _, inverse = np.unique(self.ips.astype(str), return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        sizes = np.bincount(inverse)
+        starts = np.cumsum(sizes) - sizes
+        self._groups = (order, starts, sizes)
+
+    def uid_for_hotkey(self, hotkey: str) -> Optional[int]:
+        """Returns the uid registered with a hotkey, or None."""
+        return self._uid_by_hotkey.get(hotkey)
+
+    def uids_for_ip(self, ip: str) -> List[int]:
+        """Returns the uids serving from an ip."""
+        return sorted(self._uids_by_ip.get(ip, ()))
+
+    def ip_for_uid(self, uid: int) -> str:
+        """Returns the ip a uid serves from."""
+        return self.ips[uid]
+
+    def unique_ip_uids(self) -> np.ndarray:
+        """
+        Picks one uid per ip at random, so miners sharing an ip take turns being queried.
+
+        Returns:
+            np.ndarray: One uid for every distinct ip in the metagraph.
+        """
+        order, starts, sizes = self._groups
+        if len(sizes) == 0:
+            return np.empty(0, dtype=int)
+        return order[starts + np.random.randint(0, sizes)]
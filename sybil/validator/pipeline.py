@@ -0,0 +1,279 @@
+import time
+import asyncio
+import bittensor as bt
+import numpy as np
+
+from typing import List, Tuple
+
+from sybil.dendrite import fan_out_all
+from sybil.protocol import StreamingChallenge
+from sybil.validator.reward import get_rewards
+
+
+# Sentinel used to tell the next stage that the previous one has drained
+_DONE = object()
+
+
+class QueryPacer:
+    """
+    Spaces out miner batches so that, across every pipeline sharing it, miners are queried at ``rate`` per second.
+
+    Each batch reserves the next free slot and waits for it. Slots never lie in the past, so an idle period does not
+    turn into a burst afterwards.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = time.monotonic()
+
+    async def wait(self, n: int):
+        """Waits for the turn of a batch of ``n`` miners."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        at = max(self._next, now)
+        self._next = at + n / self.rate
+        await asyncio.sleep(at - now)
+
+
+def admit_new_miners(self, metagraph, admitted: List[int]):
+    """
+    Adds miners that registered or changed hands since the round started to the scheduler's open round.
+
+    One miner per ip is queried each round, a new miner whose ip already has a miner in the round waits for a later
+    round like the other miners on that ip.
+
+    Args:
+        self (:obj:`bittensor.neuron.Neuron`): The validator neuron.
+        metagraph (:obj:`bittensor.metagraph`): The metagraph the scheduler was synced with.
+        admitted (List[int]): The uids reported as new by :meth:`MinerScheduler.sync`.
+    """
+    if not admitted:
+        return
+    axons = metagraph.axons
+    uids_by_ip = {}
+    for uid in self.scheduler.round_members:
+        if uid < len(axons):
+            uids_by_ip.setdefault(axons[uid].ip, set()).add(uid)
+
+    admissible = []
+    for uid in admitted:
+        on_ip = uids_by_ip.setdefault(axons[uid].ip, set())
+        if on_ip - {uid}:
+            continue
+        on_ip.add(uid)
+        admissible.append(uid)
+    if admissible:
+        bt.logging.info(f"Adding new miners to the running round: {admissible}")
+        self.scheduler.admit(admissible)
+
+
+async def run_pipeline(self) -> Tuple[List[int], List[float]]:
+    """
+    Runs challenge generation, miner querying and reward fetching as separate stages joined by bounded queues.
+
+    Batches of up to ``neuron.sample_size`` miners are taken from the scheduler in priority order and flow through
+    the stages independently, so challenges for the next batch are generated while the current batch is still being
+    queried, and scores are fetched as soon as a batch returns. At most ``neuron.pipeline_depth`` batches are in
+    flight in each stage, and batches are released through the shared query pacer so the load on miners and on the
+    validator server stays even.
+
+    Several pipelines can work on the same round: they all take from the scheduler's open round, so every miner is
+    claimed by exactly one of them and a pipeline that runs ahead simply takes more of the round. The scheduler is
+    synced with the metagraph before every batch, miners that registered or changed hands since are added to the
+    round and queried before it ends.
+
+    Args:
+        self (:obj:`bittensor.neuron.Neuron`): The validator neuron.
+
+    Every batch is committed to the moving average scores as soon as its rewards are in, so a failure later in the
+    round does not throw away the batches that already completed.
+
+    Returns:
+        Tuple[List[int], List[float]]: The uids that were scored and their rewards, in matching order.
+    """
+
+    # Forget miners whose uid changed hands since the last round
+    self.latency.prune(self.metagraph.hotkeys)
+
+    batch_size = self.config.neuron.sample_size
+    depth = max(1, self.config.neuron.pipeline_depth)
+
+    challenged = asyncio.Queue(maxsize=depth)
+    answered = asyncio.Queue(maxsize=depth)
+    scored_uids: List[int] = []
+    scored_rewards: List[float] = []
+
+    # Connections opened to the axons of upcoming batches, while the batches ahead of them are queried
+    warmups = []
+
+    def warm(axons):
+        if hasattr(self.dendrite, "warm"):
+            warmups.append(asyncio.ensure_future(self.dendrite.warm(axons)))
+
+    # Batches of this pipeline between leaving the challenge stage and being scored, and a signal when one finishes
+    in_flight = 0
+    batch_done = asyncio.Event()
+
+    def finish_batch():
+        nonlocal in_flight
+        in_flight -= 1
+        batch_done.set()
+
+    async def challenge_stage():
+        nonlocal in_flight
+        i = 0
+        while True:
+            # Pick up miners that registered since the last batch before taking the next one. The metagraph is
+            # swapped for a new one on every resync, the batch sticks to the one it was taken from
+            batch_done.clear()
+            metagraph = self.metagraph
+            admit_new_miners(self, metagraph, self.scheduler.sync(metagraph.hotkeys, int(metagraph.block)))
+            batch_uids = self.scheduler.take_round(batch_size)
+            if not batch_uids:
+                if in_flight == 0:
+                    break
+                # The round is not over while batches are out, check for new miners again once one finished
+                await batch_done.wait()
+                continue
+            bt.logging.info(f"Batch {i+1} ==> Miner uids: {batch_uids}")
+
+            try:
+                # Open connections to the batch while it waits for its challenges and its turn
+                axons = [metagraph.axons[uid] for uid in batch_uids]
+                warm(axons)
+
+                # Take one challenge per miner in the batch from the prefetched pool
+                challenges = await self.challenge_pool.take(list(batch_uids))
+                bt.logging.info(f"Batch {i+1} ==> Generated challenges:\n" + "\n".join([str(challenge) for challenge in challenges]))
+
+                # Stop feeding the pipeline if the validator server cannot produce challenges
+                if challenges is None or len(challenges) == 0:
+                    bt.logging.error(f"Batch {i+1} ==> Failed to generate challenges")
+                    self.scheduler.release(batch_uids)
+                    break
+
+                # Hold the batch back until the query rate allows it
+                await self.query_pacer.wait(len(batch_uids))
+
+                await challenged.put((i, batch_uids, axons, challenges))
+            except BaseException:
+                # The batch never reached the query stage, hand its miners back to the round
+                self.scheduler.release(batch_uids)
+                raise
+            in_flight += 1
+            i += 1
+        await challenged.put(_DONE)
+
+    async def query_batch(i, batch_uids, axons, challenges, slots):
+        try:
+            # Streamed challenges let miners that stop sending heartbeats be dropped before their timeout
+            if self.config.neuron.stream_challenges:
+                queries = [
+                    StreamingChallenge(
+                        challenge=challenge.challenge,
+                        challenge_url=challenge.challenge_url,
+                        heartbeat_timeout=self.config.neuron.heartbeat_timeout,
+                    )
+                    for challenge in challenges
+                ]
+            else:
+                queries = challenges
+
+            # Send every miner its own challenge in one fan-out dispatch
+            pairs = list(zip(axons, queries))
+            hotkeys = [axon.hotkey for axon in axons]
+            timeouts = [self.latency.timeout(uid, hotkey) for uid, hotkey in zip(batch_uids, hotkeys)]
+            responses = await fan_out_all(self.dendrite, pairs, timeout=timeouts, limiter=self.concurrency)
+
+            # Feed the response times back so the next sweep uses timeouts that fit each miner
+            for uid, hotkey, response in zip(batch_uids, hotkeys, responses):
+                self.latency.record(uid, hotkey, response)
+            responses = [response.deserialize() for response in responses]
+            bt.logging.info(f"Batch {i+1} ==> Received responses: {responses}")
+
+            await answered.put((i, batch_uids, hotkeys, challenges, responses))
+        except BaseException:
+            self.scheduler.release(batch_uids)
+            finish_batch()
+            raise
+        finally:
+            slots.release()
+
+    async def drain(queue, start_batch):
+        # Runs a stage that starts a task per batch from ``queue``, the batch tasks are cancelled with the stage
+        slots = asyncio.Semaphore(depth)
+        tasks = []
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                await slots.acquire()
+                tasks.append(asyncio.ensure_future(start_batch(*item, slots)))
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def query_stage():
+        await drain(challenged, query_batch)
+        await answered.put(_DONE)
+
+    async def score_batch(i, batch_uids, hotkeys, challenges, responses, slots):
+        try:
+            rewards = await get_rewards([challenge.challenge for challenge in challenges], responses, client=self.validator_server, score_stream=self.score_stream)
+            bt.logging.info(f"Batch {i+1} ==> Scores: {rewards}")
+
+            # Commit the batch right away. Miners whose score could not be fetched keep their current score, unless
+            # it has been missing for too many rounds in a row, then they decay as if they scored 0
+            batch_scored, failed_uids, decayed_uids = [], [], []
+            for uid, hotkey, reward in zip(batch_uids, hotkeys, rewards):
+                misses = self.scheduler.record_score(uid, hotkey, reward is not None)
+                if reward is not None:
+                    batch_scored.append((uid, reward))
+                elif misses >= self.config.neuron.max_score_misses:
+                    batch_scored.append((uid, 0.0))
+                    decayed_uids.append(uid)
+                else:
+                    failed_uids.append(uid)
+            if failed_uids:
+                bt.logging.error(f"Batch {i+1} ==> Failed to get rewards for uids {failed_uids}, leaving their scores unchanged")
+            if decayed_uids:
+                bt.logging.error(f"Batch {i+1} ==> No rewards for uids {decayed_uids} in {self.config.neuron.max_score_misses} rounds, decaying their scores")
+            if batch_scored:
+                uids, batch_rewards = zip(*batch_scored)
+                self.update_scores(np.array(batch_rewards, dtype=float), list(uids))
+                scored_uids.extend(uids)
+                scored_rewards.extend(batch_rewards)
+        finally:
+            # Requeue the miners behind everyone who has waited longer
+            for uid, hotkey, response in zip(batch_uids, hotkeys, responses):
+                self.scheduler.complete(uid, hotkey, ok=response is not None)
+            finish_batch()
+            slots.release()
+
+    async def score_stage():
+        await drain(answered, score_batch)
+
+    # A failing stage takes the others down with it, a stage left behind would block on a queue nobody reads
+    stages = [asyncio.ensure_future(stage) for stage in (challenge_stage(), query_stage(), score_stage())]
+    try:
+        await asyncio.gather(*stages)
+        await asyncio.gather(*warmups, return_exceptions=True)
+    except BaseException:
+        for task in stages + warmups:
+            task.cancel()
+        await asyncio.gather(*stages, *warmups, return_exceptions=True)
+
+        # Batches still waiting in a queue between two stages hand their miners back to the round
+        for queue in (challenged, answered):
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not _DONE:
+                    self.scheduler.release(item[1])
+        raise
+
+    return scored_uids, scored_rewards
@@ -17,11 +17,17 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 import numpy as np
-from typing import List
+from typing import List, Optional
 import bittensor as bt
-import aiohttp
 import asyncio
 
+from sybil.validator.client import ValidatorServerClient
+from sybil.validator.score_stream import ScoreStream
+
+# How long to wait for a score to be pushed before asking the server for it directly. Miners only answer the
+# dendrite after posting their solution, so by the time we wait the score is normally saved already.
+SCORE_PUSH_TIMEOUT = 15
+
 def reward(query: int, response: int) -> float:
     """
     Reward the miner response to the dummy request. This method returns a reward
@@ -36,35 +42,45 @@ def reward(query: int, response: int) -> float:
     return 1.0 if response == query * 2 else 0
 
 
-async def get_rewards(challenges: List[str], responses: List[str], validator_server_url: str) -> List[float]:
-    try:
-        """
-        Get the scores for the responses.
-        """
-        async def fetch_score(challenge, response) -> float:
-            bt.logging.info(f"Getting score at: {validator_server_url}/challenge/{challenge}/{response}")
-            if response is None:
-                return 0
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{validator_server_url}/challenge/{challenge}/{response}"
-                ) as resp:
-                    result = await resp.json()
-                    if result["score"]:
-                        bt.logging.info(f"Score: {result['score']}")
-                    else:
-                        bt.logging.info(f"No score found in response: {result}")
-                    return result["score"] if "score" in result else 0
-                
-        # Concurrently fetch all scores
-        scores = await asyncio.gather(
-            *[fetch_score(challenge, response) for challenge, response in zip(challenges, responses)]
-        )
-        
-        # Convert None to 0
-        scores = [0 if score is None else score for score in scores]
-        
-        return scores
-    except Exception as e:
-        print(f"Error getting rewards: {e}")
-        return None
+async def get_rewards(challenges: List[str], responses: List[str], client: ValidatorServerClient, score_stream: Optional[ScoreStream] = None) -> List[Optional[float]]:
+    """
+    Get the scores for the responses.
+
+    Each score is fetched on its own, so one failing lookup does not take the rest of the batch down with it.
+
+    Returns:
+        List[Optional[float]]: The score of each response, 0 for miners that did not respond, or None where the
+        score could not be fetched.
+    """
+    async def fetch_score(challenge, response) -> Optional[float]:
+        bt.logging.info(f"Getting score at: {client.base_url}/challenge/{challenge}/{response}")
+        if response is None:
+            return 0
+
+        try:
+            # Prefer the pushed score, fall back to asking the server when it does not arrive
+            result = None
+            if score_stream is not None:
+                result = await score_stream.wait(challenge, timeout=SCORE_PUSH_TIMEOUT)
+            if result is None:
+                result = await client.get_json(f"/challenge/{challenge}/{response}", "score")
+        except Exception as e:
+            bt.logging.error(f"Error getting score for challenge {challenge}: {e}")
+            return None
+
+        if not isinstance(result, dict):
+            bt.logging.error(f"Unexpected score response for challenge {challenge}: {result}")
+            return None
+        if result.get("score"):
+            bt.logging.info(f"Score: {result['score']}")
+        else:
+            bt.logging.info(f"No score found in response: {result}")
+
+        # Convert a missing or null score to 0
+        score = result.get("score")
+        return 0 if score is None else score
+
+    # Concurrently fetch all scores
+    return await asyncio.gather(
+        *[fetch_score(challenge, response) for challenge, response in zip(challenges, responses)]
+    )
@@ -0,0 +1,244 @@
+import time
+import heapq
+import itertools
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Seconds per block, used to estimate the current block between metagraph syncs
+BLOCK_TIME = 12
+
+# Miners that have never been queried, and miners whose last query was their first failure in a row, are served first
+TIER_URGENT = 0
+TIER_ROUTINE = 1
+
+
+class MinerEntry:
+    """Scheduling state of a single uid."""
+
+    def __init__(self, hotkey: str):
+        self.hotkey = hotkey
+        self.last_queried: Optional[int] = None
+        self.failures = 0
+        self.score_misses = 0
+        self.version = 0
+
+        # The queue item of the current version, None until the uid is first queued
+        self.item: Optional[Tuple[int, int, int, int, int]] = None
+
+
+class MinerScheduler:
+    """
+    Priority queue of miners to query next, ordered by how many blocks ago they were last queried.
+
+    Miners that were never queried, including uids whose hotkey was just replaced, come first, followed by miners
+    whose last query just failed so a transient failure is retried quickly. Everyone else is served oldest first.
+    A miner that keeps failing drops back to the routine order, so dead miners do not crowd out the rest.
+
+    Taken miners are claimed until they are completed or released, so a miner is never handed out twice at once.
+    Heap entries are invalidated lazily through a per-uid version instead of being removed. The open round keeps a
+    heap of its own, so claiming from it never walks past the miners outside the round.
+
+    A round is the set of miners to query once each. It is opened with :meth:`begin_round`, miners that register or
+    change hands while it runs are added to it with :meth:`admit`, and :meth:`take_round` claims from what is left.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int, int, int]] = []
+        self._seq = itertools.count()
+        self._entries: Dict[int, MinerEntry] = {}
+        self._claimed: Set[int] = set()
+
+        # Uids of the open round still to be taken, their queue, and every uid that was part of it
+        self._round: Set[int] = set()
+        self._round_heap: List[Tuple[int, int, int, int, int]] = []
+        self._round_members: Set[int] = set()
+
+        self._anchor_block = 0
+        self._anchor_time = time.time()
+
+    def current_block(self) -> int:
+        """Estimates the current block from the last synced metagraph block."""
+        return self._anchor_block + int((time.time() - self._anchor_time) / BLOCK_TIME)
+
+    def sync(self, hotkeys: List[str], block: int) -> List[int]:
+        """
+        Brings the queue in line with the metagraph.
+
+        New uids and uids whose hotkey changed are queued as never queried, uids that left the metagraph are dropped.
+
+        Args:
+            hotkeys (List[str]): The hotkeys in the metagraph, indexed by uid.
+            block (int): The block the metagraph was synced at.
+
+        Returns:
+            List[int]: The uids that are new or whose hotkey changed.
+        """
+        if block != self._anchor_block:
+            self._anchor_block, self._anchor_time = block, time.time()
+
+        admitted = []
+        for uid, hotkey in enumerate(hotkeys):
+            entry = self._entries.get(uid)
+            if entry is not None and entry.hotkey == hotkey:
+                continue
+            self._entries[uid] = MinerEntry(hotkey)
+            admitted.append(uid)
+            if uid not in self._claimed:
+                self._push(uid)
+
+        for uid in [uid for uid in self._entries if uid >= len(hotkeys)]:
+            del self._entries[uid]
+            self._claimed.discard(uid)
+            self._round.discard(uid)
+        return admitted
+
+    def begin_round(self, uids: Iterable[int]):
+        """Opens a round that queries each of the given uids once."""
+        self._round = {uid for uid in uids if uid in self._entries}
+        self._round_members = set(self._round)
+
+        # Claimed uids join the round queue once they are completed or released
+        self._round_heap = [
+            self._entries[uid].item
+            for uid in self._round
+            if uid not in self._claimed and self._entries[uid].item is not None
+        ]
+        heapq.heapify(self._round_heap)
+
+    def admit(self, uids: Iterable[int]):
+        """Adds uids to the open round, including uids that were already queried in it under another hotkey."""
+        for uid in uids:
+            entry = self._entries.get(uid)
+            if entry is None or uid in self._round:
+                continue
+            self._round.add(uid)
+            self._round_members.add(uid)
+            if uid not in self._claimed and entry.item is not None:
+                heapq.heappush(self._round_heap, entry.item)
+
+    @property
+    def round_remaining(self) -> int:
+        """Number of uids of the open round that were not taken yet."""
+        return len(self._round)
+
+    @property
+    def round_members(self) -> Set[int]:
+        """Every uid that was part of the open round, taken or not."""
+        return set(self._round_members)
+
+    def take_round(self, n: int) -> List[int]:
+        """Claims up to ``n`` miners of the open round in priority order, they are not handed out again this round."""
+        taken = self._pop(self._round_heap, n, self._round)
+        self._round.difference_update(taken)
+        return taken
+
+    def _push(self, uid: int):
+        entry = self._entries[uid]
+        entry.version += 1
+        urgent = entry.last_queried is None or entry.failures == 1
+        tier = TIER_URGENT if urgent else TIER_ROUTINE
+        last_queried = -1 if entry.last_queried is None else entry.last_queried
+        entry.item = (tier, last_queried, next(self._seq), uid, entry.version)
+        heapq.heappush(self._heap, entry.item)
+        if uid in self._round:
+            heapq.heappush(self._round_heap, entry.item)
+
+    def _pop(self, heap: List[Tuple[int, int, int, int, int]], n: int, members: Optional[Set[int]] = None) -> List[int]:
+        """Claims up to ``n`` uids off ``heap``, dropping stale and claimed items and uids outside ``members``."""
+        taken = []
+        while heap and len(taken) < n:
+            item = heapq.heappop(heap)
+            uid, version = item[3], item[4]
+            entry = self._entries.get(uid)
+            if entry is None or entry.version != version or uid in self._claimed:
+                continue
+            if members is not None and uid not in members:
+                continue
+            self._claimed.add(uid)
+            taken.append(uid)
+        return taken
+
+    def take(self, n: int, eligible: Optional[Set[int]] = None) -> List[int]:
+        """
+        Claims up to ``n`` miners in priority order.
+
+        Args:
+            n (int): The maximum number of miners to claim.
+            eligible (Set[int], optional): Only claim uids in this set, the others keep their place in the queue.
+
+        Returns:
+            List[int]: The claimed uids, highest priority first.
+        """
+        if eligible is None:
+            return self._pop(self._heap, n)
+
+        # Picked from the eligible uids directly, their items stay in the queue and go stale once the uid is requeued
+        items = []
+        for uid in eligible:
+            entry = self._entries.get(uid)
+            if entry is not None and entry.item is not None and uid not in self._claimed:
+                items.append(entry.item)
+        taken = [item[3] for item in heapq.nsmallest(n, items)]
+        self._claimed.update(taken)
+        return taken
+
+    def complete(self, uid: int, hotkey: str, ok: bool):
+        """
+        Requeues a claimed miner after its query finished.
+
+        Args:
+            uid (int): The miner uid.
+            hotkey (str): The hotkey the query was sent to.
+            ok (bool): Whether the miner answered.
+        """
+        self._claimed.discard(uid)
+        entry = self._entries.get(uid)
+        if entry is None:
+            return
+
+        # The uid changed hands while it was being queried, the new hotkey keeps its fresh entry
+        if entry.hotkey == hotkey:
+            entry.last_queried = self.current_block()
+            entry.failures = 0 if ok else entry.failures + 1
+        self._push(uid)
+
+    def record_score(self, uid: int, hotkey: str, scored: bool) -> int:
+        """
+        Tracks the score lookups of a miner.
+
+        Args:
+            uid (int): The miner uid.
+            hotkey (str): The hotkey the query was sent to.
+            scored (bool): Whether a score came back for the query.
+
+        Returns:
+            int: The number of lookups in a row that came back without a score, 0 if the uid changed hands.
+        """
+        entry = self._entries.get(uid)
+        if entry is None or entry.hotkey != hotkey:
+            return 0
+        entry.score_misses = 0 if scored else entry.score_misses + 1
+        return entry.score_misses
+
+    def release(self, uids: Iterable[int]):
+        """Requeues claimed miners that were not queried after all, keeping their place and their slot in the round."""
+        for uid in uids:
+            self._claimed.discard(uid)
+            if uid not in self._entries:
+                continue
+            if uid in self._round_members:
+                self._round.add(uid)
+            self._push(uid)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue size and staleness statistics."""
+        block = self.current_block()
+        queried = [entry.last_queried for entry in self._entries.values() if entry.last_queried is not None]
+        return {
+            "miners": len(self._entries),
+            "claimed": len(self._claimed),
+            "never_queried": len(self._entries) - len(queried),
+            "failing": sum(1 for entry in self._entries.values() if entry.failures > 0),
+            "max_blocks_since_queried": block - min(queried) if queried else None,
+        }
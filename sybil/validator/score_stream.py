@@ -0,0 +1,160 @@
+import json
+import random
+import asyncio
+import aiohttp
+import bittensor as bt
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from sybil.validator.client import ValidatorServerClient
+
+
+# Scores that arrive before anyone waits on them are kept for a while, miners usually finish solving
+# before their dendrite response reaches the validator.
+MAX_UNCLAIMED_SCORES = 4096
+
+# The server sends a heartbeat every 15 seconds, a silent connection for longer than this is considered dead
+STREAM_READ_TIMEOUT = 45
+
+
+class ScoreStream:
+    """
+    Subscription to the validator server score stream.
+
+    The validator server pushes every score over server-sent events the moment it is saved. This class keeps one
+    long-lived connection open, reconnecting when it drops, and resolves a future per challenge as scores come in.
+    When the server does not offer the stream it records that on the client and :meth:`wait` returns None right away,
+    so callers can fall back to asking for the score directly.
+    """
+
+    def __init__(self, client: ValidatorServerClient):
+        self.client = client
+        self.connected = asyncio.Event()
+        self.received = 0
+
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._unclaimed: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> bool:
+        return self.client.capabilities.get("score_stream") is not False
+
+    def start(self):
+        """Starts the subscription in the background on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Closes the subscription."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def wait(self, challenge: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the score of a challenge to be pushed.
+
+        Args:
+            challenge (str): The challenge to wait for.
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            Optional[Dict[str, Any]]: The pushed score, or None if the stream is unavailable or the score did not arrive in time.
+        """
+        if challenge in self._unclaimed:
+            return self._unclaimed.pop(challenge)
+        if not self.available or not self.connected.is_set():
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(challenge, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(challenge, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(challenge, None)
+
+    def _resolve(self, score: Dict[str, Any]):
+        challenge = score.get("challenge")
+        if challenge is None:
+            return
+        self.received += 1
+
+        waiters = self._waiters.pop(challenge, [])
+        for future in waiters:
+            if not future.done():
+                future.set_result(score)
+        if waiters:
+            return
+
+        # Nobody is waiting yet, keep it around for a later wait()
+        self._unclaimed[challenge] = score
+        while len(self._unclaimed) > MAX_UNCLAIMED_SCORES:
+            self._unclaimed.popitem(last=False)
+
+    async def _run(self):
+        attempt = 0
+        while True:
+            try:
+                await self._listen()
+                attempt = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                bt.logging.warning(f"Score stream disconnected: {e}")
+            finally:
+                self.connected.clear()
+
+            if not self.available:
+                return
+
+            # Reconnect with jittered backoff
+            attempt += 1
+            await asyncio.sleep(min(30, 2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def _listen(self):
+        # The stream stays open for as long as the validator runs, it uses the pool meant for held connections
+        session = await self.client.session(long_poll=True)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=STREAM_READ_TIMEOUT)
+        async with session.get(f"{self.client.base_url}/challenge/scores/stream", timeout=timeout) as resp:
+
+            # Older validator servers do not have the stream
+            if resp.status == 404:
+                bt.logging.warning("Validator server does not offer a score stream, falling back to fetching scores")
+                self.client.capabilities["score_stream"] = False
+                return
+            if resp.status != 200:
+                raise ConnectionError(f"score stream returned {resp.status}")
+
+            self.client.capabilities["score_stream"] = True
+            self.connected.set()
+            bt.logging.info("Subscribed to validator server score stream")
+
+            # Parse server-sent events, an event ends with a blank line
+            event, data = None, []
+            async for raw_line in resp.content:
+                line = raw_line.decode("utf-8").rstrip("\r\n")
+                if line.startswith(":"):
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].strip())
+                elif line == "":
+                    if event == "score" and data:
+                        try:
+                            self._resolve(json.loads("\n".join(data)))
+                        except ValueError as e:
+                            bt.logging.warning(f"Bad score event: {e}")
+                    event, data = None, []
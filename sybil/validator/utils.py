@@ -1,18 +1,12 @@
 import asyncio
-import aiohttp
 from sybil.protocol import Challenge
-from typing import List
+from sybil.validator.client import ValidatorServerClient
+from typing import Dict, List, Optional
 import bittensor as bt
 
 
-# Fetch a challenge from a given URL
-async def fetch(url):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            return await response.json()
-
 # Wait until the / endpoint returns a 200 OK response
-async def wait_for_validator_container(validator_server_url: str):
+async def wait_for_validator_container(client: ValidatorServerClient):
     max_retries = 10
     retries = 0
     while True:
@@ -21,30 +15,89 @@ async def wait_for_validator_container(validator_server_url: str):
             bt.logging.error("Validator server not ready after maximum retries. Allowing unhealthy continuation of neuron logic.")
             return
 
-        try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(validator_server_url) as response:
-                    if response.status == 200:
-                        bt.logging.info("Validator server is up and running.")
-                        return
-        except Exception as e:
-            bt.logging.error(f"Validator server not ready yet: {e}")
+        if await client.is_healthy():
+            bt.logging.info("Validator server is up and running.")
+            return
+
         retries += 1
         await asyncio.sleep(10)  # Wait before retrying
 
 
+# Generate all challenges in a single request, returns None if the server does not support batches
+async def generate_challenges_batch(miner_uids: List[int], client: ValidatorServerClient) -> Optional[List[Challenge]]:
+    if client.capabilities.get("batch_challenges") is False:
+        return None
+
+    bt.logging.info(f"Generating challenges for {len(miner_uids)} miner uids in one batch")
+    status, response = await client.request(
+        "POST", "/challenge/new", "challenge", json={"miner_uids": [str(uid) for uid in miner_uids]}
+    )
+
+    # Older validator servers only know GET /challenge/new
+    if status == 404:
+        bt.logging.warning("Validator server does not support batch challenge generation, falling back to one request per miner")
+        client.capabilities["batch_challenges"] = False
+        return None
+    client.capabilities["batch_challenges"] = True
+
+    if not response or "challenges" not in response:
+        raise ValueError(f"Unexpected batch challenge response: {response}")
+
+    return [
+        Challenge(
+            challenge=entry["challenge"],
+            challenge_url=entry["challenge_url"]
+        ) for entry in response["challenges"]
+    ]
+
+
+# Bind pooled challenges to miner uids on the server, which also restarts their clock so the time to solve is measured
+# from dispatch. Returns the bound challenges by challenge id, or None if the server does not support binding
+async def dispatch_challenges(challenges: List[Challenge], miner_uids: List[int], client: ValidatorServerClient) -> Optional[Dict[str, Challenge]]:
+    if client.capabilities.get("dispatch_challenges") is False:
+        return None
+
+    status, response = await client.request(
+        "POST", "/challenge/dispatch", "challenge", json={
+            "challenges": [
+                {"challenge": challenge.challenge, "miner_uid": str(uid)} for challenge, uid in zip(challenges, miner_uids)
+            ]
+        }
+    )
+
+    # Older validator servers cannot bind challenges after generating them
+    if status == 404:
+        bt.logging.warning("Validator server does not support challenge dispatch, challenges will be generated on demand")
+        client.capabilities["dispatch_challenges"] = False
+        return None
+    client.capabilities["dispatch_challenges"] = True
+
+    if not response or "challenges" not in response:
+        raise ValueError(f"Unexpected challenge dispatch response: {response}")
+
+    return {
+        entry["challenge"]: Challenge(
+            challenge=entry["challenge"],
+            challenge_url=entry["challenge_url"]
+        ) for entry in response["challenges"]
+    }
+
+
 # Generate one challenge per miner_uid, appending ?miner_uid=<uid> to each request
-async def generate_challenges(miner_uids: List[int], validator_server_url: str) -> List[Challenge]:
+async def generate_challenges(miner_uids: List[int], client: ValidatorServerClient, check_health: bool = True) -> List[Challenge]:
     try:
+        # Before fetching challenges, ensure the validator server is ready
+        if check_health:
+            await wait_for_validator_container(client)
+
+        challenges = await generate_challenges_batch(miner_uids, client)
+        if challenges is not None:
+            return challenges
+
         tasks = []
         for uid in miner_uids:
             bt.logging.info(f"Generating challenge for miner uid: {uid}")
-            url = f"{validator_server_url}/challenge/new?miner_uid={uid}"
-            tasks.append(fetch(url))
-        
-        # Before fetching challenges, ensure the validator server is ready
-        await wait_for_validator_container(validator_server_url)
+            tasks.append(client.get_json("/challenge/new", "challenge", params={"miner_uid": str(uid)}))
 
         # Gather all the tasks to fetch challenges concurrently
         responses = await asyncio.gather(*tasks)
@@ -60,4 +113,3 @@ async def generate_challenges(miner_uids: List[int], validator_server_url: str)
     except Exception as e:
         print(f"Error generating challenges: {e}. Returning empty list.")
         return []
-
@@ -0,0 +1,208 @@
+import time
+import threading
+import bittensor as bt
+
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Seconds per block, retries are scheduled in whole blocks
+BLOCK_TIME = 12
+
+# How many blocks an extrinsic may wait for inclusion before the submission is considered failed
+INCLUSION_PERIOD = 8
+
+
+class WeightSubmission:
+    """A uint16 weight vector waiting to be set on chain."""
+
+    def __init__(self, uids: List[int], weights: List[int]):
+        self.uids = uids
+        self.weights = weights
+        self.created_at = time.time()
+        self.attempts = 0
+
+
+class WeightSubmitter:
+    """
+    Sets weights on chain from a dedicated background thread with its own subtensor connection.
+
+    :meth:`submit` only hands the weight vector over and returns right away, so neither the forward loop nor the chain
+    executor ever waits on an extrinsic. The worker sends one extrinsic at a time and waits for it to be included in a
+    block. A failed or rejected extrinsic, e.g. because of the weights rate limit, is retried after a backoff that
+    doubles in whole blocks, up to ``max_backoff_blocks``. A newer vector submitted in the meantime replaces the
+    pending one, stale weights are never sent after fresher ones.
+    """
+
+    def __init__(
+        self,
+        subtensor_factory: Callable[[], "bt.subtensor"],
+        wallet: "bt.wallet",
+        netuid: int,
+        version_key: int,
+        max_backoff_blocks: int = 64,
+        on_included: Optional[Callable[[WeightSubmission, int], None]] = None,
+    ):
+        self.subtensor_factory = subtensor_factory
+        self.wallet = wallet
+        self.netuid = netuid
+        self.version_key = version_key
+        self.max_backoff_blocks = max_backoff_blocks
+        self.on_included = on_included
+
+        self.submitted = 0
+        self.included = 0
+        self.failed = 0
+        self.replaced = 0
+        self.last_included_block: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+        self._subtensor: Optional["bt.subtensor"] = None
+        self._pending: Optional[WeightSubmission] = None
+        self._in_flight: Optional[WeightSubmission] = None
+        self._failures = 0
+        self._retry_block: Optional[int] = None
+        self._retry_after = 0.0
+        self._condition = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts the worker thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(target=self._run, name="weight-submitter", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stops the worker thread, an extrinsic already sent is not waited for beyond ``timeout``."""
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, uids: List[int], weights: List[int]):
+        """
+        Queues a weight vector for submission, replacing one that has not been sent yet.
+
+        Args:
+            uids (List[int]): The uids to set weights for.
+            weights (List[int]): The uint16 weights of the uids.
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.replaced += 1
+            self._pending = WeightSubmission(list(uids), list(weights))
+            self._condition.notify_all()
+
+    @property
+    def busy(self) -> bool:
+        """Whether a weight vector is waiting to be sent or waiting for inclusion."""
+        with self._condition:
+            return self._pending is not None or self._in_flight is not None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stop:
+                    self._condition.wait()
+                if self._stop:
+                    return
+                submission, self._pending = self._pending, None
+                self._in_flight = submission
+
+            included = False
+            try:
+                self._wait_for_retry_block()
+                if self._stop:
+                    return
+                included = self._send(submission)
+            except Exception as err:
+                self._record_failure(f"{type(err).__name__}: {err}")
+                # The connection may be broken, open a new one on the next attempt
+                self._subtensor = None
+
+            with self._condition:
+                self._in_flight = None
+                # Retry a failed vector unless a newer one arrived while it was being sent
+                if not included and self._pending is None:
+                    self._pending = submission
+
+    def _send(self, submission: WeightSubmission) -> bool:
+        subtensor = self._connect()
+        submission.attempts += 1
+        self.submitted += 1
+
+        success, message = subtensor.set_weights(
+            wallet=self.wallet,
+            netuid=self.netuid,
+            uids=submission.uids,
+            weights=submission.weights,
+            version_key=self.version_key,
+            wait_for_inclusion=True,
+            wait_for_finalization=False,
+            max_retries=1,
+            period=INCLUSION_PERIOD,
+        )
+        if not success:
+            self._record_failure(str(message))
+            return False
+
+        block = subtensor.get_current_block()
+        self.included += 1
+        self.last_included_block = block
+        self.last_error = None
+        self._failures, self._retry_block, self._retry_after = 0, None, 0.0
+        bt.logging.info(
+            f"set_weights included on chain at block {block} after {submission.attempts} attempt(s), "
+            f"{time.time() - submission.created_at:.1f}s after submission"
+        )
+        if self.on_included is not None:
+            self.on_included(submission, block)
+        return True
+
+    def _record_failure(self, message: str):
+        self.failed += 1
+        self.last_error = message
+        self._failures += 1
+
+        # Back off in whole blocks, doubling on every consecutive failure. The wall clock deadline also holds
+        # back retries when the chain cannot even be asked for the current block.
+        backoff = min(2 ** (self._failures - 1), self.max_backoff_blocks)
+        self._retry_after = time.time() + backoff * BLOCK_TIME
+        try:
+            self._retry_block = self._connect().get_current_block() + backoff
+        except Exception:
+            self._subtensor = None
+            self._retry_block = None
+        bt.logging.warning(f"set_weights failed ({message}), retrying in {backoff} block(s)")
+
+    def _wait_for_retry_block(self):
+        # Sleep out the backoff, then a block at a time until the chain reached the retry block, stopping early if asked to
+        with self._condition:
+            self._condition.wait_for(lambda: self._stop, timeout=max(0.0, self._retry_after - time.time()))
+        while self._retry_block is not None and not self._stop:
+            if self._connect().get_current_block() >= self._retry_block:
+                return
+            with self._condition:
+                self._condition.wait_for(lambda: self._stop, timeout=BLOCK_TIME)
+
+    def _connect(self) -> "bt.subtensor":
+        if self._subtensor is None:
+            self._subtensor = self.subtensor_factory()
+        return self._subtensor
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns submission and inclusion counters."""
+        return {
+            "submitted": self.submitted,
+            "included": self.included,
+            "failed": self.failed,
+            "replaced": self.replaced,
+            "busy": self.busy,
+            "consecutive_failures": self._failures,
+            "retry_block": self._retry_block,
+            "last_included_block": self.last_included_block,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,77 @@
+import gzip
+import json
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+CONTENT_TYPE_JSON = "application/json"
+
+# Lists of records are sent as columns, the content type tells the node-stack to expand them back into records
+CONTENT_TYPE_COLUMNAR = "application/vnd.sybil.columnar+json"
+
+# Columnar bodies smaller than this are not worth compressing, higher gzip levels barely shrink the repetitive
+# broadcasts further but cost several times the CPU, see scripts/benchmark_wire.py
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 1
+
+
+def columnar(
+    rows: int,
+    columns: Dict[str, List[Any]],
+    tables: Optional[Dict[str, List[Any]]] = None,
+    constants: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Builds a columnar record list: one list per field instead of one dict per record.
+
+    Args:
+        rows (int): The number of records.
+        columns (Dict[str, List[Any]]): The values of every field, one entry per record.
+        tables (Dict[str, List[Any]], optional): Distinct values of fields that repeat a lot, the column of such a
+            field holds indexes into its table.
+        constants (Dict[str, Any], optional): Fields that have the same value in every record.
+
+    Returns:
+        Dict[str, Any]: The columnar record list.
+    """
+    return {"rows": rows, "columns": columns, "tables": tables or {}, "constants": constants or {}}
+
+
+def expand(value: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expands a columnar record list back into one dict per record."""
+    columns, tables, constants = value["columns"], value.get("tables", {}), value.get("constants", {})
+    fields = [
+        [tables[name][index] for index in values] if name in tables else values
+        for name, values in columns.items()
+    ]
+    return [
+        {**dict(zip(columns.keys(), row)), **constants}
+        for row in zip(*fields)
+    ] if fields else [dict(constants) for _ in range(value["rows"])]
+
+
+def encode(payload: Dict[str, Any], content_type: str = CONTENT_TYPE_JSON) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serializes a payload for a POST request.
+
+    Args:
+        payload (Dict[str, Any]): The payload, with columnar record lists when ``content_type`` is columnar.
+        content_type (str): Either ``CONTENT_TYPE_JSON`` or ``CONTENT_TYPE_COLUMNAR``.
+
+    Returns:
+        Tuple[bytes, Dict[str, str]]: The request body and the headers to send with it.
+    """
+    if content_type != CONTENT_TYPE_COLUMNAR:
+        return json.dumps(payload).encode(), {"Content-Type": CONTENT_TYPE_JSON}
+
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    headers = {"Content-Type": CONTENT_TYPE_COLUMNAR}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def accepts_columnar(result: Any) -> bool:
+    """Whether a node-stack response lists the columnar content type among the ones it accepts."""
+    return isinstance(result, dict) and CONTENT_TYPE_COLUMNAR in (result.get("accept") or [])
@@ -0,0 +1,135 @@
+import asyncio
+import numpy as np
+
+from sybil.broadcast import NeuronBroadcaster
+from sybil.metagraph_snapshot import MetagraphSnapshot
+from sybil.wire import CONTENT_TYPE_COLUMNAR, CONTENT_TYPE_JSON, expand
+
+from tests.test_metagraph_snapshot import metagraph
+
+
+class FakeNodeStack:
+    """Holds the neurons it was sent under their version, like the node-stack broadcast endpoint."""
+
+    def __init__(self, versioned=True, columnar=False):
+        self.versioned = versioned
+        self.columnar = columnar
+        self.neurons = None
+        self.hash = None
+        self.posts = []
+
+    def restart(self):
+        self.neurons = self.hash = None
+
+    async def post(self, payload, content_type):
+        self.posts.append((payload, content_type))
+        decode = expand if content_type == CONTENT_TYPE_COLUMNAR else list
+        result = {"accept": [CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR] if self.columnar else [CONTENT_TYPE_JSON]}
+        if "neurons" in payload:
+            self.neurons = decode(payload["neurons"])
+            self.hash = payload["version"]["hash"]
+            result["success"] = True
+        elif "delta" in payload:
+            delta = payload["delta"]
+            if delta["base_hash"] != self.hash:
+                return {**result, "version_mismatch": True, "version": self.version()}
+            neurons = (self.neurons + [None] * delta["n"])[:delta["n"]]
+            for record in decode(delta["changed"]):
+                neurons[record["uid"]] = record
+            self.neurons, self.hash = neurons, payload["version"]["hash"]
+            result["success"] = True
+        if self.versioned:
+            result["version"] = self.version()
+        return result
+
+    def version(self):
+        return {"hash": self.hash} if self.hash is not None else None
+
+    def kinds(self):
+        return ["neurons" if "neurons" in payload else "delta" if "delta" in payload else "probe" for payload, _ in self.posts]
+
+
+def snapshot(ips, stake=0.0, block=1):
+    graph = metagraph(ips, block)
+    graph.T = np.zeros(len(ips), dtype=np.float32)
+    graph.S = graph.S + np.float32(stake)
+    return MetagraphSnapshot.from_metagraph(graph)
+
+
+def without_block(records):
+    # A delta leaves the unchanged records at the block they were sent with
+    return [{key: value for key, value in record.items() if key != "block"} for record in records]
+
+
+def broadcast(broadcaster, *snapshots):
+    return [asyncio.run(broadcaster.broadcast(snapshot)) for snapshot in snapshots]
+
+
+def test_only_changed_neurons_are_sent_on_top_of_the_held_version():
+    node = FakeNodeStack()
+    broadcaster = NeuronBroadcaster(node.post)
+    first = snapshot(["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+    moved = snapshot(["10.0.0.1", "10.0.0.9", "10.0.0.3"], block=2)
+    grown = snapshot(["10.0.0.1", "10.0.0.9", "10.0.0.3", "10.0.0.4"], block=3)
+
+    assert broadcast(broadcaster, first, moved, grown) == [True, True, True]
+
+    assert node.kinds() == ["neurons", "delta", "delta"]
+    assert [record["uid"] for record in node.posts[1][0]["delta"]["changed"]] == [1]
+    assert [record["uid"] for record in node.posts[2][0]["delta"]["changed"]] == [3]
+    assert without_block(node.neurons) == without_block(grown.to_records()) and node.hash == grown.content_hash
+    assert broadcaster.stats()["deltas"] == 2 and broadcaster.stats()["acknowledged"] == grown.content_hash
+
+
+def test_unchanged_content_is_not_sent_again():
+    node = FakeNodeStack()
+    broadcaster = NeuronBroadcaster(node.post)
+
+    broadcast(broadcaster, snapshot(["10.0.0.1"]), snapshot(["10.0.0.1"], block=2), snapshot(["10.0.0.1"], block=3))
+
+    assert node.kinds() == ["neurons"] and broadcaster.skipped == 2
+
+
+def test_a_node_stack_that_lost_the_version_gets_the_full_list():
+    node = FakeNodeStack()
+    broadcaster = NeuronBroadcaster(node.post)
+    first = snapshot(["10.0.0.1", "10.0.0.2"])
+    broadcast(broadcaster, first)
+
+    # The delta is refused against the empty cache of a restarted node-stack
+    node.restart()
+    changed = snapshot(["10.0.0.1", "10.0.0.2"], stake=1, block=2)
+    assert broadcast(broadcaster, changed) == [True]
+    assert node.kinds() == ["neurons", "delta", "neurons"]
+    assert node.neurons == changed.to_records() and broadcaster.mismatches == 1
+
+
+def test_an_unchanged_version_is_probed_after_the_interval():
+    node = FakeNodeStack()
+    broadcaster = NeuronBroadcaster(node.post, probe_interval=0)
+    first = snapshot(["10.0.0.1", "10.0.0.2"])
+    broadcast(broadcaster, first, first)
+    assert node.kinds() == ["neurons", "probe"]
+
+    node.restart()
+    broadcast(broadcaster, first)
+    assert node.kinds() == ["neurons", "probe", "probe", "neurons"]
+    assert node.hash == first.content_hash and broadcaster.probes == 2
+
+
+def test_a_node_stack_without_versions_gets_full_lists():
+    node = FakeNodeStack(versioned=False)
+    broadcaster = NeuronBroadcaster(node.post, probe_interval=0)
+
+    broadcast(broadcaster, snapshot(["10.0.0.1"]), snapshot(["10.0.0.1"], stake=1, block=2), snapshot(["10.0.0.1"], stake=1, block=3))
+
+    assert node.kinds() == ["neurons", "neurons"] and broadcaster.acknowledged is None
+
+
+def test_columns_are_sent_once_the_node_stack_accepts_them():
+    node = FakeNodeStack(columnar=True)
+    broadcaster = NeuronBroadcaster(node.post)
+    broadcast(broadcaster, snapshot(["10.0.0.1", "10.0.0.2"]), snapshot(["10.0.0.1", "10.0.0.3"], block=2))
+
+    assert [content_type for _, content_type in node.posts] == [CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR]
+    assert without_block(node.neurons) == without_block(snapshot(["10.0.0.1", "10.0.0.3"], block=2).to_records())
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+from sybil.validator.broadcast_queue import BroadcastQueue
+
+
+class FakeServer:
+    """Records the snapshots it receives, and can fail, hang or reject on demand."""
+
+    def __init__(self):
+        self.received = []
+        self.failures = 0
+        self.hang = False
+        self.reject = False
+        self.release = asyncio.Event()
+
+    async def send(self, snapshot):
+        if self.hang:
+            await asyncio.sleep(60)
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("validator server down")
+        self.received.append(snapshot)
+        return {"error": "bad snapshot"} if self.reject else {"success": True}
+
+
+async def until(condition, timeout=2):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def test_burst_is_coalesced_to_the_newest_snapshot():
+    async def run():
+        server = FakeServer()
+        queue = BroadcastQueue("balances", server.send, timeout=1, backoff=0.01)
+        queue.submit(0)
+        queue.start()
+        await until(lambda: queue.in_flight)
+
+        # Submitted from the chain thread while the first one is being sent
+        thread = threading.Thread(target=lambda: [queue.submit(i) for i in range(1, 50)])
+        thread.start()
+        thread.join()
+        assert queue.depth == 2
+
+        server.release.set()
+        await until(lambda: queue.depth == 0 and server.received[-1:] == [49])
+        await queue.stop()
+        return server.received, queue.stats()
+
+    received, stats = asyncio.run(run())
+    assert received == [0, 49]
+    assert stats["submitted"] == 50 and stats["sent"] == 2 and stats["dropped"] == 48
+
+
+def test_failed_sends_are_retried_then_given_up():
+    async def run():
+        server = FakeServer()
+        server.release.set()
+        queue = BroadcastQueue("balances", server.send, timeout=1, max_retries=2, backoff=0.01)
+        queue.start()
+
+        server.failures = 2
+        queue.submit("retried")
+        await until(lambda: server.received == ["retried"])
+
+        server.failures = 3
+        queue.submit("lost")
+        await until(lambda: queue.failed == 1)
+        await queue.stop()
+        return server.received, queue.stats()
+
+    received, stats = asyncio.run(run())
+    assert received == ["retried"]
+    assert stats["retries"] == 4 and stats["sent"] == 1 and stats["failed"] == 1
+
+
+def test_newer_snapshot_replaces_one_waiting_to_be_retried():
+    async def run():
+        server = FakeServer()
+        server.release.set()
+        server.hang = True
+        queue = BroadcastQueue("balances", server.send, timeout=0.05, max_retries=3, backoff=10)
+        queue.start()
+
+        # The first attempt times out and the queue backs off for a long time
+        queue.submit("old")
+        await until(lambda: queue.in_flight)
+        await asyncio.sleep(0.1)
+        server.hang = False
+        queue.submit("new")
+        await until(lambda: server.received == ["new"])
+        await queue.stop()
+        return queue.stats()
+
+    stats = asyncio.run(run())
+    assert stats["dropped"] == 1 and stats["sent"] == 1 and stats["retries"] == 0
+
+
+def test_rejections_are_not_retried_and_stop_keeps_the_pending_snapshot():
+    async def run():
+        server = FakeServer()
+        server.release.set()
+        server.reject = True
+        queue = BroadcastQueue("balances", server.send, timeout=1, backoff=0.01)
+        queue.start()
+        queue.submit("rejected")
+        await until(lambda: queue.rejected == 1)
+        await queue.stop()
+
+        server.reject = False
+        queue.submit("later")
+        assert queue.depth == 1
+        queue.start()
+        await until(lambda: server.received[-1:] == ["later"])
+        await queue.stop()
+        return server.received, queue.stats()
+
+    received, stats = asyncio.run(run())
+    assert received == ["rejected", "later"]
+    assert stats["retries"] == 0 and stats["rejected"] == 1 and stats["sent"] == 1
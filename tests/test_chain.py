@@ -0,0 +1,104 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from sybil.chain import ChainCache
+
+
+class FakeSubtensor:
+    """Counts every call that would reach the chain."""
+
+    def __init__(self, block=100, tempo=9):
+        self.current_block = block
+        self.tempo_value = tempo
+        self.calls = []
+        self.registered = {"hk"}
+
+    def get_current_block(self):
+        self.calls.append("block")
+        return self.current_block
+
+    def tempo(self, netuid):
+        self.calls.append("tempo")
+        return self.tempo_value
+
+    def is_hotkey_registered(self, netuid, hotkey_ss58):
+        self.calls.append("is_hotkey_registered")
+        return hotkey_ss58 in self.registered
+
+    def min_allowed_weights(self, netuid):
+        self.calls.append("min_allowed_weights")
+        return 8
+
+    def max_weight_limit(self, netuid):
+        self.calls.append("max_weight_limit")
+        return 0.1
+
+
+def test_block_height_is_fetched_once_per_block_time():
+    subtensor = FakeSubtensor()
+    chain = ChainCache(subtensor, netuid=1, block_time=3600)
+    assert [chain.block() for _ in range(3)] == [100, 100, 100]
+    assert subtensor.calls.count("block") == 1
+
+    chain = ChainCache(subtensor, netuid=1, block_time=0)
+    subtensor.current_block = 101
+    assert chain.block() == 101 and chain.block() == 101
+    assert subtensor.calls.count("block") == 3
+
+
+def test_registration_is_cached_for_the_current_block():
+    subtensor = FakeSubtensor()
+    chain = ChainCache(subtensor, netuid=1, block_time=3600)
+    assert chain.is_hotkey_registered("hk") and chain.is_hotkey_registered("hk")
+    assert not chain.is_hotkey_registered("other")
+    assert subtensor.calls.count("is_hotkey_registered") == 2
+
+    # A newer block, e.g. from a metagraph sync, drops it
+    chain.observe_block(101)
+    assert chain.is_hotkey_registered("hk")
+    assert subtensor.calls.count("is_hotkey_registered") == 3
+
+
+def test_hyperparameters_are_cached_until_the_next_epoch():
+    subtensor = FakeSubtensor(block=100, tempo=9)
+    chain = ChainCache(subtensor, netuid=1, block_time=3600)
+    assert chain.min_allowed_weights(1) == 8 and chain.max_weight_limit(1) == 0.1
+
+    # Epochs roll over when (block + netuid + 1) is a multiple of tempo + 1, so the next one starts at block 108
+    chain.observe_block(107)
+    chain.min_allowed_weights(1)
+    assert subtensor.calls.count("min_allowed_weights") == 1
+
+    chain.observe_block(108)
+    chain.min_allowed_weights(1)
+    chain.max_weight_limit(1)
+    assert subtensor.calls.count("min_allowed_weights") == 2
+    assert subtensor.calls.count("max_weight_limit") == 2
+
+    # The tempo is re-read at every epoch boundary
+    assert subtensor.calls.count("tempo") == 2
+    assert chain.report()["rpcs"]["min_allowed_weights"] == 2
+    assert chain.report()["rpcs"] == {}
+
+
+def test_concurrent_lookups_share_one_request():
+    subtensor = FakeSubtensor()
+    chain = ChainCache(subtensor, netuid=1, block_time=3600)
+    chain.block()
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch():
+        started.set()
+        release.wait(5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(chain.get, "slow", slow_fetch)
+        started.wait(5)
+        others = [executor.submit(chain.get, "slow", slow_fetch) for _ in range(3)]
+        release.set()
+        assert [future.result(5) for future in [first] + others] == [42] * 4
+
+    assert chain.rpcs["slow"] == 1
@@ -0,0 +1,92 @@
+import asyncio
+import itertools
+
+from sybil.protocol import Challenge
+from sybil.validator.challenge_pool import UNBOUND_UID, ChallengePool
+
+
+class FakeServer:
+    """Answers the challenge routes of the validator server, optionally without the dispatch route."""
+
+    def __init__(self, dispatch=True, lost=()):
+        self.dispatch = dispatch
+        self.lost = set(lost)
+        self.capabilities = {}
+        self.owner = {}
+        self.calls = []
+        self._ids = itertools.count()
+
+    async def is_healthy(self):
+        self.calls.append("/health")
+        return True
+
+    async def request(self, method, path, endpoint, json=None, **kwargs):
+        self.calls.append(path)
+        if path == "/challenge/new":
+            challenges = []
+            for uid in json["miner_uids"]:
+                challenge = f"c{next(self._ids)}"
+                self.owner[challenge] = uid
+                challenges.append({"challenge": challenge, "challenge_url": f"http://v/challenge/{challenge}?miner_uid={uid}"})
+            return 200, {"challenges": challenges}
+        if path == "/challenge/dispatch":
+            if not self.dispatch:
+                return 404, None
+            bound = []
+            for entry in json["challenges"]:
+                if entry["challenge"] in self.lost:
+                    continue
+                self.owner[entry["challenge"]] = entry["miner_uid"]
+                bound.append({**entry, "challenge_url": f"http://v/challenge/{entry['challenge']}?miner_uid={entry['miner_uid']}"})
+            return 200, {"challenges": bound}
+        raise AssertionError(path)
+
+
+def pooled(server, n):
+    pool = ChallengePool(server, size=n, ttl=600, dispatch_margin=60)
+    for _ in range(n):
+        challenge = f"c{next(server._ids)}"
+        server.owner[challenge] = UNBOUND_UID
+        pool._entries.append((float("inf"), Challenge(challenge=challenge, challenge_url=f"http://v/challenge/{challenge}")))
+    return pool
+
+
+def test_pooled_challenges_are_bound_on_the_server():
+    server = FakeServer()
+    pool = pooled(server, 3)
+
+    challenges = asyncio.run(pool.take([7, 8]))
+
+    assert [server.owner[challenge.challenge] for challenge in challenges] == ["7", "8"]
+    assert challenges[0].challenge_url.endswith("miner_uid=7")
+    assert server.calls == ["/challenge/dispatch"]
+    assert len(pool) == 1 and pool.misses == 0
+
+
+def test_challenges_the_server_does_not_bind_are_generated():
+    server = FakeServer(lost={"c1"})
+    pool = pooled(server, 2)
+
+    challenges = asyncio.run(pool.take([7, 8]))
+
+    assert challenges[0].challenge == "c0"
+    assert challenges[1].challenge != "c1" and server.owner[challenges[1].challenge] == "8"
+    assert pool.unbound == 1 and pool.misses == 1
+
+    # The miss goes straight to generation, without a health check first
+    assert server.calls == ["/challenge/dispatch", "/challenge/new"]
+
+
+def test_pool_is_dropped_when_the_server_cannot_bind():
+    server = FakeServer(dispatch=False)
+    pool = pooled(server, 4)
+
+    challenges = asyncio.run(pool.take([7, 8]))
+
+    # Challenges timed from generation are never handed out, they are generated for the miner instead
+    assert [server.owner[challenge.challenge] for challenge in challenges] == ["7", "8"]
+    assert len(pool) == 0 and not pool.enabled
+
+    server.calls.clear()
+    asyncio.run(pool.take([9]))
+    assert server.calls == ["/challenge/new"]
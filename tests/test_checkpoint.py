@@ -0,0 +1,89 @@
+import os
+import threading
+import numpy as np
+
+from unittest import mock
+
+from sybil.validator.checkpoint import CheckpointWriter, pack_hotkeys, unpack_hotkeys
+
+
+def state(step):
+    return {"step": np.int64(step), "scores": np.full(4, step, dtype=np.float32)}
+
+
+def test_hotkeys_round_trip_and_older_unicode_checkpoints_load():
+    hotkeys = ["5F" + "a" * 46, "5G" + "b" * 46]
+    assert unpack_hotkeys(pack_hotkeys(hotkeys)) == hotkeys
+    assert unpack_hotkeys(np.array(hotkeys)) == hotkeys
+
+
+def test_generations_are_shifted_and_the_newest_is_loaded(tmp_path):
+    writer = CheckpointWriter(str(tmp_path / "state.npz"), generations=3)
+    for step in range(5):
+        writer.submit(state(step))
+        assert writer.flush(5)
+
+    assert sorted(os.listdir(tmp_path)) == ["state.1.npz", "state.2.npz", "state.npz"]
+    assert int(writer.load(required=("step",))["step"]) == 4
+    with np.load(writer.generation_path(2)) as oldest:
+        assert int(oldest["step"]) == 2
+
+
+def test_corrupt_or_incomplete_checkpoints_fall_back_to_an_older_generation(tmp_path):
+    writer = CheckpointWriter(str(tmp_path / "state.npz"), generations=3)
+    for step in range(3):
+        writer.submit(state(step))
+        writer.flush(5)
+
+    # The newest file is truncated, the one before lacks a required array
+    with open(writer.path, "r+b") as f:
+        f.truncate(os.path.getsize(writer.path) // 2)
+    np.savez(writer.generation_path(1), scores=np.zeros(4))
+
+    assert int(writer.load(required=("step", "scores"))["step"]) == 0
+    assert writer.load(required=("missing",)) is None
+
+
+def test_states_submitted_during_a_write_are_coalesced(tmp_path):
+    writer = CheckpointWriter(str(tmp_path / "state.npz"))
+    started, release = threading.Event(), threading.Event()
+    write = writer._write
+
+    def slow_write(value):
+        started.set()
+        release.wait(5)
+        write(value)
+
+    with mock.patch.object(writer, "_write", slow_write):
+        writer.submit(state(0))
+        started.wait(5)
+        for step in range(1, 10):
+            writer.submit(state(step))
+        assert not writer.flush(0.01)
+        release.set()
+        assert writer.flush(5)
+
+    stats = writer.stats()
+    assert stats["requested"] == 10 and stats["written"] == 2 and stats["coalesced"] == 8
+    assert int(writer.load()["step"]) == 9
+
+
+def test_failed_write_leaves_the_previous_checkpoint_and_no_temporary_file(tmp_path):
+    writer = CheckpointWriter(str(tmp_path / "state.npz"))
+    writer.submit(state(1))
+    writer.flush(5)
+
+    with mock.patch("numpy.savez", side_effect=OSError("disk full")):
+        writer.submit(state(2))
+        writer.flush(5)
+
+    assert writer.stats()["failed"] == 1
+    assert sorted(os.listdir(tmp_path)) == ["state.npz"]
+    assert int(writer.load()["step"]) == 1
+
+
+def test_temporary_files_left_by_a_crash_are_removed(tmp_path):
+    leftover = tmp_path / "state.abc123.tmp"
+    leftover.write_bytes(b"partial")
+    CheckpointWriter(str(tmp_path / "state.npz"))
+    assert not leftover.exists()
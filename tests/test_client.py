@@ -0,0 +1,70 @@
+import asyncio
+
+from aiohttp import web
+
+from sybil.validator.client import DEFAULT_ENDPOINTS, ValidatorServerClient
+
+
+async def serve(release: asyncio.Event):
+    held = []
+
+    async def score(request):
+        # Long-poll, the server holds the request until the score is in
+        held.append(request)
+        await release.wait()
+        return web.json_response({"score": 1})
+
+    async def new_challenge(request):
+        return web.json_response({"challenges": [{"challenge": "c", "challenge_url": "u"}]})
+
+    app = web.Application()
+    app.router.add_get("/challenge/{challenge}/{response}", score)
+    app.router.add_post("/challenge/new", new_challenge)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", held
+
+
+def test_challenges_go_through_while_score_polls_fill_the_pool():
+    async def run():
+        release = asyncio.Event()
+        runner, url, held = await serve(release)
+        client = ValidatorServerClient(url, max_connections=8, max_concurrency=64)
+        try:
+            # More score polls than the regular pool has connections, all of them held by the server
+            polls = [
+                asyncio.create_task(client.get_json(f"/challenge/c{i}/r{i}", "score"))
+                for i in range(DEFAULT_ENDPOINTS["score"][2] + 8)
+            ]
+            while len(held) < DEFAULT_ENDPOINTS["score"][2]:
+                await asyncio.sleep(0.01)
+
+            # Challenge generation does not queue behind them
+            status, body = await asyncio.wait_for(
+                client.request("POST", "/challenge/new", "challenge", json={"miner_uids": ["1"]}), timeout=2
+            )
+            assert status == 200 and body["challenges"][0]["challenge"] == "c"
+            assert not any(poll.done() for poll in polls)
+
+            # Polls beyond the score limit wait for a slot instead of piling onto the server
+            assert len(held) == DEFAULT_ENDPOINTS["score"][2]
+
+            release.set()
+            assert all(result == {"score": 1} for result in await asyncio.gather(*polls))
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_endpoint_limits_are_capped_by_max_concurrency():
+    async def run():
+        client = ValidatorServerClient("http://127.0.0.1:1", max_concurrency=3)
+        assert client.semaphore("score")._value == 3
+        assert client.semaphore("balances")._value == DEFAULT_ENDPOINTS["balances"][2]
+
+    asyncio.run(run())
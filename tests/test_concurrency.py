@@ -0,0 +1,81 @@
+import asyncio
+
+from sybil.validator.concurrency import AIMDLimiter
+
+
+def run_window(limiter, ok=True, latency=1.0, n=None):
+    for _ in range(n or limiter.window):
+        limiter.in_flight += 1
+        limiter.release(ok, latency if ok else None)
+
+
+def test_limit_grows_additively_while_healthy():
+    limiter = AIMDLimiter(initial_limit=4, min_limit=1, max_limit=6, window=8)
+    run_window(limiter)
+    run_window(limiter)
+    assert limiter.limit == 6
+
+    # Never above the upper bound
+    run_window(limiter)
+    assert limiter.limit == 6 and limiter.increases == 3
+
+
+def test_rising_error_rate_halves_the_limit():
+    limiter = AIMDLimiter(initial_limit=16, min_limit=2, max_limit=64, window=10, error_tolerance=0.1)
+    run_window(limiter)
+    assert limiter.limit == 17
+
+    run_window(limiter, ok=False, n=5)
+    run_window(limiter, ok=True, n=5)
+    assert limiter.limit == 8.5 and limiter.decreases == 1
+
+
+def test_steady_failures_are_part_of_the_baseline():
+    limiter = AIMDLimiter(initial_limit=8, min_limit=1, max_limit=64, window=10)
+    for _ in range(5):
+        # Miners that never answer fail at the same rate every window
+        run_window(limiter, ok=False, n=3)
+        run_window(limiter, ok=True, n=7)
+    assert limiter.decreases == 0 and limiter.limit == 13
+
+
+def test_latency_spike_and_server_errors_back_off_down_to_the_minimum():
+    errors = [0]
+    limiter = AIMDLimiter(initial_limit=8, min_limit=3, max_limit=64, window=4, server_errors=lambda: errors[0])
+    run_window(limiter, latency=1.0)
+
+    run_window(limiter, latency=5.0)
+    assert limiter.limit == 4.5
+
+    errors[0] += 1
+    run_window(limiter, latency=1.0)
+    assert limiter.limit == 3
+
+    errors[0] += 1
+    run_window(limiter, latency=1.0)
+    assert limiter.limit == 3 and limiter.decreases == 3
+
+
+def test_acquire_waits_for_a_free_slot():
+    async def run():
+        limiter = AIMDLimiter(initial_limit=2, min_limit=1, max_limit=2, window=100)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done() and limiter.stats()["waiting"] == 1
+
+        limiter.release(True, 1.0)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+        # A cancelled waiter does not take a slot
+        cancelled = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        limiter.release(True, 1.0)
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1 and limiter.stats()["waiting"] == 0
+
+    asyncio.run(run())
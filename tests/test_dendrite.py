@@ -0,0 +1,239 @@
+import asyncio
+import pytest
+import bittensor as bt
+
+from aiohttp import web
+from types import SimpleNamespace
+from bittensor.core import dendrite as bt_dendrite
+
+from sybil.dendrite import PooledDendrite, fan_out, fan_out_all
+from sybil.protocol import Challenge, StreamingChallenge
+from sybil.validator.concurrency import AIMDLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_external_ip(monkeypatch):
+    # The dendrite looks up its external ip on creation, there is no need to go out to the internet for it here
+    monkeypatch.setattr(bt_dendrite.networking, "get_external_ip", lambda: "127.0.0.2")
+
+
+async def serve(paths):
+    async def answer(request):
+        paths.append(request.path)
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_route("*", "/{name}", answer)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def axon(port, hotkey="hk"):
+    return bt.AxonInfo(version=1, ip="127.0.0.1", port=port, ip_type=4, hotkey=hotkey, coldkey="ck")
+
+
+def challenge():
+    return Challenge(challenge="c", challenge_url="u")
+
+
+class FakeDendrite:
+    """Answers each axon after its own delay, or with a 408 once the timeout it was given runs out."""
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.timeouts = {}
+        self.cancelled = []
+        self.concurrent = self.max_concurrent = 0
+
+    @property
+    async def session(self):
+        return None
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        self.timeouts[target_axon.hotkey] = timeout
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            delay = self.delays[target_axon.hotkey]
+            await asyncio.sleep(min(delay, timeout))
+            synapse.dendrite.status_code = 200 if delay <= timeout else 408
+            synapse.dendrite.process_time = delay
+            return synapse
+        except asyncio.CancelledError:
+            self.cancelled.append(target_axon.hotkey)
+            raise
+        finally:
+            self.concurrent -= 1
+
+
+def pairs(*hotkeys):
+    return [(SimpleNamespace(hotkey=hotkey), challenge()) for hotkey in hotkeys]
+
+
+def test_fan_out_yields_as_answers_come_in_and_fan_out_all_keeps_the_pair_order():
+    async def run():
+        dendrite = FakeDendrite({"a": 0.06, "b": 0.01, "c": 0.03})
+        batch = pairs("a", "b", "c")
+
+        assert [index async for index, _ in fan_out(dendrite, batch)] == [1, 2, 0]
+
+        responses = await fan_out_all(dendrite, batch)
+        assert all(response is synapse for response, (_, synapse) in zip(responses, batch))
+
+    asyncio.run(run())
+
+
+def test_each_axon_gets_its_own_timeout():
+    async def run():
+        dendrite = FakeDendrite({"a": 0.05, "b": 0.05})
+        responses = await fan_out_all(dendrite, pairs("a", "b"), timeout=[0.01, 1.0])
+        assert dendrite.timeouts == {"a": 0.01, "b": 1.0}
+        assert [response.dendrite.status_code for response in responses] == [408, 200]
+
+        # A single timeout applies to every axon
+        await fan_out_all(dendrite, pairs("a", "b"), timeout=3.0)
+        assert dendrite.timeouts == {"a": 3.0, "b": 3.0}
+
+    asyncio.run(run())
+
+
+def test_stopping_early_cancels_the_queries_still_running():
+    async def run():
+        dendrite = FakeDendrite({"a": 0.01, "b": 5, "c": 5})
+        responses = fan_out(dendrite, pairs("a", "b", "c"))
+        assert (await responses.__anext__())[0] == 0
+        await responses.aclose()
+        await asyncio.sleep(0)
+        assert sorted(dendrite.cancelled) == ["b", "c"]
+
+    asyncio.run(run())
+
+
+def test_limiter_bounds_the_queries_in_flight():
+    async def run():
+        dendrite = FakeDendrite({hotkey: 0.01 for hotkey in "abcdef"})
+        limiter = AIMDLimiter(initial_limit=2, min_limit=1, max_limit=2)
+        responses = await fan_out_all(dendrite, pairs(*"abcdef"), limiter=limiter)
+        assert all(response.dendrite.status_code == 200 for response in responses)
+        assert dendrite.max_concurrent == 2 and limiter.in_flight == 0
+
+    asyncio.run(run())
+
+
+class FakeStreamingDendrite(FakeDendrite):
+    """Streams an event to each axon after every gap in its list, then the filled synapse."""
+
+    async def call_stream(self, target_axon, synapse, timeout, deserialize):
+        for gap in self.delays[target_axon.hotkey]:
+            await asyncio.sleep(gap)
+            synapse.events.append("heartbeat")
+            yield {"event": "heartbeat"}
+        synapse.challenge_response = "solved"
+        synapse.dendrite.status_code = 200
+        yield synapse
+
+
+def streaming_pairs(*hotkeys):
+    return [
+        (SimpleNamespace(hotkey=hotkey), StreamingChallenge(challenge="c", challenge_url="u", heartbeat_timeout=0.1))
+        for hotkey in hotkeys
+    ]
+
+
+def test_streams_that_stop_sending_heartbeats_are_cut_off():
+    async def run():
+        dendrite = FakeStreamingDendrite({
+            # Slow overall but steady heartbeats, silent from the start, and silent after a few heartbeats
+            "steady": [0.04] * 8,
+            "silent": [5],
+            "stalled": [0.04, 0.04, 5],
+        })
+        start = asyncio.get_running_loop().time()
+        responses = await fan_out_all(dendrite, streaming_pairs("steady", "silent", "stalled"), timeout=10)
+
+        assert [response.dendrite.status_code for response in responses] == [200, 408, 408]
+        assert responses[0].challenge_response == "solved" and len(responses[0].events) == 8
+        assert responses[2].events == ["heartbeat", "heartbeat"]
+        assert "No heartbeat" in responses[1].dendrite.status_message
+
+        # The silent miners are given up on well before the full timeout
+        assert asyncio.get_running_loop().time() - start < 1
+
+    asyncio.run(run())
+
+
+def test_connections_are_reused_between_sweeps():
+    async def run():
+        runner, port = await serve([])
+        dendrite = PooledDendrite(wallet=bt.Keypair.create_from_uri("//Alice"), keepalive_timeout=30)
+        try:
+            for _ in range(3):
+                session = await dendrite.session
+                async with session.get(f"http://127.0.0.1:{port}/x") as resp:
+                    await resp.read()
+                # Longer than the stock dendrite keeps an idle connection
+                await asyncio.sleep(0.1)
+            stats = dendrite.stats()
+            assert (stats["hits"], stats["misses"], stats["hit_ratio"], stats["pooled"]) == (2, 1, 2 / 3, 1)
+        finally:
+            await dendrite.aclose_session()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_warm_opens_a_connection_the_next_query_reuses():
+    async def run():
+        paths = []
+        runner, port = await serve(paths)
+        dendrite = PooledDendrite(wallet=bt.Keypair.create_from_uri("//Alice"), keepalive_timeout=30)
+        try:
+            await dendrite.warm([axon(port), axon(port, "other")])
+            await dendrite.call(target_axon=axon(port), synapse=challenge(), deserialize=False)
+
+            # One signed ping per endpoint, axons that already have a connection are not pinged again
+            await dendrite.warm([axon(port)])
+            assert paths == ["/Ping", "/Challenge"]
+
+            stats = dendrite.stats()
+            assert (stats["warmed"], stats["hits"], stats["misses"]) == (1, 1, 0)
+        finally:
+            await dendrite.aclose_session()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_stale_axons_drop_their_pooled_connections():
+    async def run():
+        runner, port = await serve([])
+        other_runner, other_port = await serve([])
+        dendrite = PooledDendrite(wallet=bt.Keypair.create_from_uri("//Alice"), keepalive_timeout=30)
+        try:
+            await dendrite.call(target_axon=axon(port), synapse=challenge(), deserialize=False)
+            old = await dendrite.session
+
+            # An endpoint without a pooled connection leaves the pool alone
+            dendrite.mark_stale([axon(other_port)])
+            assert await dendrite.session is old
+
+            dendrite.mark_stale([axon(port)])
+            assert await dendrite.session is not old
+            await dendrite.call(target_axon=axon(port), synapse=challenge(), deserialize=False)
+
+            stats = dendrite.stats()
+            assert (stats["evictions"], stats["resets"], stats["hits"], stats["misses"]) == (1, 1, 0, 2)
+
+            # The old session stays open for the requests that were still running on it
+            assert not old.closed
+            await dendrite.aclose_session()
+            assert old.closed
+        finally:
+            await dendrite.aclose_session()
+            await runner.cleanup()
+            await other_runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from types import SimpleNamespace
+
+from sybil.validator.latency import MAX_BACKOFF_DOUBLINGS, PROBE_INTERVAL, LatencyTracker
+
+
+def response(process_time=None, status_code=200):
+    return SimpleNamespace(dendrite=SimpleNamespace(status_code=status_code, process_time=process_time))
+
+
+def failure():
+    return response(status_code=408)
+
+
+def test_unknown_miner_gets_the_default_timeout():
+    tracker = LatencyTracker(default_timeout=60, min_timeout=5)
+    assert tracker.timeout(1, "hk1") == 60
+
+
+def test_timeout_follows_the_percentile_of_recent_response_times():
+    tracker = LatencyTracker(default_timeout=60, min_timeout=1, percentile=95, margin=2)
+    times = [1.0, 2.0, 3.0, 4.0, 10.0]
+    for process_time in times:
+        tracker.record(1, "hk1", response(process_time))
+
+    assert tracker.timeout(1, "hk1") == pytest.approx(np.percentile(times, 95) + 2)
+
+
+def test_timeout_is_clipped_to_the_configured_range():
+    tracker = LatencyTracker(default_timeout=20, min_timeout=5, margin=0)
+    tracker.record(1, "fast", response(0.1))
+    tracker.record(2, "slow", response(50.0))
+
+    assert tracker.timeout(1, "fast") == 5
+    assert tracker.timeout(2, "slow") == 20
+
+
+def test_consecutive_failures_double_the_timeout_until_a_success():
+    tracker = LatencyTracker(default_timeout=1000, min_timeout=1, margin=0)
+    tracker.record(1, "hk1", response(2.0))
+
+    tracker.record(1, "hk1", failure())
+    assert tracker.timeout(1, "hk1") == 4
+    tracker.record(1, "hk1", failure())
+    assert tracker.timeout(1, "hk1") == 8
+
+    # The backoff is capped
+    for _ in range(MAX_BACKOFF_DOUBLINGS + 4):
+        tracker.record(1, "hk1", failure())
+    assert tracker.timeout(1, "hk1") == 2 * 2 ** MAX_BACKOFF_DOUBLINGS
+
+    tracker.record(1, "hk1", response(2.0))
+    assert tracker.timeout(1, "hk1") == 2
+
+
+def test_miner_that_never_answered_gets_the_minimum_except_for_probes():
+    tracker = LatencyTracker(default_timeout=60, min_timeout=5)
+    timeouts = []
+    for _ in range(2 * PROBE_INTERVAL):
+        tracker.record(1, "hk1", failure())
+        timeouts.append(tracker.timeout(1, "hk1"))
+
+    assert timeouts.count(60) == 2
+    assert timeouts[PROBE_INTERVAL - 1] == 60
+    assert set(timeouts) == {5, 60}
+
+
+def test_history_is_kept_per_hotkey_and_pruned():
+    tracker = LatencyTracker(default_timeout=60, min_timeout=1, margin=0)
+    tracker.record(1, "old", response(3.0))
+    tracker.record(2, "hk2", response(3.0))
+
+    # A new hotkey on the same uid starts from scratch
+    assert tracker.timeout(1, "new") == 60
+
+    tracker.prune(["hk0", "new"])
+    assert tracker.stats()["tracked"] == 0
@@ -0,0 +1,68 @@
+import numpy as np
+import bittensor as bt
+
+from types import SimpleNamespace
+
+from sybil.validator.metagraph_diff import MetagraphFingerprint
+
+
+def metagraph(hotkeys, ips=None):
+    ips = ips or [f"10.0.0.{uid}" for uid in range(len(hotkeys))]
+    axons = [
+        bt.AxonInfo(version=1, ip=ip, port=8091, ip_type=4, hotkey=hotkey, coldkey=f"ck-{hotkey}")
+        for hotkey, ip in zip(hotkeys, ips)
+    ]
+    return SimpleNamespace(hotkeys=list(hotkeys), axons=axons)
+
+
+def fingerprint(*args, **kwargs):
+    return MetagraphFingerprint.from_metagraph(metagraph(*args, **kwargs))
+
+
+def test_identical_syncs_have_no_changes():
+    diff = fingerprint(["a", "b", "c"]).diff(fingerprint(["a", "b", "c"]))
+    assert diff.changed.size == 0 and diff.removed.size == 0
+    assert not diff.axons_changed
+    assert str(diff) == "MetagraphDiff(replaced=0, added=0, removed=0, moved=0)"
+
+
+def test_replaced_hotkeys_and_moved_axons():
+    previous = fingerprint(["a", "b", "c", "d"])
+    current = fingerprint(["a", "x", "c", "d"], ips=["10.0.0.0", "10.0.0.1", "10.0.9.9", "10.0.0.3"])
+    diff = current.diff(previous)
+
+    # A new hotkey comes with a new axon, a moved axon keeps its hotkey
+    assert diff.replaced.tolist() == [1]
+    assert diff.moved.tolist() == [1, 2]
+    assert diff.changed.tolist() == [1, 2]
+    assert diff.axons_changed
+
+
+def test_added_and_removed_uids():
+    grown = fingerprint(["a", "b", "c", "d"]).diff(fingerprint(["a", "b"]))
+    assert grown.added.tolist() == [2, 3] and grown.removed.size == 0
+    assert grown.changed.tolist() == [2, 3]
+
+    shrunk = fingerprint(["a"]).diff(fingerprint(["a", "b", "c"]))
+    assert shrunk.removed.tolist() == [1, 2] and shrunk.added.size == 0
+    assert shrunk.changed.size == 0 and shrunk.axons_changed
+
+
+def test_any_axon_field_changes_the_fingerprint():
+    previous = metagraph(["a", "b"])
+    current = metagraph(["a", "b"])
+    current.axons[0].port = 9000
+    current.axons[1].version = 2
+
+    diff = MetagraphFingerprint.from_metagraph(current).diff(MetagraphFingerprint.from_metagraph(previous))
+    assert diff.moved.tolist() == [0, 1] and diff.replaced.size == 0
+
+
+def test_fingerprint_holds_no_reference_to_the_metagraph():
+    source = metagraph(["a", "b"])
+    snapshot = MetagraphFingerprint.from_metagraph(source)
+    source.hotkeys[0] = "z"
+    source.axons[0].ip = "10.9.9.9"
+
+    assert snapshot.diff(MetagraphFingerprint.from_metagraph(metagraph(["a", "b"]))).changed.size == 0
+    assert isinstance(snapshot.axon_hashes, np.ndarray) and len(snapshot) == 2
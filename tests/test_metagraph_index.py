@@ -0,0 +1,58 @@
+import numpy as np
+
+from sybil.base.validator import BaseValidatorNeuron
+from sybil.validator.metagraph_diff import MetagraphFingerprint
+from sybil.validator.metagraph_index import MetagraphIndex
+
+from tests.test_validator_resync import FakeMetagraph, fake_validator
+
+
+def assert_matches_a_fresh_index(index, metagraph):
+    fresh = MetagraphIndex(metagraph)
+    assert list(index.ips) == list(fresh.ips) and list(index.hotkeys) == list(fresh.hotkeys)
+    assert index._uid_by_hotkey == fresh._uid_by_hotkey
+    assert index._uids_by_ip == fresh._uids_by_ip
+    for ours, theirs in zip(index._groups, fresh._groups):
+        np.testing.assert_array_equal(ours, theirs)
+
+
+def test_lookups():
+    index = MetagraphIndex(FakeMetagraph(["10.0.0.1", "10.0.0.2", "10.0.0.1"]))
+    assert index.uid_for_hotkey("hk2") == 2 and index.uid_for_hotkey("nobody") is None
+    assert index.uids_for_ip("10.0.0.1") == [0, 2] and index.uids_for_ip("10.0.0.9") == []
+    assert index.ip_for_uid(1) == "10.0.0.2"
+
+    # One uid per ip, the miners sharing an ip take turns
+    picks = {tuple(sorted(index.unique_ip_uids())) for _ in range(50)}
+    assert picks == {(0, 1), (1, 2)}
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = np.random.default_rng(0)
+    metagraph = FakeMetagraph([f"10.0.0.{uid % 5}" for uid in range(12)])
+    index = MetagraphIndex(metagraph)
+
+    for block in range(2, 40):
+        previous = MetagraphFingerprint.from_metagraph(metagraph)
+
+        # Move some axons between a handful of ips, and grow or shrink the metagraph now and then
+        n = int(np.clip(len(metagraph.hotkeys) + rng.integers(-2, 3), 1, 20))
+        ips = [metagraph.axons[uid].ip if uid < len(metagraph.axons) else "10.0.1.1" for uid in range(n)]
+        for uid in rng.choice(n, size=min(n, 3), replace=False):
+            ips[uid] = f"10.0.0.{rng.integers(0, 5)}"
+        metagraph.set(ips, block)
+
+        diff = MetagraphFingerprint.from_metagraph(metagraph).diff(previous)
+        index.update(metagraph, diff.changed.tolist())
+        assert_matches_a_fresh_index(index, metagraph)
+
+
+def test_resync_keeps_the_index_in_line_with_the_metagraph():
+    old = FakeMetagraph(["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+    validator = fake_validator(old, ["10.0.0.1", "10.0.0.3", "10.0.0.3", "10.0.0.4"])
+
+    BaseValidatorNeuron.resync_metagraph(validator)
+
+    assert validator.metagraph_index.uids_for_ip("10.0.0.3") == [1, 2]
+    assert validator.metagraph_index.uids_for_ip("10.0.0.2") == []
+    assert_matches_a_fresh_index(validator.metagraph_index, validator.metagraph)
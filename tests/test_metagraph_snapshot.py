@@ -0,0 +1,54 @@
+import numpy as np
+
+from sybil.metagraph_snapshot import MetagraphSnapshot
+from sybil.wire import expand
+
+from tests.test_validator_resync import FakeMetagraph
+
+
+def metagraph(ips, block=1):
+    graph = FakeMetagraph(ips)
+    graph.block = np.array(block)
+    n = len(ips)
+    graph.T = np.linspace(0, 1, n, dtype=np.float32)
+    graph.Tv = np.zeros(n, dtype=np.float32)
+    graph.alpha_stake = np.arange(n, dtype=np.float32)
+    graph.S = np.arange(n, dtype=np.float32) * 2
+    return graph
+
+
+def test_the_hash_covers_the_content_but_not_the_block():
+    first = MetagraphSnapshot.from_metagraph(metagraph(["10.0.0.1", "10.0.0.2"], block=1))
+    later = MetagraphSnapshot.from_metagraph(metagraph(["10.0.0.1", "10.0.0.2"], block=9))
+    assert first.content_hash == later.content_hash and later.block == 9
+
+    moved = MetagraphSnapshot.from_metagraph(metagraph(["10.0.0.1", "10.0.0.3"]))
+    graph = metagraph(["10.0.0.1", "10.0.0.2"])
+    graph.S = graph.S + 1
+    restaked = MetagraphSnapshot.from_metagraph(graph)
+    assert len({first.content_hash, moved.content_hash, restaked.content_hash}) == 3
+
+
+def test_changed_uids_include_changed_and_new_records():
+    previous = MetagraphSnapshot.from_metagraph(metagraph(["10.0.0.1", "10.0.0.2", "10.0.0.3"]))
+    graph = metagraph(["10.0.0.1", "10.0.0.9", "10.0.0.3", "10.0.0.4", "10.0.0.5"])
+    graph.T = np.concatenate([previous.trust[:3], [0.5, 0.5]]).astype(np.float32)
+    graph.T[2] = 0.25
+    current = MetagraphSnapshot.from_metagraph(graph)
+
+    assert current.changed_uids(previous).tolist() == [1, 2, 3, 4]
+    assert current.changed_uids(current).tolist() == []
+
+
+def test_records_and_columns_carry_the_same_neurons():
+    snapshot = MetagraphSnapshot.from_metagraph(metagraph(["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.1"], block=7))
+
+    # Shared ips are stored once
+    assert snapshot.ip_table == ["10.0.0.1", "10.0.0.2"] and snapshot.ip_index.tolist() == [0, 1, 0, 0]
+    assert snapshot.ips == ["10.0.0.1", "10.0.0.2", "10.0.0.1", "10.0.0.1"]
+
+    records = snapshot.to_records()
+    assert expand(snapshot.to_columnar()) == records
+    assert expand(snapshot.to_columnar(np.array([3, 1]))) == [records[3], records[1]]
+    assert records[1]["block"] == 7 and records[1]["hotkey"] == "hk1" and records[1]["ip"] == "10.0.0.2"
+    assert records[0]["excluded"] and not records[1]["excluded"]
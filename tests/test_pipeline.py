@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+
+from sybil.validator import pipeline
+from sybil.validator.pipeline import run_pipeline
+
+from tests.test_scheduler import FakeResponse, fake_validator
+
+
+def start_round(validator, monkeypatch, get_rewards=None):
+    async def fan_out_all(dendrite, pairs, timeout, limiter):
+        return [FakeResponse() for _ in pairs]
+
+    async def rewards(challenges, responses, client, score_stream):
+        return [1.0] * len(challenges)
+
+    monkeypatch.setattr(pipeline, "fan_out_all", fan_out_all)
+    monkeypatch.setattr(pipeline, "get_rewards", get_rewards or rewards)
+    metagraph = validator.metagraph
+    validator.scheduler.sync(metagraph.hotkeys, metagraph.block)
+    validator.scheduler.begin_round(range(len(metagraph.hotkeys)))
+
+
+def run(validator):
+    async def main():
+        try:
+            return await asyncio.wait_for(run_pipeline(validator), timeout=5)
+        finally:
+            # No stage or batch is left running in the background, and no miner stays claimed
+            await asyncio.sleep(0)
+            assert asyncio.all_tasks() == {asyncio.current_task()}
+            assert validator.scheduler.stats()["claimed"] == 0
+
+    return asyncio.run(main())
+
+
+def test_failing_challenge_pool_releases_the_batch(monkeypatch):
+    validator, _ = fake_validator(4)
+    start_round(validator, monkeypatch)
+
+    async def take(uids):
+        raise ConnectionError("validator server down")
+
+    validator.challenge_pool.take = take
+    with pytest.raises(ConnectionError):
+        run(validator)
+
+    assert validator.scheduler.stats()["claimed"] == 0
+    assert validator.scheduler.round_remaining == 4
+
+
+def test_failing_score_lookup_stops_the_pipeline_without_leaking_claims(monkeypatch):
+    validator, _ = fake_validator(8)
+    validator.config.neuron.pipeline_depth = 2
+
+    async def get_rewards(challenges, responses, client, score_stream):
+        raise RuntimeError("score lookup failed")
+
+    start_round(validator, monkeypatch, get_rewards)
+    with pytest.raises(RuntimeError):
+        run(validator)
+
+    # Nothing hangs and every miner is either requeued after its query or handed back to the round
+    assert validator.scheduler.stats()["claimed"] == 0
+    assert validator.scored == []
+
+
+def test_round_completes(monkeypatch):
+    validator, _ = fake_validator(5)
+    start_round(validator, monkeypatch)
+    scored_uids, rewards = run(validator)
+    assert sorted(scored_uids) == [0, 1, 2, 3, 4] and rewards == [1.0] * 5
+    assert validator.scheduler.stats()["claimed"] == 0
+
+
+def lookup_failing_for(*uids):
+    async def get_rewards(challenges, responses, client, score_stream):
+        return [None if int(challenge[1:]) in uids else 1.0 for challenge in challenges]
+
+    return get_rewards
+
+
+def test_scores_are_committed_per_batch_without_the_failed_lookups(monkeypatch):
+    validator, _ = fake_validator(6)
+    commits = []
+    validator.update_scores = lambda rewards, uids: commits.append(dict(zip(uids, rewards)))
+    start_round(validator, monkeypatch, lookup_failing_for(1, 4))
+
+    scored_uids, _ = run(validator)
+
+    # One commit per batch of two, each holding only the miners that got a score
+    assert len(commits) == 3
+    assert all(len(commit) <= 2 for commit in commits)
+    assert {uid: reward for commit in commits for uid, reward in commit.items()} == {0: 1.0, 2: 1.0, 3: 1.0, 5: 1.0}
+    assert sorted(scored_uids) == [0, 2, 3, 5]
+
+
+def test_miners_without_a_score_decay_after_too_many_rounds(monkeypatch):
+    validator, _ = fake_validator(2)
+
+    # uid 1 keeps its score for the first misses, then decays every round until a score comes back
+    for round_number in range(1, 5):
+        start_round(validator, monkeypatch, lookup_failing_for(1))
+        run(validator)
+        assert validator.scored[-1] == ((1, 0.0) if round_number >= 3 else (0, 1.0))
+
+    start_round(validator, monkeypatch, lookup_failing_for())
+    run(validator)
+    start_round(validator, monkeypatch, lookup_failing_for(1))
+    run(validator)
+    assert validator.scored[-1] == (0, 1.0)
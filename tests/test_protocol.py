@@ -0,0 +1,51 @@
+import json
+import asyncio
+import pytest
+
+from types import SimpleNamespace
+
+from sybil.protocol import StreamingChallenge
+
+
+class FakeContent:
+    """Hands out one line per gap, then nothing more."""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    async def readline(self):
+        if not self.lines:
+            return b""
+        gap, line = self.lines.pop(0)
+        await asyncio.sleep(gap)
+        return line
+
+
+def event_lines(*events, gap=0.0):
+    return [(gap, (json.dumps(event) + "\n").encode()) for event in events]
+
+
+async def consume(synapse, lines):
+    return [event async for event in synapse.process_streaming_response(SimpleNamespace(content=FakeContent(lines)))]
+
+
+def test_events_are_recorded_and_the_solution_is_kept():
+    synapse = StreamingChallenge(challenge="c", challenge_url="u", heartbeat_timeout=1)
+    lines = event_lines({"stage": "fetched"}, {"event": "heartbeat"}) + [(0, b"not json\n"), (0, b"\n")]
+    lines += event_lines({"event": "solved", "response": "42"})
+
+    events = asyncio.run(consume(synapse, lines))
+
+    assert len(events) == 3
+    assert synapse.events == ["fetched", "heartbeat", "solved"]
+    assert synapse.challenge_response == "42" and synapse.deserialize() == "42"
+
+
+def test_a_miner_silent_for_longer_than_the_heartbeat_timeout_is_given_up_on():
+    synapse = StreamingChallenge(challenge="c", challenge_url="u", heartbeat_timeout=0.05)
+    lines = event_lines({"event": "heartbeat"}, {"event": "heartbeat"}, gap=0.01)
+    lines += event_lines({"event": "solved", "response": "42"}, gap=1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(consume(synapse, lines))
+    assert synapse.events == ["heartbeat", "heartbeat"] and synapse.challenge_response is None
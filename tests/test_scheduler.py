@@ -0,0 +1,217 @@
+import asyncio
+
+from types import SimpleNamespace
+
+from sybil.validator import pipeline
+from sybil.validator.latency import LatencyTracker
+from sybil.validator.pipeline import QueryPacer, run_pipeline
+from sybil.validator.scheduler import MinerScheduler
+
+
+def hotkeys(n, prefix="hk"):
+    return [f"{prefix}{uid}" for uid in range(n)]
+
+
+def test_never_queried_miners_come_first_then_oldest():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(4), block=100)
+
+    # Query everyone once at increasing blocks, uid 2 first so it is the stalest afterwards
+    for block, uid in zip((100, 101, 102, 103), (2, 0, 3, 1)):
+        scheduler._anchor_block = block
+        assert scheduler.take(1, {uid}) == [uid]
+        scheduler.complete(uid, f"hk{uid}", ok=True)
+
+    # A newly registered uid jumps the queue, the rest follow oldest first
+    scheduler.sync(hotkeys(5), block=103)
+    assert scheduler.take(5) == [4, 2, 0, 3, 1]
+
+
+def test_first_failure_is_retried_quickly_but_repeated_failures_are_not():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(3), block=10)
+    for uid in scheduler.take(3):
+        scheduler.complete(uid, f"hk{uid}", ok=True)
+
+    scheduler._anchor_block = 20
+    assert scheduler.take(1, {2}) == [2]
+    scheduler.complete(2, "hk2", ok=False)
+    assert scheduler.take(1) == [2]
+
+    scheduler._anchor_block = 30
+    scheduler.complete(2, "hk2", ok=False)
+    assert scheduler.take(3) == [0, 1, 2]
+
+
+def test_claimed_miners_are_not_handed_out_twice():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(3), block=1)
+    first = scheduler.take(2)
+    assert len(first) == 2
+    assert scheduler.take(3) == [uid for uid in range(3) if uid not in first]
+    assert scheduler.take(3) == []
+
+    scheduler.release(first)
+    assert sorted(scheduler.take(3)) == sorted(first)
+
+
+def test_round_admits_new_and_replaced_uids():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(3), block=1)
+    scheduler.begin_round([0, 1, 2])
+    assert scheduler.take_round(2) and scheduler.round_remaining == 1
+
+    # uid 0 changes hands and uid 3 registers while the round runs
+    names = hotkeys(4)
+    names[0] = "new0"
+    admitted = scheduler.sync(names, block=2)
+    assert admitted == [0, 3]
+    scheduler.admit(admitted)
+    assert scheduler.round_members == {0, 1, 2, 3}
+
+    # Uids that leave the metagraph are dropped from the round
+    scheduler.sync(names[:3], block=3)
+    assert 3 not in scheduler._round
+
+
+def test_released_miners_go_back_into_the_round():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(4), block=1)
+    scheduler.begin_round([0, 1, 2])
+    taken = scheduler.take_round(2)
+
+    scheduler.release(taken)
+    assert scheduler.round_remaining == 3
+    assert sorted(scheduler.take_round(3)) == [0, 1, 2]
+    assert scheduler.take_round(3) == []
+
+
+def test_round_take_leaves_the_rest_of_the_queue_alone():
+    scheduler = MinerScheduler()
+    scheduler.sync(hotkeys(100), block=1)
+    scheduler.begin_round([98, 99])
+    queued = list(scheduler._heap)
+
+    assert sorted(scheduler.take_round(2)) == [98, 99]
+    assert scheduler._heap == queued
+    assert scheduler.take(100) == list(range(98))
+
+
+class FakeResponse:
+    def __init__(self):
+        self.dendrite = SimpleNamespace(status_code=200, process_time=0.1)
+
+    def deserialize(self):
+        return "solved"
+
+
+class FakeChallengePool:
+    async def take(self, uids):
+        return [SimpleNamespace(challenge=f"c{uid}", challenge_url=f"url{uid}") for uid in uids]
+
+
+def fake_validator(n):
+    metagraph = SimpleNamespace(
+        block=1,
+        hotkeys=hotkeys(n),
+        axons=[SimpleNamespace(ip=f"10.0.0.{uid}", hotkey=f"hk{uid}") for uid in range(n)],
+    )
+    scored = []
+    return SimpleNamespace(
+        metagraph=metagraph,
+        scheduler=MinerScheduler(),
+        latency=LatencyTracker(default_timeout=10, min_timeout=1),
+        dendrite=object(),
+        challenge_pool=FakeChallengePool(),
+        query_pacer=QueryPacer(0),
+        concurrency=None,
+        validator_server=None,
+        score_stream=None,
+        config=SimpleNamespace(
+            neuron=SimpleNamespace(sample_size=2, pipeline_depth=1, stream_challenges=False, max_score_misses=3)
+        ),
+        update_scores=lambda rewards, uids: scored.extend(zip(uids, rewards)),
+        scored=scored,
+    ), metagraph
+
+
+def register(metagraph, ip):
+    uid = len(metagraph.hotkeys)
+    metagraph.hotkeys = metagraph.hotkeys + [f"hk{uid}"]
+    metagraph.axons = metagraph.axons + [SimpleNamespace(ip=ip, hotkey=f"hk{uid}")]
+    return uid
+
+
+def run_round(validator, monkeypatch, on_first_query):
+    calls = []
+
+    async def fan_out_all(dendrite, pairs, timeout, limiter):
+        if not calls:
+            on_first_query()
+        calls.append([axon.hotkey for axon, _ in pairs])
+        return [FakeResponse() for _ in pairs]
+
+    async def get_rewards(challenges, responses, client, score_stream):
+        return [1.0] * len(challenges)
+
+    monkeypatch.setattr(pipeline, "fan_out_all", fan_out_all)
+    monkeypatch.setattr(pipeline, "get_rewards", get_rewards)
+
+    metagraph = validator.metagraph
+    validator.scheduler.sync(metagraph.hotkeys, metagraph.block)
+    validator.scheduler.begin_round(range(len(metagraph.hotkeys)))
+    scored_uids, _ = asyncio.run(run_pipeline(validator))
+    return scored_uids, calls
+
+
+def test_miner_registered_mid_round_is_queried_in_the_same_round(monkeypatch):
+    validator, metagraph = fake_validator(4)
+    new_uids = []
+    scored_uids, calls = run_round(validator, monkeypatch, lambda: new_uids.append(register(metagraph, "10.0.0.99")))
+
+    assert new_uids == [4]
+    assert 4 in scored_uids
+    assert sorted(scored_uids) == [0, 1, 2, 3, 4]
+    assert sum(calls, []).count("hk4") == 1
+
+
+def test_miner_registered_mid_round_on_a_queried_ip_waits(monkeypatch):
+    validator, metagraph = fake_validator(4)
+    scored_uids, _ = run_round(validator, monkeypatch, lambda: register(metagraph, "10.0.0.1"))
+
+    assert sorted(scored_uids) == [0, 1, 2, 3]
+    assert validator.scheduler.round_members == {0, 1, 2, 3}
+
+
+def test_batch_keeps_the_metagraph_it_was_taken_from(monkeypatch):
+    validator, metagraph = fake_validator(2)
+    resynced = SimpleNamespace(
+        block=2,
+        hotkeys=hotkeys(2),
+        axons=[SimpleNamespace(ip=f"10.0.1.{uid}", hotkey=f"hk{uid}") for uid in range(2)],
+    )
+
+    # A resync swaps the metagraph while the batch waits for its challenges
+    take = validator.challenge_pool.take
+
+    async def take_and_resync(uids):
+        validator.metagraph = resynced
+        return await take(uids)
+
+    validator.challenge_pool.take = take_and_resync
+    queried = []
+
+    async def fan_out_all(dendrite, pairs, timeout, limiter):
+        queried.extend(axon.ip for axon, _ in pairs)
+        return [FakeResponse() for _ in pairs]
+
+    async def get_rewards(challenges, responses, client, score_stream):
+        return [1.0] * len(challenges)
+
+    monkeypatch.setattr(pipeline, "fan_out_all", fan_out_all)
+    monkeypatch.setattr(pipeline, "get_rewards", get_rewards)
+    validator.scheduler.sync(metagraph.hotkeys, metagraph.block)
+    validator.scheduler.begin_round([0, 1])
+    asyncio.run(run_pipeline(validator))
+
+    assert queried == ["10.0.0.0", "10.0.0.1"]
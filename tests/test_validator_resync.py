@@ -0,0 +1,78 @@
+import threading
+import numpy as np
+import bittensor as bt
+
+from types import SimpleNamespace
+from bittensor.core import dendrite as bt_dendrite
+
+from sybil.base.validator import BaseValidatorNeuron
+from sybil.dendrite import PooledDendrite
+from sybil.validator.metagraph_diff import MetagraphFingerprint
+from sybil.validator.metagraph_index import MetagraphIndex
+
+
+class FakeMetagraph:
+    def __init__(self, ips):
+        self.set(ips, block=1)
+
+    def set(self, ips, block):
+        # Like bittensor, a sync rebinds every attribute instead of changing it in place
+        n = len(ips)
+        self.n = np.array(n)
+        self.block = np.array(block)
+        self.axons = [
+            bt.AxonInfo(version=1, ip=ip, port=8091, ip_type=4, hotkey=f"hk{uid}", coldkey=f"ck{uid}")
+            for uid, ip in enumerate(ips)
+        ]
+        self.hotkeys = [axon.hotkey for axon in self.axons]
+        self.coldkeys = [axon.coldkey for axon in self.axons]
+        self.T = self.Tv = self.alpha_stake = self.S = self.total_stake = np.zeros(n, dtype=np.float32)
+
+
+class FakeChain:
+    def __init__(self, ips):
+        self.ips = ips
+        self.synced = []
+
+    def metagraph_sync(self, metagraph):
+        self.synced.append(metagraph)
+        metagraph.set(self.ips, block=2)
+
+
+def fake_validator(old, ips, dendrite=None):
+    return SimpleNamespace(
+        metagraph=old,
+        chain=FakeChain(ips),
+        metagraph_fingerprint=MetagraphFingerprint.from_metagraph(old),
+        metagraph_index=MetagraphIndex(old),
+        state_lock=threading.Lock(),
+        scores=np.ones(len(old.hotkeys)),
+        hotkeys=list(old.hotkeys),
+        dendrite=dendrite,
+        balance_queue=SimpleNamespace(submit=lambda balances: None),
+    )
+
+
+def test_resync_swaps_in_a_new_metagraph():
+    old = FakeMetagraph(["10.0.0.1", "10.0.0.2"])
+    validator = fake_validator(old, ["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+    axons = old.axons
+
+    BaseValidatorNeuron.resync_metagraph(validator)
+
+    # The metagraph a running round holds is left as it was
+    assert validator.chain.synced == [validator.metagraph]
+    assert validator.metagraph is not old
+    assert old.axons is axons and len(old.hotkeys) == 2
+    assert len(validator.metagraph.axons) == 3 and len(validator.scores) == 3
+
+
+def test_resync_marks_the_old_endpoints_of_moved_and_removed_axons_stale(monkeypatch):
+    monkeypatch.setattr(bt_dendrite.networking, "get_external_ip", lambda: "127.0.0.2")
+    old = FakeMetagraph(["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+    dendrite = PooledDendrite(wallet=bt.Keypair.create_from_uri("//Alice"))
+    validator = fake_validator(old, ["10.0.0.1", "10.0.0.9"], dendrite)
+
+    BaseValidatorNeuron.resync_metagraph(validator)
+
+    assert dendrite._stale == {("10.0.0.2", 8091), ("10.0.0.3", 8091)}
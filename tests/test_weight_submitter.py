@@ -0,0 +1,99 @@
+import time
+
+from sybil.validator import weight_submitter
+from sybil.validator.weight_submitter import WeightSubmitter
+
+
+class FakeChain:
+    """Answers set_weights from a script of results, the chain moves on a block every time it is asked for one."""
+
+    def __init__(self, results, block=100, on_set_weights=None):
+        self.results = list(results)
+        self.block = block
+        self.on_set_weights = on_set_weights
+        self.sent = []
+
+    def get_current_block(self):
+        self.block += 1
+        return self.block
+
+    def set_weights(self, wallet, netuid, uids, weights, version_key, **kwargs):
+        self.sent.append(list(weights))
+        if self.on_set_weights is not None:
+            self.on_set_weights()
+        return self.results.pop(0) if self.results else (True, "")
+
+
+def submitter(chain, **kwargs):
+    return WeightSubmitter(lambda: chain, wallet=None, netuid=1, version_key=1, **kwargs)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def test_backoff_doubles_in_blocks_up_to_the_limit():
+    chain = FakeChain([])
+    worker = submitter(chain, max_backoff_blocks=8)
+
+    backoffs = []
+    for _ in range(6):
+        worker._record_failure("rate limited")
+        backoffs.append(worker._retry_block - chain.block)
+    assert backoffs == [1, 2, 4, 8, 8, 8]
+    assert worker.stats()["consecutive_failures"] == 6 and worker.stats()["last_error"] == "rate limited"
+
+
+def test_failed_weights_are_retried_until_included(monkeypatch):
+    monkeypatch.setattr(weight_submitter, "BLOCK_TIME", 0.001)
+    included = []
+    chain = FakeChain([(False, "rate limited"), (False, "rate limited")])
+    worker = submitter(chain, on_included=lambda submission, block: included.append((submission, block)))
+    worker.start()
+    try:
+        worker.submit([1, 2], [10, 20])
+        wait_for(lambda: included)
+        wait_for(lambda: not worker.busy)
+    finally:
+        worker.stop()
+
+    submission, block = included[0]
+    assert submission.attempts == 3 and submission.weights == [10, 20]
+    assert chain.sent == [[10, 20]] * 3
+    stats = worker.stats()
+    assert (stats["submitted"], stats["included"], stats["failed"]) == (3, 1, 2)
+    assert stats["last_included_block"] == block and stats["consecutive_failures"] == 0 and stats["retry_block"] is None
+
+
+def test_newer_weights_replace_a_failed_submission(monkeypatch):
+    monkeypatch.setattr(weight_submitter, "BLOCK_TIME", 0.001)
+    included = []
+    worker = None
+
+    # Fresher weights arrive while the first extrinsic is out
+    def submit_newer():
+        if len(chain.sent) == 1:
+            worker.submit([1, 2], [30, 40])
+
+    chain = FakeChain([(False, "rate limited")], on_set_weights=submit_newer)
+    worker = submitter(chain, on_included=lambda submission, block: included.append(submission))
+    worker.start()
+    try:
+        worker.submit([1, 2], [10, 20])
+        wait_for(lambda: included)
+    finally:
+        worker.stop()
+
+    # The stale vector is never sent again once the newer one is there
+    assert chain.sent == [[10, 20], [30, 40]]
+    assert [submission.weights for submission in included] == [[30, 40]]
+
+
+def test_submit_replaces_a_vector_that_was_not_sent_yet():
+    worker = submitter(FakeChain([]))
+    worker.submit([1], [10])
+    worker.submit([1], [20])
+    assert worker.busy and worker.replaced == 1 and worker._pending.weights == [20]
@@ -0,0 +1,136 @@
+import pytest
+import numpy as np
+
+from types import SimpleNamespace
+from unittest import mock
+
+from sybil.base.utils import weight_utils
+from sybil.base.utils.weight_utils_reference import (
+    reference_convert_weights_and_uids_for_emit,
+    reference_normalize_max_weight,
+)
+from sybil.base.consts import BURN_UID, BURN_WEIGHT
+
+
+class FakeSubtensor:
+    """Serves the two hyperparameters process_weights_for_netuid reads from the chain."""
+
+    def __init__(self, min_allowed_weights: int, max_weight_limit: float):
+        self._min_allowed_weights = min_allowed_weights
+        self._max_weight_limit = max_weight_limit
+
+    def min_allowed_weights(self, netuid: int) -> int:
+        return self._min_allowed_weights
+
+    def max_weight_limit(self, netuid: int) -> float:
+        return self._max_weight_limit
+
+
+def make_case(rng: np.random.Generator, n: int):
+    """Builds moving average scores shaped like the validator's, with a random mix of edge cases."""
+    kind = rng.choice(["dense", "sparse", "few", "zeros", "ties", "spiky"])
+    if kind == "dense":
+        scores = rng.random(n)
+    elif kind == "sparse":
+        scores = rng.random(n) * (rng.random(n) < 0.1)
+    elif kind == "few":
+        scores = np.zeros(n)
+        scores[rng.choice(n, size=min(n, 3), replace=False)] = rng.random(min(n, 3))
+    elif kind == "zeros":
+        scores = np.zeros(n)
+    elif kind == "ties":
+        scores = rng.integers(0, 4, n).astype(float) / 4
+    else:
+        scores = rng.random(n) ** 8
+        scores[rng.integers(0, n)] = 1e3
+    scores = scores.astype(rng.choice([np.float32, np.float64]))
+
+    norm = np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
+    if np.any(norm == 0) or np.isnan(norm).any():
+        norm = np.ones_like(norm)
+    raw_weights = scores / norm
+
+    subtensor = FakeSubtensor(
+        min_allowed_weights=int(rng.choice([1, 8, 64, 1024])),
+        max_weight_limit=float(rng.choice([0.01, 0.05, 0.1, 0.5, 1.0])),
+    )
+    return raw_weights, subtensor
+
+
+def run_engine(raw_weights: np.ndarray, subtensor: FakeSubtensor, normalize, convert):
+    n = len(raw_weights)
+    with mock.patch.object(weight_utils, "normalize_max_weight", normalize):
+        uids, weights = weight_utils.process_weights_for_netuid(
+            uids=np.arange(n),
+            weights=raw_weights,
+            netuid=1,
+            subtensor=subtensor,
+            metagraph=SimpleNamespace(n=n),
+            burn_uid=BURN_UID,
+            burn_weight=BURN_WEIGHT,
+        )
+    return uids, weights, convert(uids=uids, weights=weights)
+
+
+def assert_identical(raw_weights: np.ndarray, subtensor: FakeSubtensor):
+    new_uids, new_weights, (new_emit_uids, new_emit_vals) = run_engine(
+        raw_weights, subtensor, weight_utils.normalize_max_weight, weight_utils.convert_weights_and_uids_for_emit
+    )
+    old_uids, old_weights, (old_emit_uids, old_emit_vals) = run_engine(
+        raw_weights, subtensor, reference_normalize_max_weight, reference_convert_weights_and_uids_for_emit
+    )
+
+    # Identical, not just close
+    assert np.array_equal(new_uids, old_uids)
+    assert new_weights.dtype == old_weights.dtype
+    assert np.array_equal(new_weights, old_weights)
+    assert new_emit_uids == [int(uid) for uid in old_emit_uids]
+    assert new_emit_vals == old_emit_vals
+
+    # Properties of the emitted weights themselves
+    assert all(0 < value <= weight_utils.U16_MAX for value in new_emit_vals)
+    assert not new_emit_vals or max(new_emit_vals) == weight_utils.U16_MAX
+    assert len(set(new_emit_uids)) == len(new_emit_uids)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_cases_match_the_reference(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(10):
+        raw_weights, subtensor = make_case(rng, int(rng.choice([256, 1024, 4096])))
+        assert_identical(raw_weights, subtensor)
+
+
+@pytest.mark.parametrize("n", [1, 2, 256])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_all_zero_scores_match_the_reference(n, dtype):
+    assert_identical(np.zeros(n, dtype=dtype), FakeSubtensor(min_allowed_weights=1, max_weight_limit=0.1))
+
+
+# Splitting the non-burn weight over n - 1 uids divides by zero for a single uid, in both implementations
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("score", [0.0, 0.5, 1.0])
+@pytest.mark.parametrize("limit", [0.1, 1.0])
+def test_single_uid_matches_the_reference(score, limit):
+    assert_identical(np.array([score]), FakeSubtensor(min_allowed_weights=1, max_weight_limit=limit))
+
+
+@pytest.mark.parametrize("n, limit", [(10, 0.1), (10, 0.5), (4, 0.25), (4, 1.0), (256, 1 / 256), (256, 0.01)])
+@pytest.mark.parametrize("seed", range(3))
+def test_limit_at_or_above_one_over_n_matches_the_reference(n, limit, seed):
+    rng = np.random.default_rng(seed)
+    for scores in (rng.random(n), rng.random(n) ** 8, np.eye(1, n, int(rng.integers(n)))[0]):
+        np.testing.assert_array_equal(
+            weight_utils.normalize_max_weight(scores, limit), reference_normalize_max_weight(scores, limit)
+        )
+        assert_identical(scores / scores.sum(), FakeSubtensor(min_allowed_weights=1, max_weight_limit=limit))
+
+
+def test_debug_logs_are_only_formatted_when_debug_logging_is_on():
+    raw_weights, subtensor = np.full(256, 1 / 256), FakeSubtensor(min_allowed_weights=1, max_weight_limit=0.1)
+    for level, logged in ((30, False), (10, True)):
+        with mock.patch.object(weight_utils.bittensor.logging, "get_level", return_value=level), mock.patch.object(
+            weight_utils.bittensor.logging, "debug"
+        ) as debug:
+            run_engine(raw_weights, subtensor, weight_utils.normalize_max_weight, weight_utils.convert_weights_and_uids_for_emit)
+        assert debug.called is logged
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import numpy as np
+
+from types import SimpleNamespace
+
+from sybil.base.utils.weight_utils import emitted_weights_distance
+from sybil.base.validator import BaseValidatorNeuron
+from sybil.validator.weight_submitter import WeightSubmission
+
+from tests.test_weight_utils import FakeSubtensor
+
+
+class FakeChain(FakeSubtensor):
+    def __init__(self):
+        super().__init__(min_allowed_weights=1, max_weight_limit=1.0)
+        self.current_block = 100
+
+    def block(self):
+        return self.current_block
+
+
+class FakeSubmitter:
+    def __init__(self):
+        self.busy = False
+        self.submitted = []
+
+    def submit(self, uids, weights):
+        self.submitted.append(WeightSubmission(uids, weights))
+
+    def stats(self):
+        return {}
+
+
+class FakeValidator(SimpleNamespace):
+    @property
+    def block(self):
+        return self.chain.current_block
+
+
+def fake_validator(scores):
+    chain = FakeChain()
+    validator = FakeValidator(
+        scores=np.asarray(scores, dtype=np.float32),
+        state_lock=threading.Lock(),
+        metagraph=SimpleNamespace(uids=np.arange(len(scores)), n=len(scores)),
+        chain=chain,
+        chain_executor=None,
+        config=SimpleNamespace(
+            netuid=1,
+            neuron=SimpleNamespace(epoch_length=10, weights_change_threshold=0.05, weights_max_staleness=100),
+        ),
+        weight_submitter=FakeSubmitter(),
+        last_weights_check_block=-1,
+        should_set_weights=lambda: True,
+    )
+    validator.set_weights = lambda: BaseValidatorNeuron.set_weights(validator)
+    validator.run_blocking = lambda executor, fn, *args: BaseValidatorNeuron.run_blocking(validator, executor, fn, *args)
+    BaseValidatorNeuron.load_last_weights(validator, {})
+    return validator
+
+
+def set_weights_and_include(validator):
+    # Sets weights and lands them on chain at the current block
+    BaseValidatorNeuron.set_weights(validator)
+    submission = validator.weight_submitter.submitted[-1]
+    BaseValidatorNeuron.record_included_weights(validator, submission, validator.chain.current_block)
+
+
+def test_weights_that_barely_moved_are_skipped():
+    validator = fake_validator([0.1, 0.2, 0.3, 0.4])
+    set_weights_and_include(validator)
+
+    validator.scores[1] += 0.001
+    validator.chain.current_block = 130
+    BaseValidatorNeuron.set_weights(validator)
+
+    assert len(validator.weight_submitter.submitted) == 1
+    assert validator.last_weights_check_block == 130
+
+
+def test_weights_that_moved_are_submitted():
+    validator = fake_validator([0.1, 0.2, 0.3, 0.4])
+    set_weights_and_include(validator)
+
+    validator.scores[1] = 2.0
+    validator.chain.current_block = 130
+    BaseValidatorNeuron.set_weights(validator)
+
+    assert len(validator.weight_submitter.submitted) == 2
+
+
+def test_stale_weights_are_resubmitted_even_if_unchanged():
+    validator = fake_validator([0.1, 0.2, 0.3, 0.4])
+    set_weights_and_include(validator)
+
+    validator.chain.current_block = 200
+    BaseValidatorNeuron.set_weights(validator)
+
+    assert len(validator.weight_submitter.submitted) == 2
+    assert validator.weight_submitter.submitted[1].weights == validator.weight_submitter.submitted[0].weights
+
+
+def test_skipped_weights_are_not_recomputed_within_an_epoch():
+    validator = fake_validator([0.1, 0.2, 0.3, 0.4])
+    set_weights_and_include(validator)
+    calls = []
+    validator.set_weights = lambda: calls.append(validator.chain.current_block) or BaseValidatorNeuron.set_weights(validator)
+
+    # The first check after the epoch computes the weights and skips them, the next ticks of the epoch do nothing
+    for block in (111, 112, 120, 121, 122):
+        validator.chain.current_block = block
+        asyncio.run(BaseValidatorNeuron.weights_step(validator))
+
+    assert calls == [111, 122]
+    assert len(validator.weight_submitter.submitted) == 1
+    assert validator.last_weights_check_block == 122
+
+
+def test_emitted_weights_distance():
+    # Identical after normalization, disjoint, and one uid's weight moving to another
+    assert emitted_weights_distance([0, 1], [10, 30], [1, 0], [60, 20]) == 0
+    assert emitted_weights_distance([0], [10], [1], [10]) == 2
+    assert emitted_weights_distance([0, 1, 2], [1, 1, 2], [0, 1, 2], [0, 2, 2]) == 0.5
+
+    # Nothing set yet is as far from any weights as it gets
+    assert emitted_weights_distance([], [], [0, 1], [1, 1]) == 1
@@ -0,0 +1,93 @@
+import gzip
+import json
+import asyncio
+
+from aiohttp import web
+
+from sybil.validator.client import ValidatorServerClient
+from sybil.wire import (
+    COMPRESS_MIN_BYTES,
+    CONTENT_TYPE_COLUMNAR,
+    CONTENT_TYPE_JSON,
+    accepts_columnar,
+    columnar,
+    encode,
+    expand,
+)
+
+
+def balances(rows):
+    return columnar(
+        rows=rows,
+        columns={"miner_uid": list(range(rows)), "hotkey": [f"hk{uid}" for uid in range(rows)], "coldkey": [uid % 2 for uid in range(rows)]},
+        tables={"coldkey": ["ck0", "ck1"]},
+        constants={"block": 7},
+    )
+
+
+def decode(body, headers):
+    if headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def test_columns_expand_back_into_records():
+    assert expand(balances(3)) == [
+        {"miner_uid": 0, "hotkey": "hk0", "coldkey": "ck0", "block": 7},
+        {"miner_uid": 1, "hotkey": "hk1", "coldkey": "ck1", "block": 7},
+        {"miner_uid": 2, "hotkey": "hk2", "coldkey": "ck0", "block": 7},
+    ]
+    assert expand(columnar(rows=2, columns={}, constants={"block": 7})) == [{"block": 7}, {"block": 7}]
+    assert expand(balances(0)) == []
+
+
+def test_small_and_large_payloads_round_trip():
+    for rows in (1, 500):
+        payload = {"balances": balances(rows)}
+        body, headers = encode(payload, CONTENT_TYPE_COLUMNAR)
+        assert headers["Content-Type"] == CONTENT_TYPE_COLUMNAR
+        assert decode(body, headers) == payload
+
+        # Only bodies worth it are compressed
+        compressed = headers.get("Content-Encoding") == "gzip"
+        assert compressed == (len(json.dumps(payload, separators=(",", ":"))) >= COMPRESS_MIN_BYTES)
+        assert compressed == (rows == 500)
+
+    # Plain json is never compressed
+    body, headers = encode({"balances": expand(balances(500))})
+    assert headers == {"Content-Type": CONTENT_TYPE_JSON} and json.loads(body) == {"balances": expand(balances(500))}
+
+
+def test_accepts_columnar():
+    assert accepts_columnar({"accept": [CONTENT_TYPE_JSON, CONTENT_TYPE_COLUMNAR]})
+    assert not accepts_columnar({"accept": [CONTENT_TYPE_JSON]})
+    assert not accepts_columnar({"accept": None}) and not accepts_columnar(None)
+
+
+def test_the_server_receives_the_payload_it_was_sent():
+    async def run():
+        received = []
+
+        async def receive(request):
+            received.append((request.headers.get("Content-Type"), request.headers.get("Content-Encoding"), await request.json()))
+            return web.json_response({"success": True})
+
+        app = web.Application()
+        app.router.add_post("/protocol/broadcast/balances/miners", receive)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        client = ValidatorServerClient(f"http://127.0.0.1:{port}")
+        try:
+            payload = {"balances": balances(500)}
+            result = await client.post_encoded("/protocol/broadcast/balances/miners", "balances", payload, CONTENT_TYPE_COLUMNAR)
+            assert result == {"success": True}
+            assert received == [(CONTENT_TYPE_COLUMNAR, "gzip", payload)]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())